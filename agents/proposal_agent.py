@@ -2,56 +2,55 @@
 Final Proposal Agent - Optimized
 """
 
-from crewai import Agent, LLM
-from tools.filemanager_tool import file_manager_tool
-import os
-from dotenv import load_dotenv
+from crewai import Agent
+from config.registry import get_llm, get_memory, get_tool
 
-load_dotenv()
-gemini_api_key = os.getenv("GEMINI_API_KEY")
 
-llm = LLM(
-    model="gemini/gemini-2.0-flash",
-    api_key=gemini_api_key,
-    temperature=0.3
-)
+def build_proposal_agent() -> Agent:
+    return Agent(
+        name="Proposal Writer",
+        role="AI strategy consultant creating executive proposals",
+        goal="Synthesize all findings into structured markdown report with clickable links",
+        backstory="12+ year consultant specializing in AI transformation proposals",
+        verbose=True,
+        memory=get_memory(),
+        tools=[get_tool("file_manager")],
+        allow_delegation=False,
+        system_message=(
+            "EXECUTIVE AI TRANSFORMATION PROPOSAL:\n"
+            "Create a senior consultant-level report with EXACTLY this structure:\n\n"
+            "## Executive Summary\n"
+            "- Company position and AI opportunity\n"
+            "- Key recommendations (3-4 bullets)\n"
+            "- Expected business impact (quantified)\n\n"
+            "## Market Research & Industry Analysis\n"
+            "- Industry market size and CAGR\n"
+            "- AI adoption trends and maturity\n"
+            "- Competitive landscape insights\n\n"
+            "## AI Use Case Portfolio\n"
+            "- 10-12 use cases in priority order\n"
+            "- Each with: Problem, Solution, Benefits, ROI, Complexity, Example\n"
+            "- Categorized: Quick Wins / Strategic / Transformational\n\n"
+            "## Dataset & Resource Assets\n"
+            "- Public datasets by use case\n"
+            "- Pre-trained models and APIs\n"
+            "- Code repositories and tools\n\n"
+            "## Implementation Roadmap\n"
+            "- Phase 1 (0-6 months): Specific use cases to implement\n"
+            "- Phase 2 (6-18 months): Named strategic initiatives\n"
+            "- Phase 3 (18+ months): Transformational projects\n"
+            "- Resource requirements and timeline\n\n"
+            "## References\n"
+            "- All sources with clickable links\n\n"
+            "CRITICAL: Make roadmap specific - name exact use cases in each phase based on priority"
+        ),
+        llm=get_llm(temperature=0.3),
+    )
 
-proposal_agent = Agent(
-    name="Proposal Writer",
-    role="AI strategy consultant creating executive proposals",
-    goal="Synthesize all findings into structured markdown report with clickable links",
-    backstory="12+ year consultant specializing in AI transformation proposals",
-    verbose=True,
-    memory=True,
-    tools=[file_manager_tool],
-    allow_delegation=False,
-    system_message=(
-        "EXECUTIVE AI TRANSFORMATION PROPOSAL:\n"
-        "Create a senior consultant-level report with EXACTLY this structure:\n\n"
-        "## Executive Summary\n"
-        "- Company position and AI opportunity\n"
-        "- Key recommendations (3-4 bullets)\n"
-        "- Expected business impact (quantified)\n\n"
-        "## Market Research & Industry Analysis\n"
-        "- Industry market size and CAGR\n"
-        "- AI adoption trends and maturity\n"
-        "- Competitive landscape insights\n\n"
-        "## AI Use Case Portfolio\n"
-        "- 10-12 use cases in priority order\n"
-        "- Each with: Problem, Solution, Benefits, ROI, Complexity, Example\n"
-        "- Categorized: Quick Wins / Strategic / Transformational\n\n"
-        "## Dataset & Resource Assets\n"
-        "- Public datasets by use case\n"
-        "- Pre-trained models and APIs\n"
-        "- Code repositories and tools\n\n"
-        "## Implementation Roadmap\n"
-        "- Phase 1 (0-6 months): Specific use cases to implement\n"
-        "- Phase 2 (6-18 months): Named strategic initiatives\n"
-        "- Phase 3 (18+ months): Transformational projects\n"
-        "- Resource requirements and timeline\n\n"
-        "## References\n"
-        "- All sources with clickable links\n\n"
-        "CRITICAL: Make roadmap specific - name exact use cases in each phase based on priority"
-    ),
-    llm=llm
-)
\ No newline at end of file
+
+def __getattr__(name):
+    # `proposal_agent` is built on first access and cached by config.registry
+    if name == "proposal_agent":
+        from config.registry import get_agent
+        return get_agent("proposal")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
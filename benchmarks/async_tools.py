@@ -0,0 +1,138 @@
+"""
+Async tools check - hundreds of concurrent dataset searches on threads vs. one event loop
+
+Starts the Kaggle, HuggingFace and GitHub stubs (see benchmarks/stubs.py) with a
+``--median`` ms median latency and fires ``--calls`` DatasetSearchTool searches,
+each with a distinct query, all at once:
+
+- threads: ``_run`` on a pool of ``--workers`` threads (each search fans its
+           three platforms out on threads of its own)
+- async:   ``_arun`` gathered on a single event loop, on the shared AsyncClient
+
+Reports wall time, calls per second, the most threads alive at once and the
+requests that reached the stubs. The response cache and metadata index are
+disabled so every call goes upstream. Exits non-zero if the async pass failed
+calls, or needed more threads or more time than the threaded one.
+
+    python benchmarks/async_tools.py --calls 300 --workers 8
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["HTTP_CACHE_DISABLED"] = "1"
+os.environ["METADATA_INDEX_DISABLED"] = "1"
+os.environ.setdefault("RATE_LIMIT_PATH", os.path.join(tempfile.mkdtemp(), "ratelimit.sqlite"))
+
+from benchmarks.stubs import Profile, StubProviders  # noqa: E402
+from tools.dataset_tool import DatasetSearchTool  # noqa: E402
+from tools.transport import transport  # noqa: E402
+
+
+def client_threads() -> int:
+    """Threads alive in this process, leaving out the stub servers' own"""
+    return sum(
+        not (t.name.startswith("stub-") or t.name.endswith("(process_request_thread)"))
+        for t in threading.enumerate()
+    )
+
+
+class ThreadWatch:
+    """Most client threads alive at once while the block runs, beyond those alive when it started"""
+
+    def __init__(self):
+        self.baseline = client_threads() + 1  # +1: the watcher itself
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True, name="stub-watch")
+
+    def _sample(self):
+        while not self._stop.wait(0.005):
+            self.peak = max(self.peak, client_threads() - self.baseline + 1)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def run_threads(tool: DatasetSearchTool, queries, workers: int):
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(tool._run, queries))
+
+
+def run_async(tool: DatasetSearchTool, queries):
+    async def main():
+        try:
+            return await asyncio.gather(*(tool._arun(q) for q in queries))
+        finally:
+            await transport.aclose()
+
+    return asyncio.run(main())
+
+
+def measure(mode: str, tool: DatasetSearchTool, stubs: StubProviders, queries, workers: int):
+    stubs.reset()
+    started = time.perf_counter()
+    with ThreadWatch() as watch:
+        results = run_threads(tool, queries, workers) if mode == "threads" else run_async(tool, queries)
+    wall = time.perf_counter() - started
+    counts = stubs.counts()
+    return {
+        "wall_s": round(wall, 2),
+        "calls_per_s": round(len(queries) / wall, 1),
+        # a platform that failed shows up as its fallback search link, e.g. "Kaggle <query> Datasets"
+        "failed": sum(r.startswith("Search error") or f"Kaggle {q} Datasets" in r for r, q in zip(results, queries)),
+        "peak_threads": watch.peak,
+        "upstream": sum(counts[p] for p in ("kaggle", "huggingface", "github")),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--calls", type=int, default=300, help="concurrent searches, each with its own query")
+    parser.add_argument("--workers", type=int, default=8, help="threads for the threaded pass")
+    parser.add_argument("--median", type=float, default=100, help="median stub latency (ms)")
+    parser.add_argument("--max-per-host", type=int, default=16, help="requests in flight per host")
+    args = parser.parse_args(argv)
+
+    # the default of 8 per host is polite to real providers; the stubs can take more
+    transport.max_per_host = args.max_per_host
+    queries = [f"retail demand forecasting {i}" for i in range(args.calls)]
+    with StubProviders(default=Profile(latency_ms=args.median)) as stubs:
+        tool = DatasetSearchTool(
+            kaggle_api_url=stubs.stubs["kaggle"].url,
+            huggingface_api_url=f"{stubs.stubs['huggingface'].url}/api",
+            github_api_url=stubs.stubs["github"].url,
+        )
+        results = {mode: measure(mode, tool, stubs, queries, args.workers) for mode in ("threads", "async")}
+
+    print(f"{args.calls} concurrent dataset searches, median {args.median:.0f} ms, {args.max_per_host} in flight per host")
+    print(f"  {'mode':<8} {'wall s':>7} {'calls/s':>8} {'failed':>7} {'threads':>8} {'upstream':>9}")
+    for mode, r in results.items():
+        print(
+            f"  {mode:<8} {r['wall_s']:>7} {r['calls_per_s']:>8} {r['failed']:>7}"
+            f" {r['peak_threads']:>8} {r['upstream']:>9}"
+        )
+
+    threaded, native = results["threads"], results["async"]
+    ok = (
+        native["failed"] == 0
+        and native["peak_threads"] <= threaded["peak_threads"]
+        and native["wall_s"] <= threaded["wall_s"]
+    )
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,325 @@
+"""
+End-to-end benchmark suite - full runs, batches and every tool against local stub providers
+
+Each scenario runs in a fresh interpreter, with every provider replaced by a
+local stub server (see benchmarks/stubs.py) and every cache pointed at an
+empty scratch directory, at each of the requested session counts:
+
+- kickoff: N concurrent ``create_ai_usecase_crew(...).kickoff()`` runs
+- batch:   one BatchRunner over N companies with concurrency N
+- tool:<name>: N sessions each making ``--ops`` distinct calls to one tool
+
+Reported per scenario and session count: throughput, p50/p99 latency, errors,
+peak RSS and requests that reached each stub. ``--save`` writes the results as
+a JSON baseline; ``--compare`` checks a run against one and exits non-zero when
+a metric regressed by more than ``--tolerance``.
+
+    python benchmarks/e2e.py --sessions 1,8,64 --save benchmarks/baselines/local.json
+    python benchmarks/e2e.py --sessions 1,8 --compare benchmarks/baselines/local.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from stubs import PROVIDERS, Profile, StubProviders  # noqa: E402
+
+TOOLS = ("tavily", "kaggle", "github", "dataset_search", "trusted_search", "file_manager")
+SCENARIOS = ("kickoff", "batch", *(f"tool:{name}" for name in TOOLS))
+
+# higher is better for throughput only; the rest regress when they grow
+METRICS = {"throughput_ops_s": 1, "p50_ms": -1, "p99_ms": -1, "peak_rss_mb": -1}
+
+
+def percentile(values: List[float], q: float):
+    data = sorted(values)
+    if not data:
+        return None
+    return round(data[min(len(data) - 1, int(q * len(data)))], 1)
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+# ---------------------------------------------------------------------- worker side
+
+
+def _run_sessions(sessions: int, session_fn) -> Dict:
+    """Run ``session_fn(i)`` for every session at once; each returns a list of (latency_ms, ok) samples"""
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sessions) as pool:
+        samples = [s for batch in pool.map(session_fn, range(sessions)) for s in batch]
+    wall = time.perf_counter() - started
+    latencies = [ms for ms, _ in samples]
+    return {
+        "ops": len(samples),
+        "errors": sum(not ok for _, ok in samples),
+        "wall_s": round(wall, 3),
+        "throughput_ops_s": round(len(samples) / wall, 3) if wall else None,
+        "p50_ms": percentile(latencies, 0.5),
+        "p99_ms": percentile(latencies, 0.99),
+    }
+
+
+def _kickoff(sessions: int, ops: int) -> Dict:
+    from config.crew import create_ai_usecase_crew
+
+    def session(i):
+        samples = []
+        for n in range(ops):
+            started = time.perf_counter()
+            try:
+                create_ai_usecase_crew(f"Stub Company {i}-{n}").kickoff()
+                ok = True
+            except Exception:
+                ok = False
+            samples.append(((time.perf_counter() - started) * 1000, ok))
+        return samples
+
+    return _run_sessions(sessions, session)
+
+
+def _batch(sessions: int, ops: int) -> Dict:
+    from config.batch import BatchRunner
+
+    companies = [{"company": f"Stub Company {i}"} for i in range(sessions * ops)]
+    runner = BatchRunner(os.path.join(os.getcwd(), "batch"), concurrency=sessions)
+    started = time.perf_counter()
+    manifest = runner.run(companies)
+    wall = time.perf_counter() - started
+    latencies = [r["seconds"] * 1000 for r in manifest["results"]]
+    return {
+        "ops": manifest["companies"],
+        "errors": manifest["failed"],
+        "wall_s": round(wall, 3),
+        "throughput_ops_s": round(manifest["companies"] / wall, 3) if wall else None,
+        "p50_ms": percentile(latencies, 0.5),
+        "p99_ms": percentile(latencies, 0.99),
+    }
+
+
+def _tool(name: str, sessions: int, ops: int) -> Dict:
+    from config.registry import get_tool
+
+    tool = get_tool(name)
+    topics = ["demand forecasting", "predictive maintenance", "fraud detection", "churn prediction"]
+
+    def call(i, n):
+        # distinct per session and op, so coalescing and caches can't collapse the load
+        query = f"{topics[n % len(topics)]} {i} {n}"
+        if name == "file_manager":
+            return tool._run(f"# {query}\n\nbenchmark output\n", f"bench_{i}_{n}.md")
+        return tool._run(query)
+
+    def session(i):
+        samples = []
+        for n in range(ops):
+            started = time.perf_counter()
+            try:
+                result = call(i, n)
+                ok = not str(result).startswith(("❌", "Search error"))
+            except Exception:
+                ok = False
+            samples.append(((time.perf_counter() - started) * 1000, ok))
+        return samples
+
+    return _run_sessions(sessions, session)
+
+
+def run_worker(scenario: str, sessions: int, ops: int, profiles: Dict[str, Profile], result_file: str):
+    """One scenario at one session count, in this (fresh) process"""
+    scratch = tempfile.mkdtemp(prefix="bench-")
+    with StubProviders(profiles, default=profiles.get("default")) as stubs:
+        os.environ.update(stubs.env())
+        os.environ.update({
+            "GEMINI_API_KEY": "stub", "TAVILY_API_KEY": "stub",
+            "HTTP_CACHE_PATH": os.path.join(scratch, "http_cache.sqlite"),
+            "HTTP_CACHE_DISABLED": "1",
+            "STAGE_CACHE_DIR": os.path.join(scratch, "stages"),
+            "STAGE_CACHE_DISABLED": "1",
+            "METADATA_INDEX_DIR": os.path.join(scratch, "index"),
+            "METADATA_INDEX_DISABLED": "1",
+            "TRACE_PATH": os.path.join(scratch, "traces.sqlite"),
+            "RATE_LIMIT_PATH": os.path.join(scratch, "ratelimit.sqlite"),
+        })
+        os.chdir(scratch)
+        os.makedirs("outputs", exist_ok=True)
+
+        if scenario == "kickoff":
+            result = _kickoff(sessions, ops)
+        elif scenario == "batch":
+            result = _batch(sessions, ops)
+        else:
+            result = _tool(scenario.split(":", 1)[1], sessions, ops)
+        result.update(
+            scenario=scenario,
+            sessions=sessions,
+            peak_rss_mb=peak_rss_mb(),
+            threads_at_end=threading.active_count(),
+            outbound=stubs.counts(),
+        )
+
+    with open(result_file, "w", encoding="utf-8") as f:
+        json.dump(result, f)
+
+
+# ---------------------------------------------------------------------- driver side
+
+
+def run_scenario(scenario: str, sessions: int, args) -> Dict:
+    with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as f:
+        result_file = f.name
+    cmd = [
+        sys.executable, os.path.abspath(__file__), "--worker", scenario,
+        "--sessions", str(sessions), "--ops", str(args.ops_for(scenario)),
+        "--result-file", result_file, *sum((["--stub", s] for s in args.stub), []),
+    ]
+    # the pipeline's console output would drown the report
+    log = open(os.path.join(tempfile.gettempdir(), "bench-e2e.log"), "a", encoding="utf-8")
+    started = time.perf_counter()
+    proc = subprocess.run(cmd, stdout=log, stderr=log, timeout=args.timeout)
+    log.close()
+    if proc.returncode != 0 or not os.path.getsize(result_file):
+        return {"scenario": scenario, "sessions": sessions, "failed": f"exit {proc.returncode}, see {log.name}"}
+    with open(result_file, encoding="utf-8") as f:
+        result = json.load(f)
+    os.unlink(result_file)
+    result["process_s"] = round(time.perf_counter() - started, 2)
+    return result
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(results: List[Dict], baseline: Dict, tolerance: float) -> List[str]:
+    """Human-readable regressions beyond ``tolerance`` relative to the baseline"""
+    previous = {(r["scenario"], r["sessions"]): r for r in baseline.get("results", [])}
+    regressions = []
+    for r in results:
+        old = previous.get((r["scenario"], r["sessions"]))
+        if old is None or "failed" in r or "failed" in old:
+            continue
+        for metric, direction in METRICS.items():
+            before, after = old.get(metric), r.get(metric)
+            if not before or after is None:
+                continue
+            change = (after - before) / before
+            if change * direction < -tolerance:
+                regressions.append(
+                    f"{r['scenario']} x{r['sessions']}: {metric} {before} -> {after} ({change:+.0%})"
+                )
+    return regressions
+
+
+def print_table(results: List[Dict]):
+    print(
+        f"{'scenario':<22}{'sessions':>9}{'ops':>6}{'ops/s':>9}{'p50 ms':>10}{'p99 ms':>10}"
+        f"{'errors':>8}{'RSS MB':>9}  outbound requests"
+    )
+    for r in results:
+        if "failed" in r:
+            print(f"{r['scenario']:<22}{r['sessions']:>9}  failed: {r['failed']}")
+            continue
+        outbound = ", ".join(f"{p} {n}" for p, n in r["outbound"].items() if n)
+        print(
+            f"{r['scenario']:<22}{r['sessions']:>9}{r['ops']:>6}{r['throughput_ops_s']:>9.2f}"
+            f"{r['p50_ms']:>10.0f}{r['p99_ms']:>10.0f}{r['errors']:>8}{r['peak_rss_mb']:>9.0f}  {outbound or '-'}"
+        )
+
+
+def parse_profiles(specs: List[str]) -> Dict[str, Profile]:
+    """--stub gemini=300:0.02 --stub default=50"""
+    profiles = {}
+    for spec in specs:
+        name, _, value = spec.partition("=")
+        if name not in (*PROVIDERS, "default"):
+            raise SystemExit(f"Unknown stub {name!r}; expected one of {', '.join((*PROVIDERS, 'default'))}")
+        profiles[name] = Profile.parse(value)
+    return profiles
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help=f"comma-separated subset of: {', '.join(SCENARIOS)}")
+    parser.add_argument("--sessions", default="1,8,64", help="comma-separated concurrent session counts")
+    parser.add_argument("--ops", type=int, default=None, help="operations per session (default: 1 for runs, 5 for tools)")
+    parser.add_argument("--stub", action="append", default=[],
+                        help="provider=median_ms[:error_rate[:tail_rate]], e.g. gemini=400 tavily=150:0.05 github=50:0:0.02")
+    parser.add_argument("--save", help="write the results to this JSON baseline")
+    parser.add_argument("--compare", help="JSON baseline to check this run against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative regression per metric")
+    parser.add_argument("--timeout", type=float, default=1800, help="seconds allowed per scenario process")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--result-file", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    args.ops_for = lambda scenario: args.ops or (5 if scenario.startswith("tool:") else 1)
+
+    profiles = parse_profiles(args.stub)
+    if args.worker:
+        run_worker(args.worker, int(args.sessions), args.ops_for(args.worker), profiles, args.result_file)
+        return 0
+
+    scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    unknown = [s for s in scenarios if s not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(unknown)}")
+    session_counts = [int(n) for n in args.sessions.split(",")]
+
+    results = []
+    for scenario in scenarios:
+        for sessions in session_counts:
+            print(f"… {scenario} x{sessions}", flush=True)
+            results.append(run_scenario(scenario, sessions, args))
+
+    print()
+    print_table(results)
+
+    report = {
+        "commit": _git_commit(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "host": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+        "stubs": {name: vars(p) for name, p in profiles.items()},
+        "results": results,
+    }
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 baseline saved to {args.save}")
+
+    failed = any("failed" in r for r in results)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        print(f"\nvs {args.compare} (commit {baseline.get('commit')}, tolerance {args.tolerance:.0%}):")
+        for line in regressions or ["no regressions"]:
+            print(f"  {line}")
+        failed = failed or bool(regressions)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
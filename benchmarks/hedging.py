@@ -0,0 +1,99 @@
+"""
+Tail-latency check - adaptive timeouts and hedged requests against a heavy-tailed stub
+
+Starts the GitHub stub (see benchmarks/stubs.py) with a ``--median`` ms median
+latency and a ``--tail`` share of responses ``--tail-factor`` times slower. The
+same ``--requests`` sequential searches then go through a fresh Transport in
+three configurations:
+
+- fixed:    the caller's constant timeout, no hedging (the old behavior)
+- adaptive: timeouts tightened to the host's observed p99
+- hedged:   adaptive timeouts plus a duplicate request after the host's p95,
+            capped at ``--budget`` of requests
+
+Reports p50/p95/p99/max latency, errors and the requests that reached the stub.
+Exits non-zero if hedging did not cut p99 or went over its budget.
+
+    python benchmarks/hedging.py --requests 200 --tail 0.05
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("RATE_LIMIT_PATH", os.path.join(tempfile.mkdtemp(), "ratelimit.sqlite"))
+
+from benchmarks.stubs import Profile, StubProviders  # noqa: E402
+from tools.transport import Transport  # noqa: E402
+
+CONFIGS = {
+    "fixed": {"adaptive_timeouts": False, "hedging": False},
+    "adaptive": {"adaptive_timeouts": True, "hedging": False},
+    "hedged": {"adaptive_timeouts": True, "hedging": True},
+}
+
+
+def percentile(data, q: float) -> float:
+    data = sorted(data)
+    return data[min(len(data) - 1, int(q * len(data)))]
+
+
+def run(config: str, stubs: StubProviders, requests: int, budget: float, timeout: float):
+    transport = Transport(hedge_budget=budget, **CONFIGS[config])
+    url = f"{stubs.stubs['github'].url}/search/repositories"
+    stubs.reset()
+    latencies, errors = [], 0
+    for i in range(requests):
+        start = time.perf_counter()
+        try:
+            transport.get(url, params={"q": f"query {i}"}, timeout=timeout)
+        except Exception:
+            errors += 1
+        latencies.append(time.perf_counter() - start)
+    time.sleep(0.5)  # let losing hedges finish so the stub count includes them
+    stats = transport.latency_report()
+    host = next(iter(stats.values()))
+    return {
+        "p50_ms": round(percentile(latencies, 0.5) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 1),
+        "max_ms": round(max(latencies) * 1000, 1),
+        "errors": errors,
+        "upstream": stubs.counts()["github"],
+        "hedges": host["hedges"],
+        "hedge_wins": host["hedge_wins"],
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--median", type=float, default=20, help="median latency (ms)")
+    parser.add_argument("--tail", type=float, default=0.05, help="share of slow responses")
+    parser.add_argument("--tail-factor", type=float, default=50, help="how much slower a slow response is")
+    parser.add_argument("--budget", type=float, default=0.1, help="hedges allowed per request")
+    parser.add_argument("--timeout", type=float, default=6.0, help="the caller's timeout (s)")
+    args = parser.parse_args(argv)
+
+    profile = Profile(latency_ms=args.median, tail_rate=args.tail, tail_factor=args.tail_factor)
+    with StubProviders({"github": profile}) as stubs:
+        results = {name: run(name, stubs, args.requests, args.budget, args.timeout) for name in CONFIGS}
+
+    print(f"{args.requests} requests, median {args.median:.0f} ms, {args.tail:.0%} of responses {args.tail_factor:.0f}x slower")
+    print(f"  {'config':<9} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8} {'errors':>7} {'upstream':>9} {'hedges':>7} {'won':>5}")
+    for name, r in results.items():
+        print(
+            f"  {name:<9} {r['p50_ms']:>8} {r['p95_ms']:>8} {r['p99_ms']:>8} {r['max_ms']:>8}"
+            f" {r['errors']:>7} {r['upstream']:>9} {r['hedges']:>7} {r['hedge_wins']:>5}"
+        )
+
+    hedged, fixed = results["hedged"], results["fixed"]
+    ok = hedged["p99_ms"] < fixed["p99_ms"] and hedged["hedges"] <= args.budget * hedged["upstream"] + 1
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
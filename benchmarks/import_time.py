@@ -0,0 +1,104 @@
+"""
+Cold-start benchmark - import time of the app entry points and first crew construction
+
+Every sample runs in a fresh interpreter, so nothing is shared between samples
+except the OS file cache. Pass ``--against <git-ref>`` to measure an older
+checkout side by side (e.g. the commit before the lazy registry).
+
+    python benchmarks/import_time.py -n 7
+    python benchmarks/import_time.py --against HEAD~1
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# name -> statements timed in a fresh interpreter
+TARGETS = {
+    "import main (streamlit app)": "import main",
+    "import cli (headless)": "import cli",
+    "import config.crew": "import config.crew",
+    # what `cli.py analyze` pays before the first LLM call
+    "import + first crew": (
+        "import config.crew\n"
+        "config.crew.create_ai_usecase_crew('Benchmark Co')\n"
+    ),
+}
+
+_PROBE = """
+import sys, time
+sys.path.insert(0, {root!r})
+_t = time.perf_counter()
+{code}
+print(time.perf_counter() - _t)
+"""
+
+
+def sample(root: str, code: str) -> float:
+    env = {
+        **os.environ,
+        # construction must not depend on real credentials; nothing is called
+        "GEMINI_API_KEY": os.getenv("GEMINI_API_KEY", "benchmark"),
+        "TAVILY_API_KEY": os.getenv("TAVILY_API_KEY", "benchmark"),
+        "PYTHONDONTWRITEBYTECODE": "1",
+    }
+    probe = _PROBE.format(root=root, code=code)
+    result = subprocess.run(
+        [sys.executable, "-c", probe], cwd=root, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr else "probe failed")
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def measure(root: str, runs: int) -> dict:
+    report = {}
+    for name, code in TARGETS.items():
+        sample(root, code)  # warm the file cache so the first sample isn't an outlier
+        times = [sample(root, code) for _ in range(runs)]
+        report[name] = {"median_s": round(statistics.median(times), 3), "min_s": round(min(times), 3)}
+    return report
+
+
+def checkout(ref: str) -> str:
+    path = tempfile.mkdtemp(prefix="import-bench-")
+    subprocess.run(["git", "worktree", "add", "--detach", path, ref], cwd=ROOT, check=True, capture_output=True)
+    return path
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-n", "--runs", type=int, default=5, help="fresh interpreters per target")
+    parser.add_argument("--against", help="git ref to measure side by side with the working tree")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args(argv)
+
+    results = {"current": measure(ROOT, args.runs)}
+    if args.against:
+        path = checkout(args.against)
+        try:
+            results[args.against] = measure(path, args.runs)
+        finally:
+            subprocess.run(["git", "worktree", "remove", "--force", path], cwd=ROOT, capture_output=True)
+            shutil.rmtree(path, ignore_errors=True)
+
+    columns = list(results)
+    print(f"{'target':<30}" + "".join(f"{c:>14}" for c in columns))
+    for name in TARGETS:
+        print(f"{name:<30}" + "".join(f"{results[c][name]['median_s']:>13.3f}s" for c in columns))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
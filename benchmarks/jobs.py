@@ -0,0 +1,105 @@
+"""
+Job queue check - throughput and latency of JobManager under N concurrent users
+
+Each of ``--users`` threads stands in for a web UI session: it submits one
+company and polls ``status`` until the job finishes, as main.py does. Crews are
+SleepingCrew stand-ins (``--stage-seconds`` per stage, no LLM calls), so the
+numbers are the job system's own: queueing, process hand-off and progress
+reporting. Runs once per entry of ``--workers``, each on a fresh pool warmed
+with one job per worker so process start-up is not counted.
+
+Reports wall time, throughput, p50/p95 submit-to-result latency and queue wait
+(submit to a worker picking the job up). Exits non-zero if a job failed or the
+largest pool was not faster than a single worker.
+
+    python benchmarks/jobs.py --users 8 --workers 1,2,4 --stage-seconds 0.2
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from e2e import percentile  # noqa: E402
+
+FACTORY = "config.jobs:create_sleeping_crew"
+
+
+def user(jobs, company: str, poll: float, out: list):
+    job_id = jobs.submit(company)
+    while True:
+        job = jobs.status(job_id)
+        if job["state"] in ("done", "failed", "cancelled"):
+            out.append(job)
+            return
+        time.sleep(poll)
+
+
+def measure(workers: int, users: int, poll: float) -> dict:
+    from config.jobs import JobManager
+
+    jobs = JobManager(max_workers=workers, crew_factory=FACTORY)
+    try:
+        warm = []
+        threads = [threading.Thread(target=user, args=(jobs, f"Warmup {i}", poll, warm)) for i in range(workers)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        finished = []
+        threads = [threading.Thread(target=user, args=(jobs, f"Company {i}", poll, finished)) for i in range(users)]
+        started = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        wall = time.perf_counter() - started
+    finally:
+        jobs.shutdown()
+
+    latencies = [j["finished_at"] - j["submitted_at"] for j in finished]
+    waits = [j["started_at"] - j["submitted_at"] for j in finished if j["started_at"]]
+    return {
+        "wall_s": round(wall, 2),
+        "per_minute": round(len(finished) / wall * 60, 1),
+        "p50_s": percentile(latencies, 0.5),
+        "p95_s": percentile(latencies, 0.95),
+        "wait_p95_s": percentile(waits, 0.95),
+        "failed": sum(j["state"] != "done" for j in finished),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=8, help="concurrent sessions, one job each")
+    parser.add_argument("--workers", default="1,2,4", help="comma-separated pool sizes")
+    parser.add_argument("--stage-seconds", type=float, default=0.2, help="how long each stand-in stage sleeps")
+    parser.add_argument("--poll", type=float, default=0.05, help="seconds between a session's status polls")
+    args = parser.parse_args(argv)
+
+    # read by the spawned workers' SleepingCrew
+    os.environ["SLEEPING_CREW_STAGE_SECONDS"] = str(args.stage_seconds)
+    pools = [int(w) for w in args.workers.split(",")]
+    results = {w: measure(w, args.users, args.poll) for w in pools}
+
+    print(f"{args.users} concurrent users, {args.stage_seconds:.2f} s per stage")
+    print(f"  {'workers':>7} {'wall s':>7} {'jobs/min':>9} {'p50 s':>6} {'p95 s':>6} {'wait p95':>9} {'failed':>7}")
+    for w, r in results.items():
+        print(
+            f"  {w:>7} {r['wall_s']:>7} {r['per_minute']:>9} {r['p50_s']:>6} {r['p95_s']:>6}"
+            f" {r['wait_p95_s']:>9} {r['failed']:>7}"
+        )
+
+    one, most = results[min(pools)], results[max(pools)]
+    if any(r["failed"] for r in results.values()):
+        return 1
+    return 0 if len(pools) == 1 or most["per_minute"] > one["per_minute"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
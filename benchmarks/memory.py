@@ -0,0 +1,107 @@
+"""
+Agent memory check - peak RSS and embedding calls over a batch of companies
+
+Runs one BatchRunner over ``--companies`` stub companies (``--concurrency`` at a
+time) against the stub providers (see benchmarks/stubs.py), once per entry of
+``--backends``, each in a fresh process. Compact passes share one memory file,
+so a second ``compact`` shows what a rerun of the same companies reuses instead
+of embedding again. Stage and research caches are off so every stage really runs.
+
+Reports wall time, peak RSS, memory records and embedding calls (requests and
+texts sent to the embedding API) per pass.
+
+    python benchmarks/memory.py --companies 100 --backends off,compact,compact
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from e2e import peak_rss_mb  # noqa: E402
+from stubs import Profile, StubProviders  # noqa: E402
+
+
+def run_worker(backend: str, companies: int, concurrency: int, scratch: str, result_file: str):
+    with StubProviders(default=Profile(latency_ms=5)) as stubs:
+        os.environ.update(stubs.env())
+        os.environ.update({
+            "GEMINI_API_KEY": "stub", "TAVILY_API_KEY": "stub",
+            "MEMORY_BACKEND": backend,
+            "MEMORY_PATH": os.path.join(scratch, "memory.sqlite"),
+            "HTTP_CACHE_DISABLED": "1",
+            "STAGE_CACHE_DISABLED": "1",
+            "RESEARCH_STORE_DISABLED": "1",
+            "METADATA_INDEX_DISABLED": "1",
+            "TRACE_PATH": os.path.join(scratch, "traces.sqlite"),
+            "RATE_LIMIT_PATH": os.path.join(scratch, "ratelimit.sqlite"),
+        })
+        run_dir = tempfile.mkdtemp(dir=scratch)
+        os.chdir(run_dir)
+        os.makedirs("outputs", exist_ok=True)
+
+        from config.batch import BatchRunner
+
+        started = time.perf_counter()
+        manifest = BatchRunner(os.path.join(run_dir, "batch"), concurrency=concurrency).run(
+            [{"company": f"Stub Company {i}"} for i in range(companies)]
+        )
+        result = {
+            "backend": backend,
+            "wall_s": round(time.perf_counter() - started, 1),
+            "failed": manifest["failed"],
+            "peak_rss_mb": peak_rss_mb(),
+            "gemini_requests": stubs.counts()["gemini"],
+            "memory": manifest["memory"],
+        }
+    with open(result_file, "w", encoding="utf-8") as f:
+        json.dump(result, f)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--companies", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--backends", default="off,compact,compact", help="comma-separated passes: off, compact, crewai")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--scratch", help=argparse.SUPPRESS)
+    parser.add_argument("--result-file", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        run_worker(args.worker, args.companies, args.concurrency, args.scratch, args.result_file)
+        return 0
+
+    scratch = tempfile.mkdtemp(prefix="bench-memory-")
+    log = open(os.path.join(tempfile.gettempdir(), "bench-memory.log"), "a", encoding="utf-8")
+    print(f"{args.companies} companies, concurrency {args.concurrency}")
+    print(f"  {'pass':<10} {'wall s':>7} {'failed':>7} {'RSS MB':>7} {'records':>8} {'embed calls':>12} {'texts':>7} {'reused':>7}")
+    for backend in args.backends.split(","):
+        result_file = os.path.join(scratch, f"{backend}-{time.time_ns()}.json")
+        subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--worker", backend, "--companies", str(args.companies),
+             "--concurrency", str(args.concurrency), "--scratch", scratch, "--result-file", result_file],
+            stdout=log, stderr=log,
+        )
+        if not os.path.exists(result_file):
+            print(f"  {backend:<10} failed, see {log.name}")
+            continue
+        with open(result_file, encoding="utf-8") as f:
+            r = json.load(f)
+        m = r["memory"]
+        print(
+            f"  {backend:<10} {r['wall_s']:>7} {r['failed']:>7} {r['peak_rss_mb']:>7.0f} {m.get('records', '-'):>8}"
+            f" {m.get('embedding_calls', '-'):>12} {m.get('texts_embedded', '-'):>7} {m.get('embedding_cache_hits', '-'):>7}"
+        )
+    log.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+"""
+Prefetch check - dataset stage wall time with and without searches started during research
+
+Starts the Kaggle and GitHub stubs (see benchmarks/stubs.py) with a ``--median``
+ms median latency and plays one run's dataset side twice:
+
+- off:      ``--research`` seconds of upstream stages, then the dataset agent's
+            searches, one after another on the Kaggle and GitHub tools
+- prefetch: the same, with a tools.prefetch.WarmCache seeded with the industry
+            at the start and fed the research output when it "finishes"
+
+The searches are the kind the dataset agent makes for a retail portfolio: some
+match a category or research term the warm cache fetched, some don't. Reports
+the dataset stage's wall time, hit rate, saved seconds by the cache's own
+accounting and requests that reached the stubs. The response cache and metadata
+index are disabled so every miss goes upstream.
+
+    python benchmarks/prefetch.py --median 400 --research 3
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["HTTP_CACHE_DISABLED"] = "1"
+os.environ["METADATA_INDEX_DISABLED"] = "1"
+os.environ.setdefault("RATE_LIMIT_PATH", os.path.join(tempfile.mkdtemp(), "ratelimit.sqlite"))
+
+from benchmarks.stubs import Profile, StubProviders  # noqa: E402
+from tools import prefetch  # noqa: E402
+
+INDUSTRY = "Retail"
+
+RESEARCH = (
+    "Stub Retail runs 2,000 stores. Inventory shrink and stock-outs cost 3% of sales; inventory "
+    "visibility across the supply chain is weak. Loyalty members drive 60% of revenue and loyalty "
+    "churn is rising. Competitors use demand forecasting and shelf cameras for inventory; the supply "
+    "chain team is piloting route optimization. Customer loyalty programs are being rebuilt."
+)
+
+SEARCHES = [
+    "retail demand forecasting predictive analytics",
+    "retail customer reviews natural language processing",
+    "retail shelf images computer vision",
+    "retail invoice process automation",
+    "retail inventory stock levels",
+    "retail loyalty program churn",
+    "retail supply chain delays",
+    "retail store foot traffic",
+    "retail price elasticity",
+    "retail fraud detection transactions",
+]
+
+
+def dataset_stage(tools) -> float:
+    started = time.perf_counter()
+    for query in SEARCHES:
+        for tool in tools:
+            tool._run(query)
+    return time.perf_counter() - started
+
+
+def measure(mode: str, tools, stubs: StubProviders, research: float):
+    stubs.reset()
+    warm = prefetch.WarmCache("Stub Retail", INDUSTRY) if mode == "prefetch" else None
+    with prefetch.use(warm):
+        time.sleep(research)  # the research, industry and use case stages
+        if warm is not None:
+            warm.research_finished(SimpleNamespace(raw=RESEARCH, pydantic=None))
+            time.sleep(research / 2)
+        wall = dataset_stage(tools)
+    counts = stubs.counts()
+    stats = warm.summary() if warm is not None else {}
+    return {
+        "dataset_s": round(wall, 2),
+        "hit_rate": stats.get("hit_rate", 0.0),
+        "saved_s": stats.get("saved_seconds", 0.0),
+        "prefetched": stats.get("queries", 0),
+        "upstream": counts["kaggle"] + counts["github"],
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--median", type=float, default=400, help="median stub latency (ms)")
+    parser.add_argument("--research", type=float, default=3, help="seconds the upstream stages take")
+    args = parser.parse_args(argv)
+
+    with StubProviders(default=Profile(latency_ms=args.median)) as stubs:
+        os.environ.update(stubs.env())
+        # the warm cache searches with the registry's tools, so the stage does too (built now, on the stub URLs)
+        from config.registry import get_tool
+
+        tools = [get_tool("kaggle"), get_tool("github")]
+        results = {mode: measure(mode, tools, stubs, args.research) for mode in ("off", "prefetch")}
+
+    print(f"{len(SEARCHES)} searches x {len(tools)} tools after {args.research:.0f} s of research, median {args.median:.0f} ms")
+    print(f"  {'mode':<9} {'dataset s':>9} {'hit rate':>9} {'saved s':>8} {'prefetched':>11} {'upstream':>9}")
+    for mode, r in results.items():
+        print(
+            f"  {mode:<9} {r['dataset_s']:>9} {r['hit_rate']:>9} {r['saved_s']:>8}"
+            f" {r['prefetched']:>11} {r['upstream']:>9}"
+        )
+
+    off, warm = results["off"], results["prefetch"]
+    return 0 if warm["hit_rate"] > 0 and warm["dataset_s"] < off["dataset_s"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
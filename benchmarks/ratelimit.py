@@ -0,0 +1,87 @@
+"""
+Shared rate limiter check - several processes drawing from one provider budget
+
+Starts ``--procs`` background worker processes that each take ``--calls``
+permits from a "gemini" budget of ``--rpm`` requests per minute, all pointed at
+one scratch bucket file. Partway through, one priority-lane caller (standing in
+for a proposal stage) asks for a permit. Reports the rate the workers actually
+got and how long the priority caller waited compared with a background caller
+queued at the same moment. Exits non-zero if the combined rate overshoots
+the budget (plus its burst) or the priority caller was not served first.
+
+    python benchmarks/ratelimit.py --procs 4 --rpm 600
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.ratelimit import RateBudgets, lane  # noqa: E402
+
+
+def worker(path: str, rpm: float, calls: int, lane_name: str, out):
+    budgets = RateBudgets(path)
+    budgets.configure("gemini", rpm)
+    stamps = []
+    with lane(lane_name):
+        for _ in range(calls):
+            asked = time.time()
+            budgets.acquire("gemini")
+            stamps.append((asked, time.time()))
+    out.put((lane_name, stamps))
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--procs", type=int, default=4, help="background worker processes")
+    parser.add_argument("--calls", type=int, default=40, help="permits each worker takes")
+    parser.add_argument("--rpm", type=float, default=600, help="shared requests per minute")
+    args = parser.parse_args(argv)
+
+    path = os.path.join(tempfile.mkdtemp(), "ratelimit.sqlite")
+    out = multiprocessing.Queue()
+    workers = [
+        multiprocessing.Process(target=worker, args=(path, args.rpm, args.calls, "background", out))
+        for _ in range(args.procs)
+    ]
+    started = time.time()
+    for p in workers:
+        p.start()
+
+    # let the workers drain the burst and build a queue, then arrive in both lanes at once
+    time.sleep(1.0)
+    late = [
+        multiprocessing.Process(target=worker, args=(path, args.rpm, 1, name, out))
+        for name in ("background", "priority")
+    ]
+    for p in late:
+        p.start()
+
+    results = [out.get() for _ in range(args.procs + len(late))]
+    for p in [*workers, *late]:
+        p.join()
+
+    grants = sorted(granted for _, stamps in results for _, granted in stamps)
+    elapsed = grants[-1] - started
+    burst = max(1.0, args.rpm / 6)
+    allowed = burst + elapsed * args.rpm / 60
+    steady_rpm = max(0.0, len(grants) - burst) / elapsed * 60
+    singles = {name: stamps[0] for name, stamps in results if len(stamps) == 1}
+    waits = {name: round(granted - asked, 3) for name, (asked, granted) in singles.items()}
+
+    print(f"{len(grants)} permits across {args.procs + len(late)} processes in {elapsed:.2f}s")
+    print(f"  budget {args.rpm:.0f} rpm (+{burst:.0f} burst) -> allowed <= {allowed:.0f}, got {len(grants)}")
+    print(f"  steady rate after the burst: {steady_rpm:.0f} rpm")
+    print(f"  late arrivals waited: priority {waits['priority']}s, background {waits['background']}s")
+
+    ok = len(grants) <= allowed + 1 and singles["priority"][1] <= singles["background"][1]
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+"""
+Structured-output benchmark - parse/validation time and downstream prompt tokens
+
+Builds a 12-use-case portfolio like the use case stage produces (the one the
+tests use, tests/portfolios.py) and compares
+the structured path (schema JSON -> validated models) with the markdown path
+(prose -> split_use_cases):
+
+- parse: time to turn the stage output into a list of use cases
+- dataset prompts: tokens the per-use-case resource subtasks receive
+- proposal context: tokens of the digest built from each form
+
+Exits non-zero if validating the schema JSON is not faster than splitting the
+markdown.
+
+    python benchmarks/structured_outputs.py -n 200
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "tests"))
+
+from config.compaction import compact_context, count_tokens  # noqa: E402
+from config.schemas import UseCasePortfolio  # noqa: E402
+from portfolios import prose_markdown, sample_portfolio  # noqa: E402
+from utils import split_use_cases  # noqa: E402
+
+def median_ms(fn, runs: int) -> float:
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return round(statistics.median(times), 3)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-n", "--runs", type=int, default=100, help="repetitions per timing")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args(argv)
+
+    portfolio = sample_portfolio()
+    as_json = portfolio.model_dump_json()
+    as_prose = prose_markdown(portfolio)
+
+    parsed = split_use_cases(as_prose)
+    assert len(parsed) == len(portfolio.use_cases), "markdown fixture no longer splits cleanly"
+
+    results = {
+        "use_cases": len(portfolio.use_cases),
+        "parse_ms": {
+            "schema (model_validate_json)": median_ms(lambda: UseCasePortfolio.model_validate_json(as_json), args.runs),
+            "markdown (split_use_cases)": median_ms(lambda: split_use_cases(as_prose), args.runs),
+            "render (to_markdown)": median_ms(portfolio.to_markdown, args.runs),
+        },
+        "dataset_prompt_tokens": {
+            "markdown blocks": sum(count_tokens(uc["text"]) for uc in parsed),
+            "schema brief()": sum(count_tokens(uc.brief()) for uc in portfolio.use_cases),
+        },
+        "proposal_context_tokens": {
+            "prose": count_tokens(as_prose),
+            "prose digest": compact_context({"usecases": as_prose})[1]["tokens_after"],
+            "rendered schema digest": compact_context({"usecases": portfolio.to_markdown()})[1]["tokens_after"],
+        },
+    }
+
+    for section, rows in results.items():
+        if not isinstance(rows, dict):
+            print(f"{section}: {rows}")
+            continue
+        print(f"\n{section}")
+        for name, value in rows.items():
+            print(f"  {name:<32}{value:>10}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    parse = results["parse_ms"]
+    return 0 if parse["schema (model_validate_json)"] < parse["markdown (split_use_cases)"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
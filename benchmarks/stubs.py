@@ -0,0 +1,302 @@
+"""
+Stub provider servers - local stand-ins for Gemini, Tavily, Kaggle, GitHub and HuggingFace
+
+Each provider gets its own localhost server (so per-host pooling and stats in
+tools.transport behave as they do against the real hosts). Every server answers
+in its provider's response shape after a delay drawn from a log-normal
+distribution around ``latency_ms``; a ``tail_rate`` share of requests take
+``tail_factor`` times longer (a heavy tail). It fails a ``error_rate`` share of
+requests with a 503. It also counts requests, so benchmarks can report
+outbound traffic.
+
+The Gemini stub plays a well-behaved agent (and answers embedding requests). On a turn that declares tools
+and has no tool result yet, it calls the first declared tool. After that it
+answers in text. When a response schema is requested, it answers with JSON
+built from that schema.
+
+    with StubProviders({"gemini": Profile(latency_ms=200)}) as stubs:
+        os.environ.update(stubs.env())
+"""
+
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+PROVIDERS = ("gemini", "tavily", "kaggle", "github", "huggingface")
+
+# crewai's pseudo-tool for structured output when a task has both tools and a response schema
+STRUCTURED_OUTPUT_TOOL = "structured_output"
+
+
+class Profile:
+    """Latency and error distribution for one stub provider"""
+
+    def __init__(self, latency_ms: float = 50, jitter: float = 0.3, error_rate: float = 0.0,
+                 tail_rate: float = 0.0, tail_factor: float = 20.0):
+        self.latency_ms = latency_ms
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.tail_rate = tail_rate
+        self.tail_factor = tail_factor
+
+    def delay(self) -> float:
+        if self.latency_ms <= 0:
+            return 0.0
+        # log-normal around the median: a realistic long right tail
+        seconds = self.latency_ms / 1000 * math.exp(random.gauss(0, self.jitter))
+        return seconds * self.tail_factor if random.random() < self.tail_rate else seconds
+
+    @classmethod
+    def parse(cls, spec: str) -> "Profile":
+        """'200', '200:0.05' or '200:0.05:0.02' -> 200 ms median latency, 5% 503s, 2% 20x slower"""
+        latency, errors, tail = (spec.split(":") + ["", ""])[:3]
+        return cls(latency_ms=float(latency), error_rate=float(errors or 0), tail_rate=float(tail or 0))
+
+
+def example_from_schema(schema: Dict, root: Optional[Dict] = None, depth: int = 0):
+    """A small instance of a JSON schema (or Gemini's upper-case variant)"""
+    root = root or schema
+    if "$ref" in schema:
+        name = schema["$ref"].rsplit("/", 1)[-1]
+        return example_from_schema((root.get("$defs") or root.get("definitions") or {})[name], root, depth)
+    for key in ("anyOf", "oneOf", "any_of"):
+        if key in schema:
+            options = [s for s in schema[key] if str(s.get("type", "")).lower() != "null"]
+            return example_from_schema(options[0] if options else {}, root, depth) if options else None
+    kind = str(schema.get("type", "object" if "properties" in schema else "string")).lower()
+    if kind == "object":
+        if depth > 4:
+            return {}
+        return {name: example_from_schema(sub, root, depth + 1) for name, sub in (schema.get("properties") or {}).items()}
+    if kind == "array":
+        return [example_from_schema(schema.get("items") or {}, root, depth + 1) for _ in range(2)]
+    if kind in ("integer", "number"):
+        return 3
+    if kind == "boolean":
+        return True
+    if schema.get("enum"):
+        return schema["enum"][0]
+    return "Stub value with $2.5M annual savings (18% cost reduction), see https://example.com/report"
+
+
+def _pick(mapping: Dict, *names):
+    """The google-genai SDK sends some fields in camelCase and others in snake_case"""
+    for name in names:
+        if mapping.get(name):
+            return mapping[name]
+    return None
+
+
+def _parameters(declaration: Dict) -> Dict:
+    return _pick(declaration, "parameters", "parametersJsonSchema", "parameters_json_schema") or {}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real APIs
+    # headers and body go out as two writes; with Nagle on, a reused connection stalls on the delayed ACK
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def _body(self) -> Dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        try:
+            return json.loads(self.rfile.read(length))
+        except ValueError:
+            return {}
+
+    def _handle(self):
+        stub: "_Stub" = self.server.stub
+        body = self._body() if self.command == "POST" else {}
+        stub.count()
+        time.sleep(stub.profile.delay())
+        if random.random() < stub.profile.error_rate:
+            return self._send(503, {"error": "stub overloaded"})
+        self._send(200, stub.respond(self.path, body))
+
+    do_GET = _handle
+    do_POST = _handle
+
+    def _send(self, status: int, payload):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        try:
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client gave up: a timeout, or the losing half of a hedged pair
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # the default backlog of 5 drops connection bursts (one client opening a connection per in-flight request)
+    request_queue_size = 1024
+
+
+class _Stub:
+    def __init__(self, provider: str, profile: Profile):
+        self.provider = provider
+        self.profile = profile
+        self.requests = 0
+        self._lock = threading.Lock()
+        self.server = _Server(("127.0.0.1", 0), _Handler)
+        self.server.stub = self
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_port}"
+
+    def count(self):
+        with self._lock:
+            self.requests += 1
+
+    def respond(self, path: str, body: Dict):
+        return getattr(self, f"_{self.provider}")(path, body)
+
+    @staticmethod
+    def _query(path: str) -> str:
+        match = re.search(r"[?&](?:q|search)=([^&]+)", path)
+        return match.group(1).replace("+", " ") if match else "stub"
+
+    def _tavily(self, path, body):
+        query = body.get("query", "stub")
+        domains = body.get("include_domains") or ["example.com"]
+        return {
+            "query": query,
+            "answer": None,
+            "results": [
+                {
+                    "title": f"{query} - report {i}",
+                    "url": f"https://{domains[i % len(domains)]}/article-{i}",
+                    "content": f"Analysts estimate {10 + i}% growth; the market reached ${i + 1}.2B in 2024.",
+                    "score": round(0.9 - i * 0.1, 2),
+                }
+                for i in range(min(5, body.get("max_results") or 5))
+            ],
+            "response_time": 0.1,
+        }
+
+    def _kaggle(self, path, body):
+        query = self._query(path)
+        return [
+            {"ref": f"stub/{query.replace(' ', '-')}-{i}", "title": f"{query} dataset {i}", "size": "12MB",
+             "licenses": [{"name": "CC0"}], "subtitle": f"Records for {query}"}
+            for i in range(3)
+        ]
+
+    def _github(self, path, body):
+        query = self._query(path)
+        return {"items": [
+            {"name": f"{query.replace(' ', '-')}-{i}", "full_name": f"stub/{query.replace(' ', '-')}-{i}",
+             "html_url": f"https://github.com/stub/repo-{i}", "stargazers_count": 500 - i * 100,
+             "description": f"Reference implementation for {query}"}
+            for i in range(3)
+        ]}
+
+    def _huggingface(self, path, body):
+        query = self._query(path)
+        return [
+            {"id": f"stub/{query.replace(' ', '-')}-{i}", "downloads": 1000 - i, "likes": 10 + i,
+             "description": f"Benchmark data for {query}"}
+            for i in range(3)
+        ]
+
+    def _gemini(self, path, body):
+        if "mbedContent" in path:
+            return self._gemini_embeddings(body)
+        contents = body.get("contents") or []
+        parts = [p for c in contents for p in c.get("parts", [])]
+        answered_tool = any("functionResponse" in p or "function_response" in p for p in parts)
+        declared = [
+            f for tool in body.get("tools") or [] for f in _pick(tool, "functionDeclarations", "function_declarations") or []
+        ]
+        config = _pick(body, "generationConfig", "generation_config") or {}
+        schema = _pick(config, "responseJsonSchema", "response_json_schema", "responseSchema", "response_schema")
+
+        structured = next((f for f in declared if f.get("name") == STRUCTURED_OUTPUT_TOOL), None)
+        real_tools = [f for f in declared if f.get("name") != STRUCTURED_OUTPUT_TOOL]
+        if real_tools and not answered_tool:
+            tool = real_tools[0]
+            args = example_from_schema({"type": "object", **_parameters(tool)})
+            args = {k: ("AI use cases in retail" if isinstance(v, str) else v) for k, v in args.items()}
+            part = {"functionCall": {"name": tool["name"], "args": args}}
+        elif structured is not None:
+            args = example_from_schema({"type": "object", **_parameters(structured)})
+            part = {"functionCall": {"name": STRUCTURED_OUTPUT_TOOL, "args": args}}
+        elif schema:
+            part = {"text": json.dumps(example_from_schema(schema))}
+        else:
+            part = {"text": (
+                "## Findings\n\n- Revenue reached $96.8B in 2023 (https://example.com/annual-report).\n"
+                "- Predictive maintenance cut downtime 20% at a peer.\n\nThe company should prioritize AI in operations."
+            )}
+
+        prompt_tokens = len(json.dumps(contents)) // 4
+        completion_tokens = len(json.dumps(part)) // 4
+        return {
+            "candidates": [{"content": {"role": "model", "parts": [part]}, "finishReason": "STOP", "index": 0}],
+            "usageMetadata": {
+                "promptTokenCount": prompt_tokens,
+                "candidatesTokenCount": completion_tokens,
+                "totalTokenCount": prompt_tokens + completion_tokens,
+            },
+            "modelVersion": "stub",
+        }
+
+    @staticmethod
+    def _gemini_embeddings(body):
+        """A deterministic pseudo-random vector per text, so equal texts embed equally"""
+        vectors = []
+        for request in body.get("requests") or [body]:
+            text = " ".join(p.get("text", "") for p in (request.get("content") or {}).get("parts", []))
+            size = request.get("outputDimensionality") or request.get("output_dimensionality") or 256
+            rng = random.Random(hashlib.sha256(text.encode("utf-8")).digest())
+            vectors.append({"values": [rng.uniform(-1, 1) for _ in range(size)]})
+        return {"embeddings": vectors}
+
+
+class StubProviders:
+    """All five stub servers, started and stopped together"""
+
+    def __init__(self, profiles: Optional[Dict[str, Profile]] = None, default: Optional[Profile] = None):
+        profiles = profiles or {}
+        self.stubs = {p: _Stub(p, profiles.get(p) or default or Profile()) for p in PROVIDERS}
+
+    def __enter__(self) -> "StubProviders":
+        for stub in self.stubs.values():
+            threading.Thread(target=stub.server.serve_forever, daemon=True, name=f"stub-{stub.provider}").start()
+        return self
+
+    def __exit__(self, *exc):
+        for stub in self.stubs.values():
+            stub.server.shutdown()
+            stub.server.server_close()
+
+    def env(self) -> Dict[str, str]:
+        """Environment that points the pipeline's clients and tools at the stubs"""
+        return {
+            "GEMINI_BASE_URL": self.stubs["gemini"].url,
+            "TAVILY_API_URL": self.stubs["tavily"].url,
+            "TAVILY_SEARCH_URL": f"{self.stubs['tavily'].url}/search",
+            "KAGGLE_API_URL": self.stubs["kaggle"].url,
+            "GITHUB_API_URL": self.stubs["github"].url,
+            "HUGGINGFACE_API_URL": f"{self.stubs['huggingface'].url}/api",
+        }
+
+    def counts(self) -> Dict[str, int]:
+        return {p: stub.requests for p, stub in self.stubs.items()}
+
+    def reset(self):
+        for stub in self.stubs.values():
+            stub.requests = 0
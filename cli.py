@@ -0,0 +1,190 @@
+"""
+Command-line entry point for the AI Use Case Generation System
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+
+def cmd_analyze(args) -> int:
+    """Analyze one company, printing stage and tool events as they happen"""
+    if args.record or args.replay:
+        # read by config.cassette when the run starts
+        os.environ["CASSETTE_MODE"] = "record" if args.record else "replay"
+        os.environ["CASSETTE_DIR"] = args.cassette_dir
+        os.environ["CASSETTE_LATENCY"] = str(args.latency)
+
+    from config.crew import create_ai_usecase_crew
+
+    crew_system = create_ai_usecase_crew(args.company)
+    started = time.time()
+
+    for event in crew_system.stream():
+        elapsed = f"[{event['time'] - started:7.1f}s]"
+        kind = event["type"]
+
+        if kind == "task_started":
+            print(f"{elapsed} ▶ {event['task']}")
+        elif kind == "task_finished":
+            note = " (cached)" if event.get("cached") else ""
+            print(f"{elapsed} ✔ {event['task']}{note}")
+            if args.show_stages and event["task"] != "proposal":
+                print(f"\n{event['output']}\n")
+        elif kind == "task_failed":
+            print(f"{elapsed} ✖ {event['task']}: {event['error']}")
+        elif kind == "tool_started" and args.verbose:
+            print(f"{elapsed}   🔧 {event['tool']}: {event['input']}")
+        elif kind == "context_compacted" and args.verbose:
+            print(
+                f"{elapsed}   🗜 {event['task']} context: {event['tokens_before']} → {event['tokens_after']} tokens, "
+                f"{event['facts_retained']}/{event['facts']} facts kept"
+            )
+        elif kind == "partial_output" and args.verbose:
+            print(f"{elapsed}   … {event['task']}: {event['use_case']}")
+        elif kind == "run_failed":
+            print(f"❌ Error occurred: {event['error']}", file=sys.stderr)
+            return 1
+        elif kind == "run_finished":
+            print(f"{elapsed} ✅ Analysis completed!\n")
+            if args.output:
+                with open(args.output, "w", encoding="utf-8") as f:
+                    f.write(event["output"])
+                print(f"💾 Proposal saved to {args.output}")
+            else:
+                print(event["output"])
+    return 0
+
+
+def cmd_batch(args) -> int:
+    """Analyze every company in a CSV/JSONL file; rerunning resumes from the checkpoint"""
+    from config.batch import BatchRunner, read_companies
+
+    crew_factory = None
+    if args.crew_factory:
+        from config.jobs import load_factory
+        crew_factory = load_factory(args.crew_factory)
+
+    runner = BatchRunner(
+        args.out,
+        concurrency=args.concurrency,
+        llm_rpm=args.llm_rpm,
+        http_rpm=args.http_rpm,
+        crew_factory=crew_factory,
+    )
+    manifest = runner.run(read_companies(args.input))
+    print(
+        f"\n📦 {manifest['succeeded']}/{manifest['companies']} succeeded, "
+        f"{manifest['total_tokens']} tokens, {manifest['wall_seconds_this_run']}s - manifest: {runner.manifest_path}"
+    )
+    return 0 if manifest["failed"] == 0 else 1
+
+
+def cmd_traces(args) -> int:
+    """p50/p95 latency per stage, tool, external host and LLM-calling stage across recent runs"""
+    from config.tracing import trace_store
+
+    report = trace_store.report(runs=args.runs, company=args.company)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+    if not report["runs"]:
+        print(f"No traced runs in {trace_store.path}")
+        return 0
+
+    def table(title, rows, *extra):
+        print(f"\n{title}")
+        print(f"  {'name':<36}{'count':>7}{'p50 s':>9}{'p95 s':>9}{'errors':>8}" + "".join(f"{c:>19}" for c in extra))
+        for name, row in rows.items():
+            p50 = "-" if row["p50_s"] is None else f"{row['p50_s']:.2f}"
+            p95 = "-" if row["p95_s"] is None else f"{row['p95_s']:.2f}"
+            print(
+                f"  {name[:35]:<36}{row['count']:>7}{p50:>9}{p95:>9}{row['errors']:>8}"
+                + "".join(f"{row[c]:>19g}" for c in extra)
+            )
+
+    print(f"📊 {report['runs']} run(s) from {trace_store.path}")
+    table("Runs", {"full run": report["run"]})
+    table("Stages", report["stages"], "cached")
+    table("Tools", report["tools"], "cache_hits", "cache_misses", "collapsed", "bytes")
+    table("External hosts", report["hosts"], "retries", "bytes")
+    table("LLM calls by stage", report["llm"], "prompt_tokens", "completion_tokens")
+    return 0
+
+
+def cmd_index(args) -> int:
+    """Build, refresh and query the offline dataset/repository metadata index"""
+    from tools.metadata_index import metadata_index
+
+    if args.action == "import":
+        if not args.paths:
+            print("❌ Give one or more JSONL dumps to import", file=sys.stderr)
+            return 1
+        started = time.time()
+        result = metadata_index.import_jsonl(args.paths, source=args.source)
+        print(f"📥 {result['added']} records added, {result['skipped']} skipped in {time.time() - started:.1f}s")
+    elif args.action == "refresh":
+        print(f"📥 {metadata_index.refresh()} remembered network results added")
+    elif args.action == "compact":
+        print(f"🗜 {metadata_index.compact()} records in one segment")
+    elif args.action == "search":
+        query = " ".join(args.paths)
+        started = time.perf_counter()
+        hits = metadata_index.search(query, source=args.source, k=args.limit)
+        print(f"🔎 {len(hits)} results in {(time.perf_counter() - started) * 1000:.1f} ms")
+        for hit in hits:
+            print(f"  {hit['score']:>7.2f}  [{hit['source']}] {hit['title']} - {hit['url']}")
+    print(json.dumps(metadata_index.summary(), indent=2))
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="AI Use Case Generator (headless)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    analyze = sub.add_parser("analyze", help="generate a proposal for one company")
+    analyze.add_argument("company", help="company name, e.g. Tesla")
+    analyze.add_argument("-o", "--output", help="write the final proposal to this file")
+    analyze.add_argument("--show-stages", action="store_true", help="print each stage's output as it finishes")
+    analyze.add_argument("-v", "--verbose", action="store_true", help="also print tool calls and partial outputs")
+    cassette = analyze.add_mutually_exclusive_group()
+    cassette.add_argument("--record", action="store_true", help="record every LLM and HTTP exchange to a cassette")
+    cassette.add_argument("--replay", action="store_true", help="replay a recorded cassette with no network")
+    analyze.add_argument("--cassette-dir", default="cassettes", help="where cassettes are written and read")
+    analyze.add_argument("--latency", type=float, default=0.0, help="replay at this fraction of the recorded response times")
+    analyze.set_defaults(func=cmd_analyze)
+
+    batch = sub.add_parser("batch", help="generate proposals for a list of companies")
+    batch.add_argument("input", help="CSV with a 'company' column (or one company per row) or JSONL")
+    batch.add_argument("--out", default="outputs/batch", help="directory for proposals, checkpoint and manifest")
+    batch.add_argument("-c", "--concurrency", type=int, default=4, help="companies analyzed at the same time")
+    batch.add_argument("--llm-rpm", type=float, help="LLM calls per minute, shared with other processes on this host")
+    batch.add_argument("--http-rpm", type=float, help="outbound search requests per minute, shared with other processes on this host")
+    batch.add_argument("--crew-factory", help="module:callable building the crew (e.g. config.jobs:create_sleeping_crew)")
+    batch.set_defaults(func=cmd_batch)
+
+    index = sub.add_parser("index", help="offline dataset/repository metadata index")
+    index.add_argument("action", choices=["import", "search", "refresh", "compact", "stats"])
+    index.add_argument("paths", nargs="*", help="JSONL dumps to import, or the search query")
+    index.add_argument("--source", choices=["kaggle", "huggingface", "github", "other"], help="source of the dump / filter for search")
+    index.add_argument("-k", "--limit", type=int, default=5, help="results to show for search")
+    index.set_defaults(func=cmd_index)
+
+    traces = sub.add_parser("traces", help="latency and token report from the local trace store")
+    traces.add_argument("--runs", type=int, default=20, help="most recent runs to include")
+    traces.add_argument("--company", help="only runs for this company")
+    traces.add_argument("--json", action="store_true", help="print the raw report as JSON")
+    traces.set_defaults(func=cmd_traces)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,163 @@
+"""
+Batch Runner - analyze a list of companies with bounded concurrency
+"""
+
+import csv
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from config import events, memory
+from config.research_store import research_store
+from config.stage_cache import normalize_company
+from tools.circuit_breaker import breakers
+from tools.ratelimit import lane, rate_budgets
+from tools.singleflight import tool_calls
+from utils import company_slug
+
+
+def read_companies(path: str) -> List[Dict[str, str]]:
+    """Load companies from CSV (a "company" column, else the first column) or JSONL ({"company": ...})"""
+    rows = []
+    with open(path, encoding="utf-8", newline="") as f:
+        if path.endswith((".jsonl", ".ndjson")):
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    rows.append(record if isinstance(record, dict) else {"company": str(record)})
+        else:
+            reader = csv.reader(f)
+            header = next(reader, None) or []
+            lowered = [h.strip().lower() for h in header]
+            if "company" in lowered:
+                for values in reader:
+                    rows.append(dict(zip(lowered, (v.strip() for v in values))))
+            else:
+                # no header row: every row is "company[,industry]"
+                for values in [header, *reader]:
+                    if values:
+                        rows.append({"company": values[0].strip(), **({"industry": values[1].strip()} if len(values) > 1 else {})})
+
+    seen, companies = set(), []
+    for row in rows:
+        name = (row.get("company") or "").strip()
+        if name and normalize_company(name) not in seen:
+            seen.add(normalize_company(name))
+            companies.append({**row, "company": name})
+    return companies
+
+
+class BatchRunner:
+    """Runs ``AIUseCaseGenerationCrew`` for many companies.
+
+    Up to ``concurrency`` crews run at once, and all of them draw on the same
+    LLM and HTTP rate budgets (requests per minute). Every finished company is
+    appended to ``checkpoint.jsonl`` in the output directory, so a rerun of an
+    interrupted batch skips it. ``manifest.json`` summarizes timing and token
+    usage per company.
+    """
+
+    def __init__(
+        self,
+        out_dir: str,
+        concurrency: int = 4,
+        llm_rpm: Optional[float] = None,
+        http_rpm: Optional[float] = None,
+        crew_factory=None,
+    ):
+        self.out_dir = out_dir
+        self.concurrency = concurrency
+        self.checkpoint_path = os.path.join(out_dir, "checkpoint.jsonl")
+        self.manifest_path = os.path.join(out_dir, "manifest.json")
+        self._lock = threading.Lock()
+
+        if crew_factory is None:
+            from config.crew import create_ai_usecase_crew as crew_factory
+        self.crew_factory = crew_factory
+
+        if llm_rpm is not None:
+            rate_budgets.configure("llm", llm_rpm)
+        if http_rpm is not None:
+            rate_budgets.configure("http", http_rpm)
+
+    def load_checkpoint(self) -> Dict[str, Dict]:
+        done = {}
+        if os.path.exists(self.checkpoint_path):
+            with open(self.checkpoint_path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # torn last line from an interrupted write
+                    if record.get("status") == "ok":
+                        done[normalize_company(record["company"])] = record
+        return done
+
+    def _checkpoint(self, record: Dict):
+        with self._lock, open(self.checkpoint_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+
+    def _run_one(self, row: Dict[str, str]) -> Dict:
+        company = row["company"]
+        usage = {"llm_calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+
+        def on_event(event):
+            if event["type"] == "llm_call_finished":
+                with self._lock:
+                    usage["llm_calls"] += 1
+                    for key in ("prompt_tokens", "completion_tokens", "total_tokens"):
+                        usage[key] += event.get(key, 0)
+
+        record = {"company": company, "started_at": time.time()}
+        try:
+            with events.bind(on_event), lane("background"):
+                # companies in one industry share its research (see config.research_store)
+                industry = {"industry": row["industry"]} if row.get("industry") else {}
+                result = self.crew_factory(company, **industry).kickoff()
+                events.flush()
+            proposal_path = os.path.join(self.out_dir, f"{company_slug(company)}_proposal.md")
+            with open(proposal_path, "w", encoding="utf-8") as f:
+                f.write(str(result))
+            record.update(status="ok", proposal=proposal_path)
+        except Exception as e:
+            record.update(status="failed", error=str(e))
+
+        record["seconds"] = round(time.time() - record["started_at"], 2)
+        record["usage"] = usage
+        self._checkpoint(record)
+        print(f"{'✅' if record['status'] == 'ok' else '❌'} {company} ({record['seconds']}s)", flush=True)
+        return record
+
+    def run(self, companies: List[Dict[str, str]]) -> Dict:
+        os.makedirs(self.out_dir, exist_ok=True)
+        done = self.load_checkpoint()
+        todo = [row for row in companies if normalize_company(row["company"]) not in done]
+        print(f"📋 {len(companies)} companies: {len(done)} already done, {len(todo)} to run", flush=True)
+
+        started = time.time()
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="batch") as pool:
+            results = list(pool.map(self._run_one, todo))
+
+        # the manifest covers the whole input, including companies finished in earlier runs
+        by_company = {normalize_company(r["company"]): r for r in [*done.values(), *results]}
+        records = [by_company[normalize_company(row["company"])] for row in companies]
+        manifest = {
+            "companies": len(records),
+            "succeeded": sum(r["status"] == "ok" for r in records),
+            "failed": sum(r["status"] != "ok" for r in records),
+            "wall_seconds_this_run": round(time.time() - started, 2),
+            "total_tokens": sum(r["usage"]["total_tokens"] for r in records),
+            # identical tool queries from concurrent crews that shared one upstream request
+            "tool_calls": tool_calls.summary(),
+            "rate_limits": rate_budgets.summary(),
+            "research_store": research_store.summary(),
+            "breakers": breakers.summary(),
+            "memory": memory.summary(),
+            "results": records,
+        }
+        with open(self.manifest_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        return manifest
@@ -0,0 +1,318 @@
+"""
+Cassettes - record a run's LLM and tool HTTP exchanges and replay them offline
+"""
+
+import contextvars
+import functools
+import gzip
+import hashlib
+import importlib
+import inspect
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional
+
+from utils import company_slug
+
+MODES = ("record", "replay")
+
+# identifiers CrewAI and providers mint per call; they must not make two identical requests differ
+_VOLATILE_KEYS = {"id", "tool_call_id", "call_id", "response_id"}
+
+_active: contextvars.ContextVar[Optional["Cassette"]] = contextvars.ContextVar("cassette", default=None)
+
+
+class CassetteMiss(LookupError):
+    """A replayed run made a request the cassette holds no answer for"""
+
+
+class Cassette:
+    """The LLM and HTTP exchanges of a run, stored as gzipped JSON lines (one line per distinct request).
+
+    In record mode requests go out as usual (HTTP still reads through the response
+    cache) and every answer is kept until ``save()``. In replay mode answers come
+    only from the file; nothing reaches the network, and a request the cassette
+    doesn't hold raises CassetteMiss. Requests are matched on content (the HTTP
+    cache key; model, messages, tool names and response schema for LLM calls), not
+    on order, so stages running side by side replay correctly. A request recorded
+    several times replays its answers in order, then repeats the last one.
+    ``latency`` scales the recorded response times: 0 answers instantly, 1 as recorded.
+    """
+
+    def __init__(self, path: str, mode: str, latency: float = 0.0):
+        if mode not in MODES:
+            raise ValueError(f"Unknown cassette mode {mode!r}; expected one of {', '.join(MODES)}")
+        self.path = path
+        self.mode = mode
+        self.latency = latency
+        self.entries: Dict[str, Dict] = {}
+        self.stats = {"recorded": 0, "replayed": 0, "misses": 0}
+        self._served: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        if mode == "replay":
+            self.load()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            raise FileNotFoundError(f"No cassette at {self.path}; record one first")
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    self.entries[entry["key"]] = entry
+
+    def save(self):
+        """Write the recorded exchanges (record mode only), replacing the file atomically"""
+        if self.mode != "record":
+            return
+        from config import events
+
+        events.flush()  # LLM usage arrives through CrewAI's event bus after the call returns
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        # concurrent recordings of one company share a path; each needs a temp file of its own
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(self.path) or ".", suffix=".tmp")
+        os.close(fd)
+        try:
+            with self._lock, gzip.open(tmp, "wt", encoding="utf-8") as f:
+                for entry in self.entries.values():
+                    f.write(json.dumps(entry, separators=(",", ":"), default=str) + "\n")
+            os.replace(tmp, self.path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def exchange(self, kind: str, key: str, name: str, call: Callable[[], Any],
+                 encode: Callable[[Any], Dict], decode: Callable[[Dict], Any]) -> Any:
+        """Answer one request: from the cassette when replaying, else by ``call()``, keeping its answer"""
+        if self.mode == "replay":
+            answer = self.answer(key, kind, name)
+            if self.latency > 0:
+                time.sleep(answer.get("seconds", 0) * self.latency)
+            return decode(answer)
+
+        started = time.perf_counter()
+        result = call()
+        answer = encode(result)
+        answer["seconds"] = round(time.perf_counter() - started, 3)
+        self.keep(kind, key, name, answer)
+        return result
+
+    def keep(self, kind: str, key: str, name: str, answer: Dict):
+        with self._lock:
+            entry = self.entries.setdefault(key, {"key": key, "kind": kind, "name": name, "answers": []})
+            # a repeated identical answer adds nothing; keep the file compact
+            if not entry["answers"] or _comparable(entry["answers"][-1]) != _comparable(answer):
+                entry["answers"].append(answer)
+            self.stats["recorded"] += 1
+
+    def answer(self, key: str, kind: str, name: str) -> Dict:
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                raise CassetteMiss(f"{kind} request to {name} is not in {self.path} (key {key[:12]})")
+            n = self._served.get(key, 0)
+            self._served[key] = n + 1
+            self.stats["replayed"] += 1
+            return entry["answers"][min(n, len(entry["answers"]) - 1)]
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            kinds = {}
+            for entry in self.entries.values():
+                kinds[entry["kind"]] = kinds.get(entry["kind"], 0) + 1
+            return {"path": self.path, "mode": self.mode, "requests": kinds, **self.stats}
+
+
+def _comparable(answer: Dict) -> Dict:
+    return {k: v for k, v in answer.items() if k not in ("seconds", "usage")}
+
+
+def current() -> Optional[Cassette]:
+    """The cassette the current run records to or replays from, if any"""
+    return _active.get()
+
+
+@contextmanager
+def use(cassette: Optional[Cassette]):
+    """Route LLM and HTTP exchanges made in this context (and threads it submits) through ``cassette``"""
+    if cassette is None:
+        yield None
+        return
+    token = _active.set(cassette)
+    try:
+        yield cassette
+    finally:
+        _active.reset(token)
+        cassette.save()
+
+
+def from_env(company: str) -> Optional[Cassette]:
+    """CASSETTE_MODE=record|replay selects a per-company cassette in CASSETTE_DIR; unset means live"""
+    mode = os.getenv("CASSETTE_MODE", "")
+    if not mode:
+        return None
+    slug = company_slug(company)
+    path = os.path.join(os.getenv("CASSETTE_DIR", "cassettes"), f"{slug}.jsonl.gz")
+    return Cassette(path, mode, latency=float(os.getenv("CASSETTE_LATENCY", "0") or 0))
+
+
+# ---------------------------------------------------------------------- values
+
+
+def _class_path(cls) -> str:
+    return f"{cls.__module__}:{cls.__qualname__}"
+
+
+def _load_class(path: str):
+    module, _, qualname = path.partition(":")
+    obj = importlib.import_module(module)
+    for part in qualname.split("."):
+        obj = getattr(obj, part)
+    return obj
+
+
+def encode_value(value: Any) -> Dict:
+    """LLM results are text, a pydantic model (structured output) or a list of models (tool calls)"""
+    from pydantic import BaseModel
+
+    if isinstance(value, str):
+        return {"text": value}
+    if isinstance(value, BaseModel):
+        return {"model": _class_path(type(value)), "data": value.model_dump(mode="json")}
+    if isinstance(value, list) and value and all(isinstance(v, BaseModel) for v in value):
+        return {"models": [{"model": _class_path(type(v)), "data": v.model_dump(mode="json")} for v in value]}
+    return {"json": json.loads(json.dumps(value, default=str))}
+
+
+def decode_value(answer: Dict) -> Any:
+    if "text" in answer:
+        return answer["text"]
+    if "model" in answer:
+        return _load_class(answer["model"]).model_validate(answer["data"])
+    if "models" in answer:
+        return [_load_class(m["model"]).model_validate(m["data"]) for m in answer["models"]]
+    return answer.get("json")
+
+
+def _strip_volatile(value):
+    if isinstance(value, dict):
+        return {k: _strip_volatile(v) for k, v in value.items() if k not in _VOLATILE_KEYS}
+    if isinstance(value, list):
+        return [_strip_volatile(v) for v in value]
+    return value
+
+
+def _tool_name(tool) -> str:
+    if isinstance(tool, dict):
+        return tool.get("name") or (tool.get("function") or {}).get("name") or json.dumps(tool, sort_keys=True, default=str)
+    return getattr(tool, "name", str(tool))
+
+
+def llm_key(model: str, messages, tools=None, response_model=None) -> str:
+    from crewai.utilities.serialization import to_serializable
+
+    raw = json.dumps(
+        [
+            model,
+            _strip_volatile(to_serializable(messages)),
+            sorted(_tool_name(t) for t in tools or []),
+            getattr(response_model, "__name__", None),
+        ],
+        sort_keys=True, separators=(",", ":"), default=str,
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+# ---------------------------------------------------------------------- LLM calls
+
+# the answer being recorded for this LLM call; CrewAI's bus runs handlers in the caller's context
+_recording: contextvars.ContextVar[Optional[Dict]] = contextvars.ContextVar("cassette_llm_answer", default=None)
+_patch_lock = threading.Lock()
+_listener_registered = False
+
+
+def instrument_llm(llm):
+    """Route ``llm``'s class through the active cassette (idempotent; a no-op while none is active)"""
+    cls = type(llm)
+    with _patch_lock:
+        if cls.__dict__.get("_cassette_instrumented"):
+            return llm
+        original = cls.call
+        signature = inspect.signature(original)
+
+        @functools.wraps(original)
+        def call(self, *args, **kwargs):
+            tape = current()
+            if tape is None:
+                return original(self, *args, **kwargs)
+            bound = signature.bind(self, *args, **kwargs).arguments
+            key = llm_key(self.model, bound.get("messages"), bound.get("tools"), bound.get("response_model"))
+            if tape.mode == "replay":
+                return _replay_llm(self, tape, key, bound)
+            return _record_llm(tape, key, self.model, lambda: original(self, *args, **kwargs))
+
+        cls.call = call
+        cls._cassette_instrumented = True
+        _register_usage_listener()
+    return llm
+
+
+def _record_llm(tape: Cassette, key: str, model: str, call: Callable[[], Any]):
+    answer: Dict = {}
+    token = _recording.set(answer)
+    try:
+        started = time.perf_counter()
+        result = call()
+    finally:
+        _recording.reset(token)
+    answer.update(encode_value(result), seconds=round(time.perf_counter() - started, 3))
+    tape.keep("llm", key, model, answer)
+    return result
+
+
+def _replay_llm(llm, tape: Cassette, key: str, bound: Dict):
+    """Serve a recorded answer, emitting the call events a live call would (so traces and usage still add up)"""
+    from crewai.events.types.llm_events import LLMCallType
+    from crewai.llms.base_llm import llm_call_context
+
+    answer = tape.answer(key, "llm", llm.model)
+    with llm_call_context():
+        llm._emit_call_started_event(
+            messages=bound.get("messages"),
+            tools=bound.get("tools"),
+            from_task=bound.get("from_task"),
+            from_agent=bound.get("from_agent"),
+        )
+        if tape.latency > 0:
+            time.sleep(answer.get("seconds", 0) * tape.latency)
+        result = decode_value(answer)
+        llm._emit_call_completed_event(
+            response=result,
+            call_type=LLMCallType.TOOL_CALL if "models" in answer else LLMCallType.LLM_CALL,
+            from_task=bound.get("from_task"),
+            from_agent=bound.get("from_agent"),
+            messages=bound.get("messages"),
+            usage=answer.get("usage"),
+        )
+    return result
+
+
+def _register_usage_listener():
+    global _listener_registered
+    if _listener_registered:
+        return
+    _listener_registered = True
+
+    from crewai.events import crewai_event_bus
+    from crewai.events.types.llm_events import LLMCallCompletedEvent
+
+    @crewai_event_bus.on(LLMCallCompletedEvent)
+    def _keep_usage(source, event):
+        answer = _recording.get()
+        if answer is not None and event.usage:
+            answer["usage"] = dict(event.usage)
@@ -0,0 +1,156 @@
+"""
+Context Compaction - deduplicated digest of upstream outputs for the proposal stage
+"""
+
+import re
+from typing import Dict, List, Set, Tuple
+
+from utils import split_use_cases
+
+# upstream task name -> digest section title, in the order the proposal template uses them
+SECTIONS = [
+    ("research", "Company Research"),
+    ("industry_research", "Industry Analysis"),
+    ("competitor_research", "Competitive Landscape"),
+    ("usecases", "AI Use Cases"),
+    ("resources", "Datasets & Resources"),
+]
+
+_URL_RE = re.compile(r"https?://[^\s)\]>\"']+")
+_FIGURE_RE = re.compile(
+    r"[$€£]\s?\d[\d,.]*(?:\s?(?:[kmbt]n?|thousand|million|billion|trillion)\b)?"
+    r"|\d[\d,.]*\s?(?:%|percent\b|x\b|bn\b|thousand\b|million\b|billion\b|trillion\b)",
+    re.IGNORECASE,
+)
+_SOURCE_RE = re.compile(r"\[source", re.IGNORECASE)
+_RULE_RE = re.compile(r"^[-*_=]{3,}$")
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+(?=[A-Z\d])")
+
+SHORT_LINE = 120       # lines up to this length are kept whole
+SENTENCE_LIMIT = 160   # prose without facts is cut to its first sentence, at most this long
+
+_encoder = None
+
+
+def count_tokens(text: str) -> int:
+    """Prompt-token estimate: tiktoken's cl100k_base when installed, else ~4 characters per token"""
+    global _encoder
+    if _encoder is None:
+        try:
+            import tiktoken
+
+            _encoder = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            _encoder = False
+    if _encoder:
+        return len(_encoder.encode(text or "", disallowed_special=()))
+    return (len(text or "") + 3) // 4
+
+
+def extract_facts(text: str) -> Set[str]:
+    """URLs and quantified figures ($, %, magnitudes) - what the digest must never drop"""
+    urls = {u.rstrip(".,;:") for u in _URL_RE.findall(text or "")}
+    figures = {re.sub(r"\s+", "", f.lower()) for f in _FIGURE_RE.findall(_URL_RE.sub(" ", text or ""))}
+    return urls | figures
+
+
+def _normalize(line: str) -> str:
+    line = line.replace("**", "").replace("__", "")
+    return re.sub(r"\s+", " ", line).strip()
+
+
+def _first_sentence(text: str) -> str:
+    sentence = _SENTENCE_END_RE.split(text, maxsplit=1)[0]
+    if len(sentence) > SENTENCE_LIMIT:
+        sentence = sentence[:SENTENCE_LIMIT].rsplit(" ", 1)[0] + "…"
+    return sentence
+
+
+def _compact_lines(text: str, seen_lines: Set[str], seen_urls: Set[str]) -> List[str]:
+    """Keep headings, facts and short lines; cut fact-free prose to one sentence; drop repeats"""
+    kept = []
+    for raw in (text or "").splitlines():
+        line = _normalize(raw)
+        if not line or _RULE_RE.match(line):
+            continue
+
+        if line.startswith("#"):
+            title = line.lstrip("#").strip()
+            if title and title.lower() not in seen_lines:
+                kept.append(f"### {title}")
+            continue
+
+        urls = {u.rstrip(".,;:") for u in _URL_RE.findall(line)}
+        if urls:
+            if urls <= seen_urls and not _FIGURE_RE.search(line):
+                continue  # the same resource/source was already listed
+            seen_urls.update(urls)
+        elif not (
+            _FIGURE_RE.search(line)
+            or _SOURCE_RE.search(line)
+            or len(line) <= SHORT_LINE
+        ):
+            bullet = line[: len(line) - len(line.lstrip("-*> "))]
+            line = bullet + _first_sentence(line[len(bullet):])
+
+        key = line.lstrip("-*> ").lower()
+        if key in seen_lines:
+            continue
+        seen_lines.add(key)
+        kept.append(line)
+
+    # a heading with nothing under it carries no information
+    return [
+        line for i, line in enumerate(kept)
+        if not line.startswith("### ") or (i + 1 < len(kept) and not kept[i + 1].startswith("### "))
+    ]
+
+
+def _compact_use_cases(text: str, seen_lines: Set[str], seen_urls: Set[str]) -> List[str]:
+    use_cases = split_use_cases(text)
+    if not use_cases:
+        return _compact_lines(text, seen_lines, seen_urls)
+    kept = []
+    for use_case in use_cases:
+        body = use_case["text"].split("\n", 1)[1] if "\n" in use_case["text"] else ""
+        kept.append(f"### {use_case['name']}")
+        kept.extend(line for line in _compact_lines(body, seen_lines, seen_urls) if not line.startswith("### "))
+    return kept
+
+
+def compact_context(outputs: Dict[str, str]) -> Tuple[str, Dict]:
+    """Digest of the upstream outputs ({task name: raw markdown}) plus a size/retention report.
+
+    Every URL and figure of the originals survives (fact-free prose is shortened,
+    repeats across stages are dropped); the report lists any that did not.
+    """
+    original = "\n\n----------\n\n".join(raw for raw in outputs.values() if raw)
+    seen_lines: Set[str] = set()
+    seen_urls: Set[str] = set()
+
+    parts = []
+    known = [name for name, _ in SECTIONS]
+    titles = SECTIONS + [(name, name.replace("_", " ").title()) for name in outputs if name not in known]
+    for name, title in titles:
+        raw = outputs.get(name)
+        if not raw:
+            continue
+        seen_lines.add(title.lower())  # an upstream heading repeating the section title adds nothing
+        compact = _compact_use_cases if name == "usecases" else _compact_lines
+        lines = compact(raw, seen_lines, seen_urls)
+        if lines:
+            parts.append(f"## {title}\n" + "\n".join(lines))
+    digest = "\n\n".join(parts)
+
+    facts = extract_facts(original)
+    missing = sorted(facts - extract_facts(digest))
+    before, after = count_tokens(original), count_tokens(digest)
+    report = {
+        "tokens_before": before,
+        "tokens_after": after,
+        "reduction": round(1 - after / before, 3) if before else 0.0,
+        "facts": len(facts),
+        "facts_retained": len(facts) - len(missing),
+        "missing_facts": missing[:20],
+    }
+    return digest, report
@@ -2,60 +2,355 @@
 Crew Configuration
 """
 
+import contextvars
+import json
 import os
-from crewai import Crew, Process, LLM
-from agents.research_agent import research_agent
-from agents.usecase_agent import usecase_agent
-from agents.dataset_agent import dataset_agent
-from agents.proposal_agent import proposal_agent
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from crewai import Crew, Process
+from crewai.tasks.task_output import TaskOutput
+from config import cassette, events, memory, schemas, tracing
+from config.compaction import compact_context
+from config.registry import get_agent, get_llm, load_settings
+from config.research_store import research_store, task_version
+from config.scheduler import TaskScheduler, copy_agent
+from config.schemas import CompanyProfile, ResourceCollection, ResourceMapping, UseCasePortfolio
+from config.stage_cache import StageCache, stage_cache
 from config.tasks import TaskConfig
-from dotenv import load_dotenv
+from tools import prefetch, ratelimit
+from utils import company_slug, split_use_cases
 
-load_dotenv()
+ratelimit.install_llm_hook()
 
 class AIUseCaseGenerationCrew:
-    def __init__(self, company):
+    def __init__(self, company, industry: str = None):
         self.company = company
+        # known up front (or remembered from an earlier run, see _run_graph), the industry's research can be shared
+        self.industry = industry
         self.task_config = TaskConfig()
 
-        self.research_task = self.task_config.create_research_task(research_agent, company)
-        self.usecase_task = self.task_config.create_usecase_task(usecase_agent, company)
-        self.dataset_task = self.task_config.create_dataset_task(dataset_agent, company)
-        self.proposal_task = self.task_config.create_proposal_task(proposal_agent, company)
+        # agents (and their tools and LLM clients) are built on first use and shared per process
+        self.research_agent = get_agent("research")
+        self.usecase_agent = get_agent("usecase")
+        self.dataset_agent = get_agent("dataset")
+        self.proposal_agent = get_agent("proposal")
 
-        self.usecase_task.context = [self.research_task]
+        self.research_task = self.task_config.create_research_task(self.research_agent, company)
+        self.industry_task = self.task_config.create_industry_research_task(self.research_agent, company)
+        self.competitor_task = self.task_config.create_competitor_research_task(self.research_agent, company)
+        self.usecase_task = self.task_config.create_usecase_task(self.usecase_agent, company)
+        self.dataset_task = self.task_config.create_dataset_task(self.dataset_agent, company)
+        self.proposal_task = self.task_config.create_proposal_task(self.proposal_agent, company)
+
+        # the three research tasks have no inputs and run side by side under the scheduler
+        self.research_tasks = [self.research_task, self.industry_task, self.competitor_task]
+        self.usecase_task.context = list(self.research_tasks)
         self.dataset_task.context = [self.usecase_task]
-        self.proposal_task.context = [
-            self.research_task, self.usecase_task, self.dataset_task
-        ]
+        self.proposal_task.context = [*self.research_tasks, self.usecase_task, self.dataset_task]
+
+        self.scheduler = None
+        self.trace_id = None
+        self.compaction = None
+        self.prefetch = None
+
+    @property
+    def tasks(self):
+        return [*self.research_tasks, self.usecase_task, self.dataset_task, self.proposal_task]
 
-    def create(self):
-        """Initialize Crew with all agents and tasks"""
-        api_key = os.getenv("GEMINI_API_KEY")
+    @staticmethod
+    def _api_key() -> str:
+        api_key = load_settings()["GEMINI_API_KEY"]
         if not api_key:
             raise ValueError("Missing GEMINI_API_KEY in environment variables")
+        return api_key
+
+    def create(self, tasks=None):
+        """Initialize Crew with all agents and ``tasks`` (all of them by default)"""
+        self._api_key()
 
         return Crew(
-            agents=[research_agent, usecase_agent, dataset_agent, proposal_agent],
-            tasks=[self.research_task, self.usecase_task, self.dataset_task, self.proposal_task],
+            agents=[self.research_agent, self.usecase_agent, self.dataset_agent, self.proposal_agent],
+            tasks=tasks or self.tasks,
             process=Process.sequential,
             verbose=True,
-            output_log_file=f"outputs/{self.company.lower().replace(' ','_')}_log.txt",
-            llm=LLM(
-                model="gemini/gemini-2.0-flash",
-                api_key=api_key,
-                temperature=0.35
+            output_log_file=f"outputs/{company_slug(self.company)}_log.txt",
+            llm=get_llm(temperature=0.35)
+        )
+
+    def kickoff(self, dataset_workers: int = None, max_workers: int = None, on_event=None):
+        """Run the full workflow
+
+        Tasks run through the DAG scheduler: each starts as soon as its context is
+        ready. With more than one dataset worker, the dataset stage is split into
+        one subtask per use case. The proposal is written from a compacted digest of
+        the upstream outputs (CONTEXT_COMPACTION=0 passes them in full). Stage
+        outputs are cached on disk, so a rerun only executes stages that are
+        missing or whose prompts changed.
+        CREW_PROCESS=sequential keeps the plain Crew run.
+
+        ``on_event`` receives every run event (see config.events) as a dict.
+        Each run is recorded as one trace in the local trace store (see config.tracing).
+        CASSETTE_MODE=record|replay records every LLM and HTTP exchange to a
+        cassette, or replays one with no network (see config.cassette).
+        Agent memory is kept per company, so later runs for it recall what earlier
+        ones found (see config.memory). The Kaggle and GitHub searches the dataset
+        stage is likely to make start while research runs (see tools.prefetch).
+        """
+        if on_event is not None:
+            with events.bind(on_event):
+                return self.kickoff(dataset_workers, max_workers)
+
+        tape = cassette.from_env(self.company)
+        with tracing.trace_run(self.company) as run, cassette.use(tape), memory.namespace(self.company):
+            self.trace_id = run.trace_id
+            if os.getenv("CREW_PROCESS", "dag") == "sequential":
+                # the proposal runs on its own after the crew, so it can take the promoted lane
+                self.create(self.tasks[:-1]).kickoff()
+                result = self.run_proposal_stage(compact=False)
+                for task in self.tasks:
+                    if task.output:
+                        TaskScheduler.write_output_file(task, task.output)
+                return result
+            return self._run_graph(dataset_workers, max_workers)
+
+    def _run_graph(self, dataset_workers: int = None, max_workers: int = None):
+        self._api_key()
+        if dataset_workers is None:
+            dataset_workers = int(os.getenv("DATASET_WORKERS", "4"))
+        if max_workers is None:
+            max_workers = int(os.getenv("CREW_MAX_WORKERS", "4"))
+
+        runners = {}
+        if dataset_workers > 1:
+            runners[self.dataset_task.name] = lambda task: self.run_dataset_stage(dataset_workers)
+        compact = os.getenv("CONTEXT_COMPACTION", "1") not in ("0", "false")
+        runners[self.proposal_task.name] = lambda task: self.run_proposal_stage(compact)
+        if research_store.enabled and cassette.current() is None:
+            # looked up only now: a cassette is active from kickoff on, and replays must not depend on local state
+            self.industry = self.industry or research_store.get("company", self.company, "industry")
+            runners[self.research_task.name] = lambda task: self.run_company_stage(task, "profile")
+            runners[self.competitor_task.name] = lambda task: self.run_company_stage(task, "competitors")
+            runners[self.industry_task.name] = self.run_industry_stage
+            if self.industry is None:
+                # learn the industry from the company profile first, then share its research
+                self.industry_task.context = [self.research_task]
+
+        self.scheduler = TaskScheduler(
+            self.tasks,
+            runners=runners,
+            max_workers=max_workers,
+            cache=self._stage_cache(),
+            company_name=self.company,
+            on_finished=self._stage_finished,
+        )
+        # the dataset stage's searches are predictable from the industry: start them while research runs
+        warm = None if self.scheduler.is_cached(self.dataset_task) else prefetch.from_env(self.company, self.industry)
+        self.prefetch = warm
+        try:
+            with prefetch.use(warm):
+                outputs = self.scheduler.run()
+        finally:
+            self._write_timeline()
+        return outputs[self.proposal_task.name]
+
+    def stream(self, **kickoff_kwargs):
+        """Run the workflow in the background and yield events as they happen.
+
+        Yields task_started/task_finished (with the task's output), tool_started/
+        tool_finished and partial_output events; the last event is run_finished
+        (with the final proposal) or run_failed.
+        """
+        events_queue = queue.Queue()
+
+        def worker():
+            try:
+                result = self.kickoff(**kickoff_kwargs)
+                events.emit({"type": "run_finished", "output": str(result)})
+            except Exception as e:
+                events.emit({"type": "run_failed", "error": str(e)})
+
+        with events.bind(events_queue.put):
+            thread = threading.Thread(
+                target=contextvars.copy_context().run, args=(worker,), daemon=True, name="crew-stream"
             )
+        thread.start()
+
+        while True:
+            event = events_queue.get()
+            yield event
+            if event["type"] in ("run_finished", "run_failed"):
+                return
+
+    def _stage_finished(self, task, output):
+        if self.prefetch is not None and any(task is t for t in self.research_tasks):
+            self.prefetch.research_finished(output)
+
+    def _write_timeline(self):
+        path = f"outputs/{company_slug(self.company)}_timeline.json"
+        summary = self.scheduler.summary()
+        if self.compaction is not None:
+            summary["compaction"] = self.compaction
+        if self.prefetch is not None:
+            summary["prefetch"] = self.prefetch.summary()
+            tracing.current_span().set(**{
+                f"prefetch_{k}": summary["prefetch"][k] for k in ("hits", "misses", "hit_rate", "saved_seconds")
+            })
+        if cassette.current() is not None:
+            summary["cassette"] = cassette.current().summary()
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+
+    def run_proposal_stage(self, compact: bool = True) -> TaskOutput:
+        """Write the proposal, by default from a compacted digest of the upstream outputs instead of their full text"""
+        if compact:
+            context = self._proposal_digest()
+        else:
+            context = TaskScheduler.context_for(self.proposal_task)
+
+        # the last stage finishes a run, so it goes ahead of earlier stages queued in the same lane
+        with ratelimit.promoted():
+            return self.proposal_task.execute_sync(agent=copy_agent(self.proposal_agent), context=context)
+
+    def _proposal_digest(self) -> str:
+        upstream = {t.name: schemas.render(t.output) for t in TaskScheduler.context_of(self.proposal_task) if t.output}
+        with tracing.span("subtask", "compaction") as span:
+            digest, self.compaction = compact_context(upstream)
+            span.set(**{k: v for k, v in self.compaction.items() if k != "missing_facts"})
+
+        with open(f"outputs/{company_slug(self.company)}_digest.md", "w", encoding="utf-8") as f:
+            f.write(digest)
+        events.emit({"type": "context_compacted", "task": self.proposal_task.name, **self.compaction})
+        return digest
+
+    def _stored(self, task, tier: str, name: str, topic: str, run, prompt=None) -> TaskOutput:
+        """A research stage from the research store, or ``run()``'s output (stored for the next company).
+
+        Entries are versioned by ``prompt`` (the task ``run()`` executes; ``task`` by default).
+        """
+        prompt = prompt or task
+        fresh = {}
+
+        def fetch() -> str:
+            fresh["output"] = run()
+            return fresh["output"].raw
+
+        raw = research_store.get_or_fetch(tier, name, topic, fetch, source=task.name, version=task_version(prompt, name))
+        if "output" in fresh:
+            return fresh["output"]
+        tracing.current_span().set(research_store=tier)
+        return TaskOutput(
+            name=task.name,
+            description=task.description,
+            expected_output=task.expected_output,
+            raw=raw,
+            pydantic=schemas.restore(task, raw),
+            agent=task.agent.role,
+        )
+
+    def _execute(self, task) -> TaskOutput:
+        return task.execute_sync(agent=copy_agent(task.agent), context=TaskScheduler.context_for(task))
+
+    def run_company_stage(self, task, topic: str) -> TaskOutput:
+        """Company research, reused for the company tier's TTL"""
+        output = self._stored(task, "company", self.company, topic, lambda: self._execute(task))
+        profile = output.pydantic
+        if isinstance(profile, CompanyProfile) and "no trusted" not in profile.industry.lower():
+            research_store.put("company", self.company, "industry", profile.industry, source=task.name)
+        return output
+
+    def _profile_industry(self):
+        profile = self.research_task.output.pydantic if self.research_task.output else None
+        if isinstance(profile, CompanyProfile) and "no trusted" not in profile.industry.lower():
+            return profile.industry
+        return None
+
+    def run_industry_stage(self, task) -> TaskOutput:
+        """Industry research shared by every company in the industry (see config.research_store)"""
+        industry = self.industry or self._profile_industry()
+        if not industry:
+            return self._execute(task)
+        # an industry-only prompt with no company context, so its answer fits any company in the industry
+        shared = self.task_config.create_industry_research_task(self.research_agent, self.company, industry)
+        return self._stored(
+            task, "industry", industry, "analysis",
+            lambda: shared.execute_sync(agent=copy_agent(self.research_agent)),
+            prompt=shared,
         )
 
-    def kickoff(self):
-        """Run the full workflow"""
-        return self.create().kickoff()
+    def _use_cases(self):
+        """The use case list: schema items when the stage returned structured output, else parsed from markdown"""
+        output = self.usecase_task.output
+        if output is None:
+            return []
+        if isinstance(output.pydantic, UseCasePortfolio):
+            return [{"name": uc.title, "text": uc.brief()} for uc in output.pydantic.use_cases]
+        return split_use_cases(output.raw)
+
+    @staticmethod
+    def _stage_cache() -> StageCache:
+        """No stage is reused from disk while a cassette records or replays, so every call really happens"""
+        return stage_cache if cassette.current() is None else StageCache(enabled=False)
+
+    def run_dataset_stage(self, max_workers: int = 4) -> TaskOutput:
+        """Map resources per use case in parallel and merge them into one resource collection"""
+        use_cases = self._use_cases()
+        if not use_cases:
+            # couldn't find individual use cases; let the agent walk the whole list
+            return self.dataset_task.execute_sync(
+                agent=copy_agent(self.dataset_agent), context=TaskScheduler.context_for(self.dataset_task)
+            )
+
+        cache = self._stage_cache()
+
+        def run_one(use_case) -> ResourceMapping:
+            task = self.task_config.create_usecase_dataset_task(self.dataset_agent, self.company, use_case)
+            # keyed on the use case's own text, so an unchanged use case is reused even if others changed
+            key = cache.key_for(task, self.company, [])
+            with tracing.span("subtask", self.dataset_task.name, use_case=use_case["name"]) as span:
+                entry = cache.load(key)
+                mapping = schemas.restore(task, entry["raw"]) if entry else None
+                if mapping is not None:
+                    span.set(cached=1)
+                else:
+                    try:
+                        # each subtask gets its own agent copy; executors are not thread-safe
+                        output = task.execute_sync(agent=copy_agent(self.dataset_agent))
+                        if isinstance(output.pydantic, ResourceMapping):
+                            mapping = output.pydantic
+                            cache.save(key, f"{self.dataset_task.name}:{use_case['name']}", output.raw, output.agent)
+                        else:
+                            mapping = ResourceMapping(use_case=use_case["name"], notes=output.raw.strip())
+                    except Exception as e:
+                        mapping = ResourceMapping(use_case=use_case["name"], notes=f"⚠️ Resource search failed: {e}")
+                        span.set(error=str(e)[:300])
+            mapping = mapping.model_copy(update={"use_case": use_case["name"]})
+            events.emit({
+                "type": "partial_output",
+                "task": self.dataset_task.name,
+                "use_case": use_case["name"],
+                "output": mapping.to_markdown(),
+            })
+            return mapping
+
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="dataset-stage") as pool:
+            futures = [events.submit(pool, run_one, use_case) for use_case in use_cases]
+            collection = ResourceCollection(company=self.company, mappings=[f.result() for f in futures])
+
+        self.dataset_task.output = TaskOutput(
+            name=self.dataset_task.name,
+            description=self.dataset_task.description,
+            expected_output=self.dataset_task.expected_output,
+            raw=collection.model_dump_json(),
+            pydantic=collection,
+            agent=self.dataset_agent.role,
+        )
+        return self.dataset_task.output
 
 
-def create_ai_usecase_crew(company_name: str) -> AIUseCaseGenerationCrew:
+def create_ai_usecase_crew(company_name: str, industry: str = None) -> AIUseCaseGenerationCrew:
     """Factory function to create AIUseCaseGenerationCrew instance"""
-    return AIUseCaseGenerationCrew(company_name)
+    return AIUseCaseGenerationCrew(company_name, industry)
 
 
 def _detect_business_model(self, company: str) -> str:
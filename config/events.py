@@ -0,0 +1,120 @@
+"""
+Run Event Stream - task, tool and partial-output events for live consumers
+"""
+
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+
+# where events for the current run go; bound per run and inherited by worker threads
+_sink: contextvars.ContextVar[Optional[Callable[[Dict], None]]] = contextvars.ContextVar(
+    "crew_event_sink", default=None
+)
+_listeners_registered = False
+_register_lock = threading.Lock()
+
+
+def emit(event: Dict):
+    """Send an event to the sink bound for this run, if any"""
+    sink = _sink.get()
+    if sink is None:
+        return
+    event.setdefault("time", time.time())
+    try:
+        sink(event)
+    except Exception:
+        pass  # observers must never break a run
+
+
+@contextmanager
+def bind(sink: Callable[[Dict], None]):
+    """Route events emitted in this context (and threads started via submit()) to ``sink``"""
+    _register_crewai_listeners()
+    token = _sink.set(sink)
+    try:
+        yield
+    finally:
+        _sink.reset(token)
+
+
+def submit(pool, fn, *args, **kwargs):
+    """``pool.submit`` that carries the caller's context (and so its event sink) into the worker"""
+    return pool.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
+def flush(timeout: float = 10.0):
+    """Wait for CrewAI's event handlers (which run on its own pool) to deliver pending events"""
+    if _listeners_registered:
+        from crewai.events import crewai_event_bus
+
+        crewai_event_bus.flush(timeout=timeout)
+
+
+def _preview(value, limit: int = 300) -> str:
+    text = value if isinstance(value, str) else str(value)
+    return text if len(text) <= limit else text[:limit] + "..."
+
+
+def _register_crewai_listeners():
+    """Forward CrewAI's tool and LLM events; its bus runs handlers with the emitting thread's context"""
+    global _listeners_registered
+    with _register_lock:
+        if _listeners_registered:
+            return
+        _listeners_registered = True
+
+    from crewai.events import crewai_event_bus
+    from crewai.events.types.llm_events import LLMCallCompletedEvent
+    from crewai.events.types.tool_usage_events import (
+        ToolUsageErrorEvent,
+        ToolUsageFinishedEvent,
+        ToolUsageStartedEvent,
+    )
+
+    @crewai_event_bus.on(ToolUsageStartedEvent)
+    def _tool_started(source, event):
+        emit({
+            "type": "tool_started",
+            "task": event.task_name,
+            "agent": event.agent_role,
+            "tool": event.tool_name,
+            "input": _preview(event.tool_args),
+        })
+
+    @crewai_event_bus.on(ToolUsageFinishedEvent)
+    def _tool_finished(source, event):
+        emit({
+            "type": "tool_finished",
+            "task": event.task_name,
+            "agent": event.agent_role,
+            "tool": event.tool_name,
+            "from_cache": event.from_cache,
+            "output": _preview(event.output),
+        })
+
+    @crewai_event_bus.on(ToolUsageErrorEvent)
+    def _tool_failed(source, event):
+        emit({
+            "type": "tool_failed",
+            "task": event.task_name,
+            "agent": event.agent_role,
+            "tool": event.tool_name,
+            "error": _preview(getattr(event, "error", "")),
+        })
+
+    @crewai_event_bus.on(LLMCallCompletedEvent)
+    def _llm_finished(source, event):
+        usage = event.usage or {}
+        prompt = usage.get("prompt_tokens", usage.get("prompt_token_count", 0)) or 0
+        completion = usage.get("completion_tokens", usage.get("candidates_token_count", 0)) or 0
+        emit({
+            "type": "llm_call_finished",
+            "task": event.task_name,
+            "agent": event.agent_role,
+            "model": event.model,
+            "prompt_tokens": prompt,
+            "completion_tokens": completion,
+            "total_tokens": usage.get("total_tokens", prompt + completion) or 0,
+        })
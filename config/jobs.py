@@ -0,0 +1,222 @@
+"""
+Background Job Queue - runs crews in a bounded process pool
+"""
+
+import importlib
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import CancelledError, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional
+
+from config.stage_cache import normalize_company
+
+DEFAULT_CREW_FACTORY = "config.crew:create_ai_usecase_crew"
+STAGES = ["research", "industry_research", "competitor_research", "usecases", "resources", "proposal"]
+
+
+def load_factory(path: str):
+    module, _, attr = path.partition(":")
+    return getattr(importlib.import_module(module), attr)
+
+
+class JobCancelled(Exception):
+    """Raised in a worker that picks up a job cancelled while it waited"""
+
+
+def _run_job(job_id: str, company_name: str, factory_path: str, progress, claim) -> str:
+    """Worker-process entry point: build the crew, run it, report stage progress"""
+    with claim:  # JobManager.cancel checks and sets under the same lock
+        if progress.get(job_id, {}).get("cancelled"):
+            raise JobCancelled(job_id)
+        progress[job_id] = {"started_at": time.time()}
+
+    def on_event(event):
+        state = progress.get(job_id, {})
+        if event["type"] == "task_started":
+            progress[job_id] = {**state, "current": event["task"]}
+        elif event["type"] == "task_finished":
+            progress[job_id] = {
+                **state,
+                "completed": [*state.get("completed", []), event["task"]],
+                "outputs": {**state.get("outputs", {}), event["task"]: event.get("output", "")},
+            }
+        elif event["type"] == "tool_started":
+            progress[job_id] = {**state, "last_tool": f"{event['tool']}: {event['input']}"}
+
+    crew = load_factory(factory_path)(company_name)
+    result = crew.kickoff(on_event=on_event)
+    return result.raw if hasattr(result, "raw") else str(result)
+
+
+class SleepingCrew:
+    """Stand-in crew that only sleeps; lets the job system be load-tested without LLM calls"""
+
+    def __init__(self, company_name: str, stage_seconds: float = None):
+        self.company = company_name
+        self.stage_seconds = stage_seconds or float(os.getenv("SLEEPING_CREW_STAGE_SECONDS", "0.2"))
+
+    def kickoff(self, on_event=None):
+        for stage in STAGES:
+            if on_event:
+                on_event({"type": "task_started", "task": stage, "time": time.time()})
+            time.sleep(self.stage_seconds)
+            if on_event:
+                on_event({"type": "task_finished", "task": stage, "time": time.time(), "output": ""})
+        return f"# Proposal for {self.company}\n"
+
+
+def create_sleeping_crew(company_name: str, industry: str = None) -> SleepingCrew:
+    return SleepingCrew(company_name)
+
+
+class JobManager:
+    """Submit/poll API around ``create_ai_usecase_crew``.
+
+    Each job runs in its own worker process so crews don't share agents, tool
+    state or memory. Submitting a company that already has a queued or running
+    job returns the existing job id instead of starting a duplicate. Jobs still
+    waiting for a worker can be cancelled; a running crew is left to finish. A
+    worker that dies fails the jobs the pool had in flight, and the next submit
+    starts a fresh pool.
+    """
+
+    def __init__(self, max_workers: int = None, crew_factory: str = None):
+        self.max_workers = max_workers or int(os.getenv("JOB_WORKERS", "2"))
+        self.crew_factory = crew_factory or os.getenv("CREW_FACTORY", DEFAULT_CREW_FACTORY)
+
+        ctx = multiprocessing.get_context("spawn")
+        self._manager = ctx.Manager()
+        self._progress = self._manager.dict()
+        self._claim = self._manager.Lock()
+        self._ctx = ctx
+        self._pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=ctx)
+        self._broken = False
+
+        self._jobs: Dict[str, Dict] = {}
+        self._futures: Dict[str, object] = {}
+        self._inflight: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, company_name: str) -> str:
+        key = normalize_company(company_name)
+        with self._lock:
+            if key in self._inflight:
+                return self._inflight[key]
+
+            job_id = uuid.uuid4().hex[:12]
+            self._jobs[job_id] = {
+                "id": job_id,
+                "company": company_name,
+                "state": "queued",
+                "submitted_at": time.time(),
+                "finished_at": None,
+                "result": None,
+                "error": None,
+            }
+            self._inflight[key] = job_id
+            self._progress[job_id] = {}
+
+        args = (_run_job, job_id, company_name, self.crew_factory, self._progress, self._claim)
+        try:
+            future = self._live_pool().submit(*args)
+        except BrokenProcessPool:  # a worker died after the pool was checked
+            self._broken = True
+            future = self._live_pool().submit(*args)
+        with self._lock:
+            self._futures[job_id] = future
+        future.add_done_callback(lambda f, job_id=job_id, key=key: self._finish(job_id, key, f))
+        return job_id
+
+    def _live_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._broken:
+                self._pool.shutdown(wait=False)
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=self._ctx)
+                self._broken = False
+            return self._pool
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a job that has not started; False if it is running, finished or unknown"""
+        with self._lock:
+            job, future = self._jobs.get(job_id), self._futures.get(job_id)
+            if job is None or job["state"] != "queued":
+                return False
+        with self._claim:
+            progress = self._progress.get(job_id, {})
+            if progress.get("started_at"):
+                return False
+            # the pool may already have handed it to a worker's queue; the worker then skips it
+            self._progress[job_id] = {**progress, "cancelled": True}
+        future.cancel()
+        return True
+
+    def _finish(self, job_id: str, key: str, future):
+        with self._lock:
+            job = self._jobs[job_id]
+            job["finished_at"] = time.time()
+            try:
+                job["result"] = future.result()
+                job["state"] = "done"
+            except (CancelledError, JobCancelled):
+                job["state"] = "cancelled"
+            except BrokenProcessPool:
+                job["error"] = "the worker process exited unexpectedly"
+                job["state"] = "failed"
+                self._broken = True
+            except Exception as e:
+                job["error"] = str(e)
+                job["state"] = "failed"
+            self._futures.pop(job_id, None)
+            if self._inflight.get(key) == job_id:
+                del self._inflight[key]
+
+    def status(self, job_id: str) -> Optional[Dict]:
+        """Snapshot of one job: state, stage progress, and result once done"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            job = dict(job)
+        progress = dict(self._progress.get(job_id, {}))
+        completed = progress.get("completed", [])
+        job["started_at"] = progress.get("started_at")
+        if job["state"] == "queued" and job["started_at"]:
+            job["state"] = "running"
+        job["current_stage"] = progress.get("current") if job["state"] == "running" else None
+        job["completed_stages"] = completed
+        job["stage_outputs"] = progress.get("outputs", {})
+        job["last_tool"] = progress.get("last_tool")
+        job["progress"] = 1.0 if job["state"] == "done" else round(len(completed) / len(STAGES), 2)
+        return job
+
+    def jobs(self) -> List[Dict]:
+        with self._lock:
+            ids = list(self._jobs)
+        return [self.status(job_id) for job_id in ids]
+
+    def stats(self) -> Dict:
+        """Queue depth and throughput across all jobs submitted to this manager"""
+        jobs = self.jobs()
+        finished = [j for j in jobs if j["finished_at"] and j["state"] != "cancelled"]
+        durations = [j["finished_at"] - j["submitted_at"] for j in finished]
+        span = (
+            max(j["finished_at"] for j in finished) - min(j["submitted_at"] for j in finished)
+            if finished else 0
+        )
+        return {
+            "queued": sum(j["state"] == "queued" for j in jobs),
+            "running": sum(j["state"] == "running" for j in jobs),
+            "done": sum(j["state"] == "done" for j in jobs),
+            "failed": sum(j["state"] == "failed" for j in jobs),
+            "cancelled": sum(j["state"] == "cancelled" for j in jobs),
+            "mean_latency_seconds": round(sum(durations) / len(durations), 3) if durations else None,
+            "throughput_per_minute": round(len(finished) / span * 60, 2) if span else None,
+        }
+
+    def shutdown(self, wait: bool = True):
+        self._pool.shutdown(wait=wait, cancel_futures=not wait)
+        self._manager.shutdown()
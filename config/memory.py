@@ -0,0 +1,518 @@
+"""
+Agent Memory - one bounded vector store shared by every agent, namespaced per company
+"""
+
+import asyncio
+import contextvars
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from crewai.memory.types import MemoryRecord, ScopeInfo
+from crewai.memory.unified_memory import Memory
+from crewai.memory.utils import sanitize_scope_name
+from pydantic import Field, PrivateAttr
+
+from config import cassette, tracing
+from config.stage_cache import normalize_company
+
+BACKENDS = ("compact", "crewai", "off")
+
+# the company whose runs are reading and writing memory, and the stage doing it
+_namespace: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("memory_namespace", default=None)
+_stage: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("memory_stage", default=None)
+
+
+@contextmanager
+def namespace(company: str):
+    """Memory read and written in this context (and threads it submits) belongs to ``company``"""
+    token = _namespace.set(sanitize_scope_name(normalize_company(company)))
+    try:
+        yield
+    finally:
+        _namespace.reset(token)
+
+
+@contextmanager
+def stage(name: str):
+    token = _stage.set(name)
+    try:
+        yield
+    finally:
+        _stage.reset(token)
+
+
+def _content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _in_scope(prefix: Optional[str]):
+    """SQL filter for a scope and everything under it"""
+    if not prefix or prefix == "/":
+        return "1 = 1", []
+    prefix = prefix.rstrip("/")
+    return "(scope = ? OR scope LIKE ?)", [prefix, prefix + "/%"]
+
+
+def _namespace_of(scope: str) -> str:
+    """'/company/tesla/research' -> '/company/tesla'"""
+    return "/".join(scope.split("/")[:3])
+
+
+class CompactStore:
+    """SQLite vector store for CrewAI's unified memory (its StorageBackend protocol).
+
+    Embeddings are kept as float16, searched with numpy within one scope prefix.
+    Each company namespace keeps at most ``max_records`` (least recently used go
+    first) and records unused for ``max_age_days`` are dropped. The same file
+    caches embeddings by text hash (up to ``max_embeddings``), so text embedded
+    once is never sent to the embedding API again.
+    """
+
+    def __init__(self, path: str = None, max_records: int = None, max_age_days: float = None, max_embeddings: int = None):
+        self.path = path or os.getenv("MEMORY_PATH", os.path.join(".cache", "memory.sqlite"))
+        self.max_records = max_records or int(os.getenv("MEMORY_MAX_RECORDS", "500"))
+        self.max_age_days = max_age_days or float(os.getenv("MEMORY_MAX_AGE_DAYS", "90"))
+        self.max_embeddings = max_embeddings or int(os.getenv("MEMORY_EMBEDDING_CACHE", "20000"))
+        self.stats = {"saved": 0, "duplicates": 0, "evicted": 0, "searches": 0}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._write_lock = threading.RLock()
+        self._initialized = False
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._lock:
+                if not self._initialized:
+                    conn.execute(
+                        "CREATE TABLE IF NOT EXISTS records ("
+                        " id TEXT PRIMARY KEY, namespace TEXT, scope TEXT, content TEXT, content_hash TEXT,"
+                        " categories TEXT, metadata TEXT, importance REAL, created_at TEXT, last_accessed TEXT,"
+                        " source TEXT, private INTEGER, embedding BLOB)"
+                    )
+                    conn.execute("CREATE INDEX IF NOT EXISTS records_namespace ON records(namespace, last_accessed)")
+                    conn.execute("CREATE INDEX IF NOT EXISTS records_content ON records(namespace, content_hash)")
+                    conn.execute(
+                        "CREATE TABLE IF NOT EXISTS embeddings (hash TEXT PRIMARY KEY, vector BLOB, last_used REAL)"
+                    )
+                    self._initialized = True
+        return conn
+
+    def _bump(self, counter: str, n: int = 1):
+        with self._lock:
+            self.stats[counter] += n
+
+    # ------------------------------------------------------------------ records
+
+    @staticmethod
+    def _row(record: MemoryRecord):
+        vector = np.asarray(record.embedding, dtype=np.float16).tobytes() if record.embedding else None
+        return (
+            record.id, _namespace_of(record.scope), record.scope, record.content, _content_hash(record.content),
+            json.dumps(record.categories), json.dumps(record.metadata, default=str), record.importance,
+            record.created_at.isoformat(), record.last_accessed.isoformat(), record.source,
+            int(record.private), vector,
+        )
+
+    @staticmethod
+    def _record(row, with_embedding: bool = False) -> MemoryRecord:
+        (rid, _, scope, content, _, categories, metadata, importance, created, accessed, source, private, vector) = row
+        return MemoryRecord(
+            id=rid, scope=scope, content=content, categories=json.loads(categories), metadata=json.loads(metadata),
+            importance=importance, created_at=datetime.fromisoformat(created),
+            last_accessed=datetime.fromisoformat(accessed), source=source, private=bool(private),
+            embedding=np.frombuffer(vector, dtype=np.float16).astype(np.float32).tolist() if with_embedding and vector else None,
+        )
+
+    def save(self, records: List[MemoryRecord]) -> None:
+        if not records:
+            return
+        with self._write_lock:
+            self._conn().executemany(
+                "INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [self._row(r) for r in records],
+            )
+            self._bump("saved", len(records))
+            self._evict({_namespace_of(r.scope) for r in records})
+
+    def _evict(self, namespaces):
+        conn = self._conn()
+        cutoff = (datetime.utcnow() - timedelta(days=self.max_age_days)).isoformat()
+        evicted = conn.execute("DELETE FROM records WHERE last_accessed < ?", (cutoff,)).rowcount
+        for ns in namespaces:
+            # keep the ``max_records`` most recently used in each namespace
+            evicted += conn.execute(
+                "DELETE FROM records WHERE namespace = ? AND id NOT IN"
+                " (SELECT id FROM records WHERE namespace = ? ORDER BY last_accessed DESC LIMIT ?)",
+                (ns, ns, self.max_records),
+            ).rowcount
+        self._bump("evicted", max(0, evicted))
+
+    def new_contents(self, namespace_root: str, contents: List[str]) -> List[str]:
+        """The contents not already stored in the namespace; stored ones are touched instead of re-embedded"""
+        seen, fresh, known = set(), [], []
+        conn = self._conn()
+        for content in contents:
+            h = _content_hash(content)
+            if h in seen:
+                continue
+            seen.add(h)
+            row = conn.execute(
+                "SELECT id FROM records WHERE namespace = ? AND content_hash = ?", (namespace_root, h)
+            ).fetchone()
+            if row:
+                known.append(row[0])
+            else:
+                fresh.append(content)
+        if known:
+            self.touch_records(known)
+            self._bump("duplicates", len(known))
+        return fresh
+
+    def touch_records(self, record_ids: List[str]) -> None:
+        now = datetime.utcnow().isoformat()
+        with self._write_lock:
+            self._conn().executemany("UPDATE records SET last_accessed = ? WHERE id = ?", [(now, i) for i in record_ids])
+
+    def _select(self, scope_prefix: Optional[str], extra: str = "", params=()):
+        where, args = _in_scope(scope_prefix)
+        return self._conn().execute(f"SELECT * FROM records WHERE {where} {extra}", [*args, *params]).fetchall()
+
+    @staticmethod
+    def _matches(record: MemoryRecord, categories, metadata_filter) -> bool:
+        if categories and not set(categories) & set(record.categories):
+            return False
+        return all(record.metadata.get(k) == v for k, v in (metadata_filter or {}).items())
+
+    def search(self, query_embedding, scope_prefix=None, categories=None, metadata_filter=None, limit=10, min_score=0.0):
+        self._bump("searches")
+        rows = [r for r in self._select(scope_prefix) if r[-1]]
+        if not rows or not query_embedding:
+            return []
+        matrix = np.stack([np.frombuffer(r[-1], dtype=np.float16) for r in rows]).astype(np.float32)
+        query = np.asarray(query_embedding, dtype=np.float32)
+        if matrix.shape[1] != query.shape[0]:
+            return []  # embedded by a different model; nothing comparable
+        scores = matrix @ query / (np.linalg.norm(matrix, axis=1) * np.linalg.norm(query) + 1e-9)
+        results = []
+        for i in np.argsort(-scores):
+            if scores[i] < min_score or len(results) >= limit:
+                break
+            record = self._record(rows[i])
+            if self._matches(record, categories, metadata_filter):
+                results.append((record, float(scores[i])))
+        return results
+
+    def delete(self, scope_prefix=None, categories=None, record_ids=None, older_than=None, metadata_filter=None) -> int:
+        records = [self._record(r) for r in self._select(scope_prefix)]
+        doomed = [
+            r.id for r in records
+            if (record_ids is None or r.id in record_ids)
+            and (older_than is None or r.created_at < older_than)
+            and self._matches(r, categories, metadata_filter)
+        ]
+        with self._write_lock:
+            self._conn().executemany("DELETE FROM records WHERE id = ?", [(i,) for i in doomed])
+        return len(doomed)
+
+    def update(self, record: MemoryRecord) -> None:
+        self.save([record])
+
+    def get_record(self, record_id: str) -> Optional[MemoryRecord]:
+        row = self._conn().execute("SELECT * FROM records WHERE id = ?", (record_id,)).fetchone()
+        return self._record(row, with_embedding=True) if row else None
+
+    def list_records(self, scope_prefix=None, limit=200, offset=0) -> List[MemoryRecord]:
+        rows = self._select(scope_prefix, "ORDER BY created_at DESC LIMIT ? OFFSET ?", (limit, offset))
+        return [self._record(r) for r in rows]
+
+    def get_scope_info(self, scope: str) -> ScopeInfo:
+        records = [self._record(r) for r in self._select(scope)]
+        return ScopeInfo(
+            path=scope,
+            record_count=len(records),
+            categories=sorted({c for r in records for c in r.categories}),
+            oldest_record=min((r.created_at for r in records), default=None),
+            newest_record=max((r.created_at for r in records), default=None),
+            child_scopes=self.list_scopes(scope),
+        )
+
+    def list_scopes(self, parent: str = "/") -> List[str]:
+        base = parent.rstrip("/")
+        children = set()
+        for (scope,) in self._conn().execute("SELECT DISTINCT scope FROM records"):
+            if scope.startswith(base + "/") and scope != base:
+                children.add(base + "/" + scope[len(base) + 1:].split("/")[0])
+        return sorted(children)
+
+    def list_categories(self, scope_prefix=None) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for row in self._select(scope_prefix):
+            for category in json.loads(row[5]):
+                counts[category] = counts.get(category, 0) + 1
+        return counts
+
+    def count(self, scope_prefix=None) -> int:
+        where, args = _in_scope(scope_prefix)
+        return self._conn().execute(f"SELECT COUNT(*) FROM records WHERE {where}", args).fetchone()[0]
+
+    def reset(self, scope_prefix=None) -> None:
+        where, args = _in_scope(scope_prefix)
+        with self._write_lock:
+            self._conn().execute(f"DELETE FROM records WHERE {where}", args)
+
+    async def asave(self, records):
+        await asyncio.to_thread(self.save, records)
+
+    async def asearch(self, query_embedding, scope_prefix=None, categories=None, metadata_filter=None, limit=10, min_score=0.0):
+        return await asyncio.to_thread(self.search, query_embedding, scope_prefix, categories, metadata_filter, limit, min_score)
+
+    async def adelete(self, scope_prefix=None, categories=None, record_ids=None, older_than=None, metadata_filter=None):
+        return await asyncio.to_thread(self.delete, scope_prefix, categories, record_ids, older_than, metadata_filter)
+
+    # ------------------------------------------------------------------ embeddings
+
+    def cached_embeddings(self, hashes: List[str]) -> Dict[str, List[float]]:
+        found = {}
+        conn = self._conn()
+        for h in hashes:
+            row = conn.execute("SELECT vector FROM embeddings WHERE hash = ?", (h,)).fetchone()
+            if row:
+                found[h] = np.frombuffer(row[0], dtype=np.float16).astype(np.float32).tolist()
+        return found
+
+    def put_embeddings(self, vectors: Dict[str, List[float]]):
+        now = time.time()
+        with self._write_lock:
+            conn = self._conn()
+            conn.executemany(
+                "INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?)",
+                [(h, np.asarray(v, dtype=np.float16).tobytes(), now) for h, v in vectors.items()],
+            )
+            total = conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            if total > self.max_embeddings:
+                # drop the oldest tenth in one go rather than a row per insert
+                conn.execute(
+                    "DELETE FROM embeddings WHERE hash IN (SELECT hash FROM embeddings ORDER BY last_used LIMIT ?)",
+                    (total - int(self.max_embeddings * 0.9),),
+                )
+
+    def summary(self) -> Dict[str, Any]:
+        try:
+            records = self.count()
+            namespaces = self._conn().execute("SELECT COUNT(DISTINCT namespace) FROM records").fetchone()[0]
+        except sqlite3.Error:
+            records = namespaces = None
+        with self._lock:
+            return {"records": records, "namespaces": namespaces, **self.stats}
+
+
+class GeminiEmbedder:
+    """Batched Gemini embeddings through google-genai, the SDK the LLM client already uses"""
+
+    BATCH = 100  # texts per request the API accepts
+
+    def __init__(self, model: str = None, dimensions: int = None):
+        self.model = model or os.getenv("MEMORY_EMBEDDING_MODEL", "gemini-embedding-001")
+        self.dimensions = dimensions or int(os.getenv("MEMORY_EMBEDDING_DIM", "256"))
+        self._client = None
+
+    def client(self):
+        if self._client is None:
+            from google import genai
+            from config.registry import load_settings
+
+            settings = load_settings()
+            options = {"base_url": settings["GEMINI_BASE_URL"]} if settings["GEMINI_BASE_URL"] else None
+            self._client = genai.Client(api_key=settings["GEMINI_API_KEY"], http_options=options)
+        return self._client
+
+    def __call__(self, input: List[str]) -> List[List[float]]:
+        from google.genai import types
+        from tools.ratelimit import rate_budgets
+
+        vectors = []
+        for i in range(0, len(input), self.BATCH):
+            batch = input[i:i + self.BATCH]
+            rate_budgets.acquire("gemini", tokens=sum(len(t) for t in batch) // 4)
+            result = self.client().models.embed_content(
+                model=self.model, contents=batch,
+                config=types.EmbedContentConfig(output_dimensionality=self.dimensions),
+            )
+            vectors.extend(list(e.values) for e in result.embeddings)
+        return vectors
+
+
+class CachedEmbedder:
+    """Embeds only text the store has not embedded before"""
+
+    def __init__(self, embed, store: CompactStore):
+        self.embed = embed
+        self.store = store
+        self.stats = {"embedding_calls": 0, "texts_embedded": 0, "embedding_cache_hits": 0}
+        self._lock = threading.Lock()
+
+    def __call__(self, input: List[str]) -> List[List[float]]:
+        hashes = [_content_hash(t) for t in input]
+        found = self.store.cached_embeddings(list(dict.fromkeys(hashes)))
+        missing = list(dict.fromkeys(t for t, h in zip(input, hashes) if h not in found))
+        if missing:
+            with tracing.span("llm", f"embed:{getattr(self.embed, 'model', 'embedder')}", texts=len(missing)):
+                vectors = self.embed(missing)
+            fresh = {_content_hash(t): v for t, v in zip(missing, vectors)}
+            self.store.put_embeddings(fresh)
+            found.update(fresh)
+        with self._lock:
+            self.stats["embedding_calls"] += bool(missing)
+            self.stats["texts_embedded"] += len(missing)
+            self.stats["embedding_cache_hits"] += len(input) - len(missing)
+        return [found[h] for h in hashes]
+
+
+# lines worth remembering: findings with a figure, a source or a named use case
+_FINDING = re.compile(r"\d|https?://|\$|%")
+
+
+def extract_findings(content: str, limit: int = 8) -> List[str]:
+    """Short self-contained statements from a task result, without an LLM call"""
+    result = content.split("Result:", 1)[-1].strip()
+    try:
+        data = json.loads(result)
+    except ValueError:
+        data = None
+    if data is not None:
+        # structured output: its string leaves
+        lines, stack = [], [data]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, dict):
+                stack.extend(reversed(list(item.values())))
+            elif isinstance(item, list):
+                stack.extend(reversed(item))
+            elif isinstance(item, str):
+                lines.append(item)
+    else:
+        lines = result.splitlines()
+
+    findings = []
+    for line in lines:
+        line = re.sub(r"^[\s>*#\-\d.)]+", "", line).replace("**", "").strip()
+        if 30 <= len(line) and _FINDING.search(line) and line not in findings:
+            findings.append(line[:280])
+        if len(findings) >= limit:
+            break
+    return findings
+
+
+class CompactMemory(Memory):
+    """CrewAI memory without the LLM round-trips: findings are extracted by rule, recall is a
+    single vector search, and saves carry explicit scope and importance so encoding never asks the LLM.
+
+    Agents share one instance; each call reads and writes the namespace of the company
+    being analyzed (see ``namespace``), so a later run for the same company finds
+    what earlier runs stored and doesn't embed it again. Stages in ``disabled_stages``
+    neither read nor write, and nothing is recalled or stored while a cassette is active.
+    """
+
+    disabled_stages: List[str] = Field(default_factory=list)
+    findings_per_task: int = Field(default=8)
+    _stats: Dict[str, int] = PrivateAttr(default_factory=lambda: {"recalls": 0, "recalled": 0, "saves": 0})
+    _stats_lock: Any = PrivateAttr(default_factory=threading.Lock)
+
+    def active_root(self) -> Optional[str]:
+        company = _namespace.get()
+        if company is None or _stage.get() in self.disabled_stages or cassette.current() is not None:
+            return None
+        return f"/company/{company}"
+
+    def extract_memories(self, content: str) -> List[str]:
+        return extract_findings(content, self.findings_per_task)
+
+    def recall(self, query, scope=None, categories=None, limit=10, depth="shallow", source=None, include_private=False):
+        root = self.active_root()
+        if root is None:
+            return []
+        # task descriptions are long; the opening states what the task is about
+        matches = super().recall(
+            query[:1000], scope=root, categories=categories, limit=limit, depth="shallow",
+            source=source, include_private=include_private,
+        )
+        with self._stats_lock:
+            self._stats["recalls"] += 1
+            self._stats["recalled"] += len(matches)
+        tracing.add("memory_recalled", len(matches))
+        return matches
+
+    def remember_many(self, contents, scope=None, categories=None, metadata=None, importance=None,
+                      source=None, private=False, agent_role=None, root_scope=None):
+        root = self.active_root()
+        if root is None or self.read_only:
+            return []
+        fresh = self._storage.new_contents(root, contents)
+        if not fresh:
+            return []
+        step = sanitize_scope_name(_stage.get() or "run")
+        with self._stats_lock:
+            self._stats["saves"] += len(fresh)
+        return super().remember_many(
+            fresh, scope=scope or f"/{step}", categories=categories or [step], metadata=metadata or {},
+            importance=self.default_importance if importance is None else importance,
+            source=source or agent_role, private=private, agent_role=agent_role, root_scope=root,
+        )
+
+    def summary(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        return {
+            "backend": "compact",
+            **stats,
+            **self._storage.summary(),
+            **getattr(self._embedder_instance, "stats", {}),
+        }
+
+
+def build_memory():
+    """The agents' memory for MEMORY_BACKEND: compact (default), crewai (CrewAI's own default memory) or off"""
+    backend = os.getenv("MEMORY_BACKEND", "compact").lower()
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown MEMORY_BACKEND {backend!r}; expected one of {', '.join(BACKENDS)}")
+    if backend == "off":
+        return None
+    if backend == "crewai":
+        return True
+    from config.registry import get_llm
+
+    store = CompactStore()
+    disabled = [s.strip() for s in os.getenv("MEMORY_DISABLED_STAGES", "").split(",") if s.strip()]
+    return CompactMemory(
+        llm=get_llm(temperature=0.0),
+        storage=store,
+        embedder=CachedEmbedder(GeminiEmbedder(), store),
+        disabled_stages=disabled,
+        # keep recall about relevance to the task; records are bounded by the store instead
+        recency_weight=0.1,
+        semantic_weight=0.7,
+    )
+
+
+def summary() -> Dict[str, Any]:
+    from config.registry import get_memory
+
+    shared = get_memory()
+    if isinstance(shared, CompactMemory):
+        return shared.summary()
+    return {"backend": "crewai" if shared else "off"}
@@ -0,0 +1,102 @@
+"""
+Lazy Registry - builds agents, LLM clients and tools on first use, once per process
+"""
+
+import importlib
+import os
+import threading
+from typing import Dict
+
+DEFAULT_MODEL = "gemini/gemini-2.0-flash"
+
+# name -> "module:builder"; modules are only imported when the object is first requested
+AGENT_BUILDERS: Dict[str, str] = {
+    "research": "agents.research_agent:build_research_agent",
+    "usecase": "agents.usecase_agent:build_usecase_agent",
+    "dataset": "agents.dataset_agent:build_dataset_agent",
+    "proposal": "agents.proposal_agent:build_proposal_agent",
+}
+TOOL_BUILDERS: Dict[str, str] = {
+    "tavily": "tools.tavily_tool:build_tavily_tool",
+    "kaggle": "tools.kaggle_tool:KaggleDatasetTool",
+    "github": "tools.github_code_tool:GitHubCodeTool",
+    "dataset_search": "tools.dataset_tool:DatasetSearchTool",
+    "trusted_search": "tools.trusted_search_tool:TrustedSearchTool",
+    "file_manager": "tools.filemanager_tool:FileManagerTool",
+}
+
+_lock = threading.RLock()  # re-entrant: building an agent builds its tools and LLM
+_settings = None
+_agents: Dict[str, object] = {}
+_tools: Dict[str, object] = {}
+_llms: Dict[tuple, object] = {}
+_memory: Dict[str, object] = {}
+
+
+def load_settings() -> Dict[str, str]:
+    """Load .env once per process and return the settings the pipeline reads"""
+    global _settings
+    with _lock:
+        if _settings is None:
+            from dotenv import load_dotenv
+
+            load_dotenv()
+            _settings = {
+                "GEMINI_API_KEY": os.getenv("GEMINI_API_KEY"),
+                "TAVILY_API_KEY": os.getenv("TAVILY_API_KEY"),
+                "LLM_MODEL": os.getenv("LLM_MODEL", DEFAULT_MODEL),
+                "GEMINI_BASE_URL": os.getenv("GEMINI_BASE_URL"),
+            }
+        return _settings
+
+
+def _resolve(path: str):
+    module, _, attr = path.partition(":")
+    return getattr(importlib.import_module(module), attr)
+
+
+def get_llm(temperature: float, model: str = None):
+    """Shared LLM client per (model, temperature)"""
+    settings = load_settings()
+    model = model or settings["LLM_MODEL"]
+    with _lock:
+        key = (model, temperature)
+        if key not in _llms:
+            from crewai import LLM
+            from config import cassette
+
+            kwargs = {}
+            if settings["GEMINI_BASE_URL"]:
+                # e.g. a local stand-in for benchmarks
+                kwargs["client_params"] = {"http_options": {"base_url": settings["GEMINI_BASE_URL"]}}
+            _llms[key] = cassette.instrument_llm(
+                LLM(model=model, api_key=settings["GEMINI_API_KEY"], temperature=temperature, **kwargs)
+            )
+        return _llms[key]
+
+
+def get_memory():
+    """The memory every agent shares (see config.memory); None when MEMORY_BACKEND=off"""
+    with _lock:
+        if "agents" not in _memory:
+            from config.memory import build_memory
+
+            load_settings()
+            _memory["agents"] = build_memory()
+        return _memory["agents"]
+
+
+def get_tool(name: str):
+    with _lock:
+        if name not in _tools:
+            load_settings()
+            _tools[name] = _resolve(TOOL_BUILDERS[name])()
+        return _tools[name]
+
+
+def get_agent(name: str):
+    with _lock:
+        if name not in _agents:
+            load_settings()
+            _agents[name] = _resolve(AGENT_BUILDERS[name])()
+        return _agents[name]
@@ -0,0 +1,152 @@
+"""
+Research Store - industry findings shared across companies, company findings per company
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from config import tracing
+from config.stage_cache import StageCache, normalize_company
+from tools.singleflight import SingleFlight
+
+DAY = 24 * 3600
+
+# words that name the kind of thing rather than the thing: "Automotive Industry" == "automotive"
+_FILLER = {"industry", "industries", "sector", "sectors", "market", "markets", "the", "and", "of", "global"}
+
+
+def normalize_industry(industry: str) -> str:
+    """Order-, case- and filler-insensitive: "Retail & E-Commerce" == "e-commerce and retail industry" """
+    words = re.findall(r"[a-z0-9]+(?:-[a-z0-9]+)*", industry.lower().replace("&", " and "))
+    return " ".join(sorted(set(words) - _FILLER)) or industry.strip().lower()
+
+
+def task_version(task, name: str) -> str:
+    """What a finding from ``task`` depends on: its prompt, model, temperature and schema (as in its stage
+    cache key). ``name`` (the company or industry the prompt is about) is masked out, so every spelling of
+    an industry that normalizes to one key also shares one version."""
+    fingerprint = StageCache.fingerprint(task)
+    for field in ("description", "expected_output"):
+        fingerprint[field] = (fingerprint[field] or "").replace(name, "{name}")
+    raw = json.dumps(fingerprint, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+
+class ResearchStore:
+    """Two tiers of research findings in one SQLite file.
+
+    - industry: keyed by normalized industry (market size, CAGR, AI adoption);
+      shared by every company in it, kept ``industry_ttl`` seconds.
+    - company: keyed by normalized company (profile, competitors); kept the
+      shorter ``company_ttl``.
+
+    Each entry is one ``topic`` of a key (e.g. "analysis" or "profile"), stored
+    with the ``version`` of whatever produced it (see ``task_version``); an entry
+    from another version is a miss, so an edited prompt or a new model doesn't
+    keep serving the old answer until the TTL runs out.
+    ``fetch()`` runs at most once per key and topic at a time in this process, so
+    a batch of companies in one sector researches it once, not once per worker.
+    """
+
+    def __init__(self, path: str = None, industry_ttl: float = None, company_ttl: float = None, enabled: bool = None):
+        self.path = path or os.getenv("RESEARCH_STORE_PATH", os.path.join(".cache", "research.sqlite"))
+        self.ttls = {
+            "industry": industry_ttl or float(os.getenv("RESEARCH_INDUSTRY_TTL_DAYS", "30")) * DAY,
+            "company": company_ttl or float(os.getenv("RESEARCH_COMPANY_TTL_DAYS", "7")) * DAY,
+        }
+        self.enabled = enabled if enabled is not None else os.getenv("RESEARCH_STORE_DISABLED", "") not in ("1", "true")
+        self.stats = {"industry_hits": 0, "industry_misses": 0, "company_hits": 0, "company_misses": 0}
+        self._flights = SingleFlight(enabled=True)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._initialized = False
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+            with self._lock:
+                if not self._initialized:
+                    conn.execute(
+                        "CREATE TABLE IF NOT EXISTS findings ("
+                        " tier TEXT, key TEXT, topic TEXT, value TEXT, source TEXT, stored_at REAL,"
+                        " version TEXT DEFAULT '', PRIMARY KEY (tier, key, topic))"
+                    )
+                    columns = {row[1] for row in conn.execute("PRAGMA table_info(findings)")}
+                    if "version" not in columns:
+                        # stores from before versions: their rows match no task version, so they are refetched
+                        conn.execute("ALTER TABLE findings ADD COLUMN version TEXT")
+                    self._initialized = True
+        return conn
+
+    @staticmethod
+    def key(tier: str, name: str) -> str:
+        return normalize_industry(name) if tier == "industry" else normalize_company(name)
+
+    def get(self, tier: str, name: str, topic: str, version: str = "") -> Optional[str]:
+        """The stored finding if it is younger than the tier's TTL and was produced by ``version``"""
+        if not self.enabled:
+            return None
+        try:
+            row = self._conn().execute(
+                "SELECT value, stored_at, version FROM findings WHERE tier = ? AND key = ? AND topic = ?",
+                (tier, self.key(tier, name), topic),
+            ).fetchone()
+        except sqlite3.Error:
+            return None
+        fresh = (
+            row is not None and (row[2] or "") == version
+            and time.time() - row[1] <= self.ttls[tier] and row[0].strip()
+        )
+        outcome = "hits" if fresh else "misses"
+        with self._lock:
+            self.stats[f"{tier}_{outcome}"] += 1
+        tracing.add(f"research_{tier}_{outcome}")
+        return row[0] if fresh else None
+
+    def put(self, tier: str, name: str, topic: str, value: str, source: str = "", version: str = ""):
+        if not self.enabled or not value.strip():
+            return
+        try:
+            self._conn().execute(
+                "INSERT OR REPLACE INTO findings (tier, key, topic, value, source, stored_at, version)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (tier, self.key(tier, name), topic, value, source, time.time(), version),
+            )
+        except sqlite3.Error:
+            pass  # best effort, like the other caches
+
+    def get_or_fetch(self, tier: str, name: str, topic: str, fetch: Callable[[], str], source: str = "",
+                     version: str = "") -> str:
+        """Stored finding, or ``fetch()``'s result (stored for the next company)"""
+        if not self.enabled:
+            return fetch()
+
+        def load():
+            value = self.get(tier, name, topic, version)
+            if value is None:
+                value = fetch()
+                self.put(tier, name, topic, value, source, version)
+            return value
+
+        return self._flights.do((tier, self.key(tier, name), topic, version), load)
+
+    def summary(self) -> Dict:
+        with self._lock:
+            stats = dict(self.stats)
+        for tier in ("industry", "company"):
+            lookups = stats[f"{tier}_hits"] + stats[f"{tier}_misses"]
+            stats[f"{tier}_hit_rate"] = round(stats[f"{tier}_hits"] / lookups, 3) if lookups else 0.0
+        return stats
+
+
+research_store = ResearchStore()
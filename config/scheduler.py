@@ -0,0 +1,254 @@
+"""
+DAG Task Scheduler - runs crew tasks as soon as their context is ready
+"""
+
+import threading
+import time
+import warnings
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional
+
+from crewai.tasks.task_output import TaskOutput
+
+from config import events, memory, schemas, tracing
+
+_copy_lock = threading.Lock()
+
+
+def copy_agent(agent):
+    """``agent.copy()`` without pydantic's serializer warnings about the llm/memory fields"""
+    with _copy_lock, warnings.catch_warnings():
+        warnings.simplefilter("ignore", UserWarning)
+        copied = agent.copy()
+    # copy() rebuilds memory from its fields, i.e. a fresh store per task; share the agent's instead
+    copied.memory = agent.memory
+    return copied
+
+
+class TaskScheduler:
+    """Execute CrewAI tasks by dependency graph instead of list order.
+
+    Edges come from each task's ``context`` list. Every task whose inputs are
+    done is started immediately on a bounded thread pool, so independent stages
+    overlap. ``runners`` maps a task name to a custom callable (e.g. the parallel
+    dataset stage); everything else runs via ``task.execute_sync``.
+
+    With a ``cache`` (see config.stage_cache), finished outputs are stored per
+    task and reused on the next run, so a rerun resumes at the first stage whose
+    key is missing or changed. Task start/finish/failure is reported through
+    config.events. ``on_finished(task, output)`` is called as each task's output
+    becomes available (cached or fresh), before its dependents start.
+    """
+
+    def __init__(
+        self,
+        tasks: List,
+        runners: Optional[Dict[str, Callable]] = None,
+        max_workers: int = 4,
+        cache=None,
+        company_name: str = "",
+        on_finished: Optional[Callable] = None,
+    ):
+        self.tasks = list(tasks)
+        self.runners = runners or {}
+        self.max_workers = max_workers
+        self.cache = cache
+        self.company_name = company_name
+        self.on_finished = on_finished
+        self.timings: Dict[str, Dict] = {}
+
+        names = [self.name_of(t) for t in self.tasks]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Task names must be unique for scheduling: {names}")
+
+        in_graph = {id(t) for t in self.tasks}
+        self.deps = {
+            id(t): [c for c in self.context_of(t) if id(c) in in_graph and c is not t]
+            for t in self.tasks
+        }
+        self._check_acyclic()
+
+        self.cache_keys: Dict[int, str] = {}
+        if self.cache is not None:
+            for task in self.topological_order():
+                upstream = [self.cache_keys[id(d)] for d in self.deps[id(task)]]
+                self.cache_keys[id(task)] = self.cache.key_for(task, company_name, upstream)
+
+    @staticmethod
+    def name_of(task) -> str:
+        return task.name or task.description.strip().splitlines()[0][:60]
+
+    def _check_acyclic(self):
+        state = {}
+
+        def visit(task):
+            if state.get(id(task)) == "done":
+                return
+            if state.get(id(task)) == "visiting":
+                raise ValueError(f"Cycle in task context at '{self.name_of(task)}'")
+            state[id(task)] = "visiting"
+            for dep in self.deps[id(task)]:
+                visit(dep)
+            state[id(task)] = "done"
+
+        for task in self.tasks:
+            visit(task)
+
+    def topological_order(self) -> List:
+        """Tasks in an order that respects context dependencies (stable w.r.t. input order)"""
+        ordered, seen = [], set()
+
+        def visit(task):
+            if id(task) in seen:
+                return
+            seen.add(id(task))
+            for dep in self.deps[id(task)]:
+                visit(dep)
+            ordered.append(task)
+
+        for task in self.tasks:
+            visit(task)
+        return ordered
+
+    @staticmethod
+    def context_of(task) -> List:
+        # crewai uses a NOT_SPECIFIED sentinel rather than None for "no context"
+        return task.context if isinstance(task.context, list) else []
+
+    @staticmethod
+    def context_for(task) -> str:
+        # structured outputs are passed on as their markdown rendering, not raw JSON
+        return "\n\n----------\n\n".join(
+            schemas.render(c.output) for c in TaskScheduler.context_of(task) if c.output
+        )
+
+    def emit(self, event_type: str, **fields):
+        events.emit({"type": event_type, "time": time.time(), **fields})
+
+    def _execute(self, task):
+        name = self.name_of(task)
+        self.timings[name] = {"start": time.time()}
+        self.emit("task_started", task=name)
+        try:
+            with tracing.span("task", name) as span, memory.stage(name):
+                cached = self._from_cache(task)
+                if cached is not None:
+                    self.timings[name]["cached"] = True
+                    span.set(cached=1, bytes=len(cached.raw.encode("utf-8")))
+                    self.emit("task_finished", task=name, cached=True, output=schemas.render(cached))
+                    return cached
+
+                runner = self.runners.get(name)
+                if runner is not None:
+                    output = runner(task)
+                else:
+                    # agent executors are not thread-safe, and agents are shared by tasks
+                    # in this graph and by other crews running in the same process
+                    agent = copy_agent(task.agent) if task.agent is not None else None
+                    output = task.execute_sync(agent=agent, context=self.context_for(task))
+                task.output = output
+                span.set(bytes=len(output.raw.encode("utf-8")))
+                self.write_output_file(task, output)
+                if self.cache is not None:
+                    self.cache.save(self.cache_keys[id(task)], name, output.raw, output.agent)
+                self.emit("task_finished", task=name, cached=False, output=schemas.render(output))
+                return output
+        except Exception as e:
+            self.emit("task_failed", task=name, error=str(e))
+            raise
+        finally:
+            end = time.time()
+            self.timings[name]["end"] = end
+            self.timings[name]["duration"] = round(end - self.timings[name]["start"], 3)
+
+    def is_cached(self, task) -> bool:
+        """Whether the next run will reuse ``task``'s stored output instead of executing it"""
+        return self.cache is not None and self.cache.load(self.cache_keys[id(task)]) is not None
+
+    def _from_cache(self, task) -> Optional[TaskOutput]:
+        if self.cache is None:
+            return None
+        entry = self.cache.load(self.cache_keys[id(task)])
+        if entry is None:
+            return None
+        output = TaskOutput(
+            name=task.name,
+            description=task.description,
+            expected_output=task.expected_output,
+            raw=entry["raw"],
+            pydantic=schemas.restore(task, entry["raw"]),
+            agent=entry.get("agent") or getattr(task.agent, "role", ""),
+        )
+        self.write_output_file(task, output)
+        task.output = output
+        return output
+
+    @staticmethod
+    def write_output_file(task, output):
+        """The task's output_file always holds markdown; CrewAI itself writes structured outputs as JSON"""
+        if task.output_file:
+            with open(task.output_file, "w", encoding="utf-8") as f:
+                f.write(schemas.render(output))
+
+    def run(self) -> Dict[str, object]:
+        """Run the whole graph; returns {task name: TaskOutput}. Re-raises the first failure."""
+        pending = {id(t): t for t in self.tasks}
+        done = set()
+        outputs = {}
+        error = None
+        self.started_at = time.time()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="crew-task") as pool:
+            running = {}
+            while pending or running:
+                if error is None:
+                    ready = [
+                        t for t in self.topological_order()
+                        if id(t) in pending and all(id(d) in done for d in self.deps[id(t)])
+                    ]
+                    for task in ready:
+                        del pending[id(task)]
+                        running[events.submit(pool, self._execute, task)] = task
+                if not running:
+                    break
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    task = running.pop(future)
+                    try:
+                        outputs[self.name_of(task)] = future.result()
+                        done.add(id(task))
+                    except Exception as e:
+                        self.timings[self.name_of(task)]["error"] = str(e)
+                        error = error or e  # stop scheduling; let in-flight tasks finish
+                        continue
+                    if self.on_finished is not None:
+                        try:
+                            self.on_finished(task, outputs[self.name_of(task)])
+                        except Exception:
+                            pass  # an observer must not fail the run
+
+        self.finished_at = time.time()
+        if error is not None:
+            raise error
+        return outputs
+
+    def summary(self) -> Dict:
+        """Wall time vs. summed task time, plus per-task offsets from the start of the run"""
+        start = getattr(self, "started_at", None)
+        busy = sum(t.get("duration", 0) for t in self.timings.values())
+        wall = (getattr(self, "finished_at", time.time()) - start) if start else 0
+        return {
+            "wall_seconds": round(wall, 3),
+            "task_seconds": round(busy, 3),
+            "tasks": {
+                name: {
+                    "start_offset": round(t["start"] - start, 3),
+                    "end_offset": round(t.get("end", t["start"]) - start, 3),
+                    "duration": t.get("duration"),
+                    **({"cached": True} if t.get("cached") else {}),
+                    **({"error": t["error"]} if "error" in t else {}),
+                }
+                for name, t in self.timings.items()
+            } if start else {},
+        }
@@ -0,0 +1,167 @@
+"""
+Structured Outputs - schemas for the research profile, use cases and resource mappings
+"""
+
+from typing import List, Optional
+
+from pydantic import BaseModel, Field, ValidationError
+
+# order use case tiers are listed in, matching the use case task's categories
+CATEGORY_ORDER = ["Quick Win", "Strategic Initiative", "Transformational"]
+
+
+def _bullets(items: List[str]) -> str:
+    return "\n".join(f"- {item}" for item in items)
+
+
+class CompanyProfile(BaseModel):
+    company: str
+    business_model: str = Field(description="B2B, B2C or B2B2C; 'No trusted info found' if unknown")
+    industry: str
+    revenue: Optional[str] = Field(None, description="latest annual revenue with year, e.g. '$96.8B (2023)'")
+    employees: Optional[str] = None
+    market_position: Optional[str] = None
+    ai_readiness_score: Optional[str] = Field(None, description="1-5 scale, e.g. '4/5'")
+    strategic_priorities: List[str] = Field(default_factory=list)
+    pain_points: List[str] = Field(default_factory=list)
+    ai_initiatives: List[str] = Field(default_factory=list)
+    sources: List[str] = Field(default_factory=list, description="URLs backing the figures above")
+    gaps: List[str] = Field(default_factory=list, description="sections with no trusted information found")
+
+    def to_markdown(self) -> str:
+        facts = [
+            ("Business Model", self.business_model),
+            ("Industry", self.industry),
+            ("Revenue", self.revenue),
+            ("Employees", self.employees),
+            ("Market Position", self.market_position),
+            ("AI Readiness Score", self.ai_readiness_score),
+        ]
+        parts = [f"# Company Research: {self.company}", "\n".join(f"- **{k}:** {v}" for k, v in facts if v)]
+        for title, items in (
+            ("Strategic Priorities", self.strategic_priorities),
+            ("Pain Points", self.pain_points),
+            ("Current AI Initiatives", self.ai_initiatives),
+            ("Sources", self.sources),
+        ):
+            if items:
+                parts.append(f"## {title}\n{_bullets(items)}")
+        if self.gaps:
+            parts.append("⚠️ No trusted information found for: " + ", ".join(self.gaps))
+        return "\n\n".join(parts) + "\n"
+
+
+class UseCase(BaseModel):
+    title: str
+    category: str = Field(description="Quick Win, Strategic Initiative or Transformational")
+    problem_statement: str
+    ai_solution: str
+    business_benefits: str
+    estimated_roi: str = Field(description="% or $ savings")
+    complexity: str = Field(description="Low, Medium or High")
+    industry_example: str
+
+    def to_markdown(self, number: int = None) -> str:
+        prefix = f"{number}. " if number is not None else ""
+        return (
+            f"### {prefix}{self.title}\n"
+            f"- **Problem Statement:** {self.problem_statement}\n"
+            f"- **AI Solution:** {self.ai_solution}\n"
+            f"- **Business Benefits:** {self.business_benefits}\n"
+            f"- **Estimated ROI:** {self.estimated_roi}\n"
+            f"- **Complexity:** {self.complexity}\n"
+            f"- **Industry Example:** {self.industry_example}\n"
+        )
+
+    def brief(self) -> str:
+        """Just the fields a resource search needs (no benefits, ROI or complexity)"""
+        return (
+            f"### {self.title}\n"
+            f"- **Problem Statement:** {self.problem_statement}\n"
+            f"- **AI Solution:** {self.ai_solution}\n"
+            f"- **Industry Example:** {self.industry_example}\n"
+        )
+
+
+class UseCasePortfolio(BaseModel):
+    company: str
+    use_cases: List[UseCase]
+
+    def by_category(self):
+        """[(category, [use cases])] in tier order; unknown categories come last"""
+        def rank(category):
+            lowered = category.lower()
+            for i, known in enumerate(CATEGORY_ORDER):
+                if lowered.startswith(known.lower().split()[0]):
+                    return i
+            return len(CATEGORY_ORDER)
+
+        groups = {}
+        for use_case in self.use_cases:
+            groups.setdefault(use_case.category.strip() or "Other", []).append(use_case)
+        return sorted(groups.items(), key=lambda item: rank(item[0]))
+
+    def to_markdown(self) -> str:
+        parts, number = [f"# AI Use Case Portfolio for {self.company}"], 1
+        for category, use_cases in self.by_category():
+            section = [f"## {category}"]
+            for use_case in use_cases:
+                section.append(use_case.to_markdown(number).rstrip())
+                number += 1
+            parts.append("\n\n".join(section))
+        return "\n\n".join(parts)
+
+
+class Resource(BaseModel):
+    title: str
+    url: str
+    kind: str = Field(description="dataset, model, repository or api")
+    platform: str = Field(description="e.g. Kaggle, HuggingFace, GitHub")
+    quality_score: Optional[str] = Field(None, description="e.g. '8/10'")
+    description: str = ""
+
+    def to_markdown(self) -> str:
+        details = ", ".join(x for x in (self.platform, self.kind, self.quality_score and f"quality {self.quality_score}") if x)
+        line = f"- **[{self.title}]({self.url})** ({details})"
+        return f"{line}\n  - {self.description}" if self.description else line
+
+
+class ResourceMapping(BaseModel):
+    use_case: str
+    resources: List[Resource] = Field(default_factory=list)
+    notes: Optional[str] = Field(None, description="data preparation requirements and caveats")
+
+    def to_markdown(self) -> str:
+        lines = [f"### {self.use_case}", ""]
+        lines += [r.to_markdown() for r in self.resources] or ["- No resources found."]
+        if self.notes:
+            lines += ["", f"**Data preparation:** {self.notes}"]
+        return "\n".join(lines)
+
+
+class ResourceCollection(BaseModel):
+    company: str
+    mappings: List[ResourceMapping]
+
+    def to_markdown(self) -> str:
+        sections = "\n\n".join(m.to_markdown() for m in self.mappings)
+        return f"# Resource Asset Collection for {self.company}\n\n{sections}\n"
+
+
+def render(output) -> str:
+    """Markdown for a TaskOutput: rendered from its schema when it has one, else the raw text"""
+    model = getattr(output, "pydantic", None)
+    if model is not None and hasattr(model, "to_markdown"):
+        return model.to_markdown()
+    return output.raw
+
+
+def restore(task, raw: str) -> Optional[BaseModel]:
+    """Rebuild a task's structured output from stored JSON (e.g. a stage cache entry)"""
+    schema = getattr(task, "output_pydantic", None)
+    if schema is None:
+        return None
+    try:
+        return schema.model_validate_json(raw)
+    except (ValidationError, ValueError):
+        return None
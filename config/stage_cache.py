@@ -0,0 +1,85 @@
+"""
+Stage Result Cache - content-addressed store for per-task outputs
+"""
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+
+def normalize_company(company_name: str) -> str:
+    name = re.sub(r"\s+", " ", company_name.strip().lower())
+    return name.strip(" .,")
+
+
+class StageCache:
+    """Stores each task's raw output on disk under a key derived from everything that shapes it.
+
+    The key covers the normalized company name, the task's description and
+    expected_output, the agent's model and temperature, and the keys of the
+    tasks it takes as context. Editing one prompt therefore invalidates that
+    stage and everything downstream of it, while upstream stages stay cached.
+    """
+
+    def __init__(self, root: str = None, enabled: bool = None):
+        self.root = root or os.getenv("STAGE_CACHE_DIR", os.path.join(".cache", "stages"))
+        self.enabled = enabled if enabled is not None else os.getenv("STAGE_CACHE_DISABLED", "") not in ("1", "true")
+
+    @staticmethod
+    def fingerprint(task) -> Dict:
+        """Everything about the task itself that shapes its output: prompt, model, temperature and schema"""
+        llm = getattr(task.agent, "llm", None)
+        return {
+            "name": task.name,
+            "description": task.description,
+            "expected_output": task.expected_output,
+            "model": getattr(llm, "model", None),
+            "temperature": getattr(llm, "temperature", None),
+            "schema": getattr(getattr(task, "output_pydantic", None), "__name__", None),
+        }
+
+    @staticmethod
+    def key_for(task, company_name: str, upstream_keys: List[str]) -> str:
+        fingerprint = {
+            "company": normalize_company(company_name),
+            **StageCache.fingerprint(task),
+            "upstream": upstream_keys,
+        }
+        raw = json.dumps(fingerprint, sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], f"{key}.json")
+
+    def load(self, key: str) -> Optional[Dict]:
+        if not self.enabled:
+            return None
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        # an empty output is as good as missing; rerun the stage
+        return entry if entry.get("raw", "").strip() else None
+
+    def save(self, key: str, task_name: str, raw: str, agent: str = ""):
+        if not self.enabled or not raw.strip():
+            return
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # a temp file of its own per writer: two threads may save the same key (same company, same use case title)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"task": task_name, "agent": agent, "raw": raw, "created_at": time.time()}, f)
+            os.replace(tmp, path)  # atomic, so concurrent runs never see half-written entries
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+
+stage_cache = StageCache()
@@ -4,6 +4,11 @@ Optimized Task Configuration
 
 import os
 from crewai import Task
+from config.schemas import CompanyProfile, ResourceCollection, ResourceMapping, UseCasePortfolio
+from utils import company_slug
+
+# every use case portfolio covers these (tools.prefetch searches for them before the portfolio exists)
+USE_CASE_CATEGORIES = ("Predictive Analytics", "NLP/GenAI", "Computer Vision", "Automation")
 
 class TaskConfig:
     @staticmethod
@@ -14,39 +19,86 @@ class TaskConfig:
     def create_research_task(research_agent, company_name: str):
         TaskConfig._ensure_output_dir()
         return Task(
+            name="research",
             description=(
-                f"Conduct executive-level research for {company_name}:\n"
+                f"Conduct executive-level company research for {company_name}:\n"
                 f"1. BUSINESS MODEL: Identify if {company_name} is B2B or B2C company\n"
-                f"2. INDUSTRY ANALYSIS: Market size ($B), CAGR, AI adoption trends\n"
-                f"3. COMPANY ANALYSIS: Revenue, positioning, tech readiness for {company_name}\n"
-                f"4. COMPETITIVE LANDSCAPE: Top players' AI strategies in {company_name}'s market\n"
-                f"Quantify everything - market size, growth rates, adoption metrics\n"
+                f"2. COMPANY ANALYSIS: Revenue, employees, positioning, tech readiness for {company_name}\n"
+                f"3. STRATEGY: Strategic priorities, pain points and current AI initiatives\n"
+                f"Quantify everything - revenue, growth rates, adoption metrics\n"
                 f"Include [Source: URL] for all major claims"
             ),
             expected_output=(
-                "Strategic research report with:\n"
+                "Company research report with:\n"
                 "- B2B/B2C classification (or state 'No trusted info found')\n"
-                "- Market analysis (size, CAGR, trends) with sources if available\n"
                 "- Company profile with AI readiness score\n"
-                "- Competitor AI initiatives\n"
+                "- Strategic priorities and pain points with sources if available\n"
                 "⚠️ If any section lacks info from trusted sources, explicitly note it."
             ),
             agent=research_agent,
-            output_file=f"outputs/{company_name.lower().replace(' ', '_')}_research.md",
+            output_pydantic=CompanyProfile,
+            output_file=f"outputs/{company_slug(company_name)}_research.md",
+        )
+
+    @staticmethod
+    def create_industry_research_task(research_agent, company_name: str, industry: str = None):
+        """With ``industry`` the prompt names only the industry, so the result can be shared by its companies"""
+        TaskConfig._ensure_output_dir()
+        market = f"the {industry} industry" if industry else f"the market {company_name} operates in"
+        return Task(
+            name="industry_research",
+            description=(
+                f"Conduct executive-level industry research for {market}:\n"
+                f"1. INDUSTRY ANALYSIS: Market size ($B), CAGR, key segments\n"
+                f"2. AI ADOPTION: Maturity level (1-5), key AI trends with quantified impact\n"
+                f"Quantify everything - market size, growth rates, adoption metrics\n"
+                f"Include [Source: URL] for all major claims"
+            ),
+            expected_output=(
+                "Industry analysis with:\n"
+                "- Industry name and market analysis (size, CAGR, trends) with sources if available\n"
+                "- AI adoption maturity and trends\n"
+                "⚠️ If any section lacks info from trusted sources, explicitly note it."
+            ),
+            agent=research_agent,
+            output_file=f"outputs/{company_slug(company_name)}_industry.md",
+        )
+
+    @staticmethod
+    def create_competitor_research_task(research_agent, company_name: str):
+        TaskConfig._ensure_output_dir()
+        return Task(
+            name="competitor_research",
+            description=(
+                f"Research the competitive landscape of {company_name}:\n"
+                f"1. Identify the top 3-5 competitors in {company_name}'s market\n"
+                f"2. Summarize each competitor's AI strategy and initiatives\n"
+                f"3. Note market positioning and differentiation gaps\n"
+                f"Include [Source: URL] for all major claims"
+            ),
+            expected_output=(
+                "Competitive landscape with:\n"
+                "- Top competitors and their AI initiatives with sources if available\n"
+                "- Positioning and differentiation gaps\n"
+                "⚠️ If any section lacks info from trusted sources, explicitly note it."
+            ),
+            agent=research_agent,
+            output_file=f"outputs/{company_slug(company_name)}_competitors.md",
         )
 
     @staticmethod
     def create_usecase_task(usecase_agent, company_name: str):
         TaskConfig._ensure_output_dir()
         return Task(
+            name="usecases",
             description=(
                 f"Generate 10-12 strategic AI use cases for {company_name}:\n"
-                f"1. Use business model (B2B/B2C) from research to tailor use cases\n"
+                f"1. Use business model (B2B/B2C) and industry research to tailor use cases\n"
                 f"2. Create detailed use cases with exact structure:\n"
                 f"   - Problem Statement, AI Solution, Business Benefits\n"
                 f"   - Estimated ROI (% or $ savings), Complexity, Industry Example\n"
                 f"3. Categorize into: Quick Wins, Strategic Initiatives, Transformational\n"
-                f"4. Cover: Predictive Analytics, NLP/GenAI, Computer Vision, Automation\n"
+                f"4. Cover: {', '.join(USE_CASE_CATEGORIES)}\n"
                 f"Make each use case a mini-business case for {company_name}"
             ),
             expected_output=(
@@ -58,13 +110,15 @@ class TaskConfig:
                 f"- Tailored to {company_name}'s business model and industry"
             ),
             agent=usecase_agent,
-            output_file=f"outputs/{company_name.lower().replace(' ', '_')}_usecases.md",
+            output_pydantic=UseCasePortfolio,
+            output_file=f"outputs/{company_slug(company_name)}_usecases.md",
         )
 
     @staticmethod
     def create_dataset_task(dataset_agent, company_name: str):
         TaskConfig._ensure_output_dir()
         return Task(
+            name="resources",
             description=(
                 f"Find datasets and resources for {company_name} AI use cases:\n"
                 f"1. Map specific datasets to each use case identified\n"
@@ -83,13 +137,38 @@ class TaskConfig:
                 f"- Organized by use case priority tier"
             ),
             agent=dataset_agent,
-            output_file=f"outputs/{company_name.lower().replace(' ', '_')}_resources.md",
+            output_pydantic=ResourceCollection,
+            output_file=f"outputs/{company_slug(company_name)}_resources.md",
+        )
+
+    @staticmethod
+    def create_usecase_dataset_task(dataset_agent, company_name: str, use_case: dict):
+        """One slice of the dataset stage: resources for a single use case."""
+        return Task(
+            description=(
+                f"Find datasets and resources for this {company_name} AI use case:\n\n"
+                f"{use_case['text']}\n\n"
+                f"1. Search Kaggle and GitHub for resources specific to '{use_case['name']}'\n"
+                f"2. For each resource provide: [Title](URL), quality score, description\n"
+                f"3. Include pre-trained models, APIs, and code repositories\n"
+                f"4. Note any data preparation requirements\n"
+                f"Focus on resources most relevant to {company_name}'s industry"
+            ),
+            expected_output=(
+                f"Resource mapping for the use case '{use_case['name']}' with:\n"
+                f"- Kaggle datasets with links, size and quality score\n"
+                f"- GitHub repositories with links, stars and description\n"
+                f"- Data preparation notes"
+            ),
+            agent=dataset_agent,
+            output_pydantic=ResourceMapping,
         )
 
     @staticmethod
     def create_proposal_task(proposal_agent, company_name: str):
         TaskConfig._ensure_output_dir()
         return Task(
+            name="proposal",
             description=(
                 f"Create executive AI Transformation Proposal for {company_name}:\n"
                 f"Synthesize all research, use cases, and resources into professional report:\n"
@@ -112,5 +191,5 @@ class TaskConfig:
                 f"- Executive presentation quality with proper formatting"
             ),
             agent=proposal_agent,
-            output_file=f"outputs/{company_name.lower().replace(' ', '_')}_proposal.md",
+            output_file=f"outputs/{company_slug(company_name)}_proposal.md",
         )
\ No newline at end of file
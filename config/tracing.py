@@ -0,0 +1,302 @@
+"""
+Run Tracing - timed spans for tasks, tools, HTTP requests and LLM calls in a local trace store
+"""
+
+import contextvars
+import functools
+import inspect
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+# kinds written to the store: run > task > tool > http, and llm under the task (or tool) that made the call
+SPAN_KINDS = ("run", "task", "subtask", "tool", "http", "llm")
+
+
+class Span:
+    """One timed operation. ``attrs`` holds counters and facts (bytes, retries, cache hits, tokens)."""
+
+    def __init__(self, trace_id: str, kind: str, name: str, parent_id: Optional[str] = None, **attrs):
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.kind = kind
+        self.name = name
+        self.start = time.time()
+        self.attrs = {k: v for k, v in attrs.items() if v is not None}
+        self.status = "ok"
+        self._lock = threading.Lock()
+
+    def set(self, **attrs):
+        with self._lock:
+            self.attrs.update({k: v for k, v in attrs.items() if v is not None})
+
+    def add(self, key: str, n: float = 1):
+        with self._lock:
+            self.attrs[key] = self.attrs.get(key, 0) + n
+
+
+class _NullSpan:
+    """Returned outside a traced run so instrumented code never has to check"""
+
+    def set(self, **attrs):
+        pass
+
+    def add(self, key: str, n: float = 1):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+# innermost open span for this context; inherited by threads started through config.events.submit
+_current: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("trace_span", default=None)
+
+
+class TraceStore:
+    """Append-only SQLite store of finished spans, one row per span.
+
+    Writes are best effort: a locked or unwritable database never fails a run.
+    """
+
+    def __init__(self, path: str = None, enabled: bool = None):
+        self.path = path or os.getenv("TRACE_PATH", os.path.join(".cache", "traces.sqlite"))
+        self.enabled = enabled if enabled is not None else os.getenv("TRACE_DISABLED", "") not in ("1", "true")
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._initialized = False
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._lock:
+                if not self._initialized:
+                    conn.execute(
+                        "CREATE TABLE IF NOT EXISTS spans ("
+                        " trace_id TEXT, span_id TEXT PRIMARY KEY, parent_id TEXT, kind TEXT, name TEXT,"
+                        " start REAL, duration REAL, status TEXT, attrs TEXT)"
+                    )
+                    conn.execute("CREATE INDEX IF NOT EXISTS spans_trace ON spans(trace_id)")
+                    conn.execute("CREATE INDEX IF NOT EXISTS spans_kind ON spans(kind, start)")
+                    self._initialized = True
+        return conn
+
+    def write(self, span: Span, duration: float):
+        if not self.enabled:
+            return
+        try:
+            self._conn().execute(
+                "INSERT OR REPLACE INTO spans VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    span.trace_id, span.span_id, span.parent_id, span.kind, span.name,
+                    span.start, duration, span.status, json.dumps(span.attrs, default=str),
+                ),
+            )
+        except sqlite3.Error:
+            pass
+
+    def recent_traces(self, runs: int = 20, company: str = None) -> List[str]:
+        query = "SELECT trace_id FROM spans WHERE kind = 'run'"
+        args = []
+        if company:
+            query += " AND lower(name) = lower(?)"
+            args.append(company)
+        query += " ORDER BY start DESC LIMIT ?"
+        return [row[0] for row in self._conn().execute(query, (*args, runs))]
+
+    def spans(self, trace_ids: List[str]) -> List[Dict]:
+        if not trace_ids:
+            return []
+        marks = ",".join("?" * len(trace_ids))
+        rows = self._conn().execute(
+            f"SELECT trace_id, kind, name, duration, status, attrs FROM spans WHERE trace_id IN ({marks})",
+            trace_ids,
+        )
+        return [
+            {"trace_id": t, "kind": k, "name": n, "duration": d, "status": s, "attrs": json.loads(a or "{}")}
+            for t, k, n, d, s, a in rows
+        ]
+
+    def report(self, runs: int = 20, company: str = None) -> Dict:
+        """p50/p95 per run, stage, tool, external host and LLM-calling stage over the last ``runs`` runs"""
+        traces = self.recent_traces(runs, company)
+        spans = self.spans(traces)
+
+        def group(kind, key=lambda s: s["name"]):
+            grouped = {}
+            for s in spans:
+                if s["kind"] == kind:
+                    grouped.setdefault(key(s), []).append(s)
+            return grouped
+
+        def stats(items, *counters):
+            row = {
+                "count": len(items),
+                "errors": sum(s["status"] != "ok" for s in items),
+                "p50_s": _percentile([s["duration"] for s in items], 0.5),
+                "p95_s": _percentile([s["duration"] for s in items], 0.95),
+            }
+            for counter in counters:
+                row[counter] = sum(s["attrs"].get(counter, 0) for s in items)
+            return row
+
+        return {
+            "runs": len(traces),
+            "run": stats([s for s in spans if s["kind"] == "run"]),
+            "stages": {name: stats(items, "cached") for name, items in sorted(group("task").items())},
+            "tools": {
+                name: stats(items, "cache_hits", "cache_stale_hits", "cache_misses", "collapsed", "bytes")
+                for name, items in sorted(group("tool").items())
+            },
+            "hosts": {name: stats(items, "retries", "bytes") for name, items in sorted(group("http").items())},
+            "llm": {
+                name: stats(items, "prompt_tokens", "completion_tokens", "total_tokens")
+                for name, items in sorted(group("llm", key=lambda s: s["attrs"].get("task") or "-").items())
+            },
+        }
+
+
+def _percentile(values: List[float], q: float) -> Optional[float]:
+    data = sorted(v for v in values if v is not None)
+    if not data:
+        return None
+    return round(data[min(len(data) - 1, int(q * len(data)))], 3)
+
+
+trace_store = TraceStore()
+
+
+@contextmanager
+def trace_run(name: str, **attrs):
+    """Open a new trace; every span opened in this context (and in threads it submits) joins it"""
+    _register_llm_listeners()
+    span = Span(uuid.uuid4().hex, "run", name, **attrs)
+    with _activate(span):
+        yield span
+
+
+@contextmanager
+def span(kind: str, name: str, **attrs):
+    """Time a block as a child of the current span; a no-op outside a traced run"""
+    parent = _current.get()
+    if parent is None:
+        yield _NULL_SPAN
+        return
+    child = Span(parent.trace_id, kind, name, parent.span_id, **attrs)
+    with _activate(child):
+        yield child
+
+
+@contextmanager
+def _activate(span: Span):
+    token = _current.set(span)
+    started = time.perf_counter()
+    try:
+        yield
+    except BaseException as e:
+        span.status = "error"
+        span.set(error=str(e)[:300])
+        raise
+    finally:
+        _current.reset(token)
+        trace_store.write(span, round(time.perf_counter() - started, 4))
+
+
+def current_span():
+    return _current.get() or _NULL_SPAN
+
+
+def add(key: str, n: float = 1):
+    """Bump a counter (e.g. cache_hits) on the innermost open span"""
+    current_span().add(key, n)
+
+
+def traced_tool(run):
+    """Decorator for a tool's ``_run`` or ``_arun``: one "tool" span per call, with input and output size"""
+
+    if inspect.iscoroutinefunction(run):
+        @functools.wraps(run)
+        async def wrapper(self, *args, **kwargs):
+            with span("tool", self.name, input=_preview(args[0] if args else kwargs)) as s:
+                result = await run(self, *args, **kwargs)
+                s.set(bytes=len(str(result).encode("utf-8")))
+                return result
+    else:
+        @functools.wraps(run)
+        def wrapper(self, *args, **kwargs):
+            with span("tool", self.name, input=_preview(args[0] if args else kwargs)) as s:
+                result = run(self, *args, **kwargs)
+                s.set(bytes=len(str(result).encode("utf-8")))
+                return result
+
+    return wrapper
+
+
+def _preview(value, limit: int = 200) -> str:
+    text = value if isinstance(value, str) else str(value)
+    return text if len(text) <= limit else text[:limit] + "..."
+
+
+_listeners_registered = False
+_register_lock = threading.Lock()
+_llm_calls: Dict[str, Span] = {}
+
+
+def _register_llm_listeners():
+    """Turn CrewAI's LLM call events into "llm" spans; its bus runs handlers with the caller's context"""
+    global _listeners_registered
+    with _register_lock:
+        if _listeners_registered:
+            return
+        _listeners_registered = True
+
+    from crewai.events import crewai_event_bus
+    from crewai.events.types.llm_events import (
+        LLMCallCompletedEvent,
+        LLMCallFailedEvent,
+        LLMCallStartedEvent,
+    )
+
+    @crewai_event_bus.on(LLMCallStartedEvent)
+    def _llm_started(source, event):
+        parent = _current.get()
+        if parent is None:
+            return
+        call = Span(parent.trace_id, "llm", event.model or "llm", parent.span_id, task=event.task_name)
+        call.start = event.timestamp.timestamp()
+        with _register_lock:
+            _llm_calls[event.call_id] = call
+
+    def _finish(event, status: str, **attrs):
+        with _register_lock:
+            call = _llm_calls.pop(event.call_id, None)
+        if call is None:
+            return
+        call.status = status
+        call.set(**attrs)
+        trace_store.write(call, round(max(0.0, event.timestamp.timestamp() - call.start), 4))
+
+    @crewai_event_bus.on(LLMCallCompletedEvent)
+    def _llm_completed(source, event):
+        usage = event.usage or {}
+        prompt = usage.get("prompt_tokens", usage.get("prompt_token_count", 0)) or 0
+        completion = usage.get("completion_tokens", usage.get("candidates_token_count", 0)) or 0
+        _finish(
+            event, "ok",
+            prompt_tokens=prompt,
+            completion_tokens=completion,
+            total_tokens=usage.get("total_tokens", prompt + completion) or 0,
+        )
+
+    @crewai_event_bus.on(LLMCallFailedEvent)
+    def _llm_failed(source, event):
+        _finish(event, "error", error=_preview(getattr(event, "error", "")))
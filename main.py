@@ -2,8 +2,10 @@
 Streamlit Web Application for AI Use Case Generation System
 """
 
+import time
 import streamlit as st
-from config.crew import create_ai_usecase_crew
+from config.jobs import JobManager, STAGES
+from utils import company_slug
 
 st.set_page_config(
     page_title="AI Use Case Generator",
@@ -11,45 +13,83 @@ st.set_page_config(
     layout="centered",
 )
 
-@st.cache_data
-def run_crew_analysis(company_name: str) -> str:
-    """Runs the CrewAI pipeline and returns ONLY the final proposal text (no file saving)."""
-    crew_system = create_ai_usecase_crew(company_name)
+POLL_SECONDS = 2
+
+# intermediate outputs shown while the proposal is still being written
+PREVIEW_SECTIONS = [
+    ("research", "🏢 Company Research"),
+    ("industry_research", "📈 Industry Analysis"),
+    ("competitor_research", "🥊 Competitive Landscape"),
+    ("usecases", "💡 AI Use Cases"),
+    ("resources", "📚 Datasets & Resources"),
+]
+
+
+@st.cache_resource
+def get_job_manager() -> JobManager:
+    """One worker pool per Streamlit server, shared by every session"""
+    return JobManager()
+
+
+def render_job(job: dict, jobs: JobManager):
+    """Show progress for a running job, or the final proposal once it is done"""
+    if job["state"] in ("queued", "running"):
+        stage = job["current_stage"] or "waiting for a free worker"
+        st.info(f"🔍 Analyzing {job['company']}... ({stage})")
+        if job["state"] == "queued" and st.button("Cancel"):
+            jobs.cancel(job["id"])
+        st.progress(job["progress"], text=f"{len(job['completed_stages'])}/{len(STAGES)} stages complete")
+        if job["last_tool"]:
+            st.caption(f"🔧 {job['last_tool'][:120]}")
+        for key, title in PREVIEW_SECTIONS:
+            if job["stage_outputs"].get(key):
+                with st.expander(title, expanded=key == "research"):
+                    st.markdown(job["stage_outputs"][key])
+        time.sleep(POLL_SECONDS)
+        st.rerun()
+
+    elif job["state"] == "failed":
+        st.error(f"❌ Error occurred: {job['error']}")
+
+    elif job["state"] == "cancelled":
+        st.warning(f"Analysis of {job['company']} was cancelled.")
+
+    else:
+        final_result = job["result"]
+        st.success("✅ Analysis completed!")
+
+        st.subheader("📑 Final Proposal")
+        st.markdown(final_result)
+
+        st.download_button(
+            label="💾 Download Full Report",
+            data=final_result,
+            file_name=f"{company_slug(job['company'])}_final_proposal.md",
+            mime="text/markdown",
+        )
 
-    result = crew_system.kickoff()
-    
-    final_proposal = result.output if hasattr(result, "output") else str(result)
-    return final_proposal
 
 def main():
     """Main Streamlit application"""
-    
+
     st.title("🤖 AI Use Case Generator")
     st.write("Enter a company name to generate AI use cases and strategies.")
-    
+
     company_name = st.text_input("Company Name", placeholder="e.g., Tesla")
+    jobs = get_job_manager()
 
     if st.button("Analyze Company"):
         if not company_name.strip():
             st.error("⚠️ Please enter a company name.")
         else:
-            with st.spinner("🔍 Analyzing company and generating AI use cases..."):
-                try:
-                    final_result = run_crew_analysis(company_name.strip())
-                    
-                    st.success("✅ Analysis completed!")
-
-                    st.subheader("📑 Final Proposal")
-                    st.markdown(final_result)
-
-                    st.download_button(
-                        label="💾 Download Full Report",
-                        data=final_result,
-                        file_name=f"{company_name.lower().replace(' ', '_')}_final_proposal.md",
-                        mime="text/markdown",
-                    )
-                except Exception as e:
-                    st.error(f"❌ Error occurred: {str(e)}")
+            # identical in-flight requests share one job
+            st.session_state["job_id"] = jobs.submit(company_name.strip())
+
+    job_id = st.session_state.get("job_id")
+    if job_id:
+        job = jobs.status(job_id)
+        if job is not None:
+            render_job(job, jobs)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,25 @@
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# the module-level stores (response cache, rate budgets, traces, ...) open their files on import: keep them out of the checkout
+_SCRATCH = tempfile.mkdtemp(prefix="aip-tests-")
+for name, path in (
+    ("HTTP_CACHE_PATH", "http_cache.sqlite"),
+    ("RATE_LIMIT_PATH", "ratelimit.sqlite"),
+    ("TRACE_PATH", "traces.sqlite"),
+    ("STAGE_CACHE_DIR", "stage_cache"),
+    ("RESEARCH_STORE_PATH", "research.sqlite"),
+    ("METADATA_INDEX_DIR", "metadata_index"),
+    ("MEMORY_PATH", "memory.sqlite"),
+    ("CASSETTE_DIR", "cassettes"),
+):
+    os.environ.setdefault(name, os.path.join(_SCRATCH, path))
+
+# crews are built with placeholder keys; tests that run stages stub out the LLM calls
+os.environ.setdefault("GEMINI_API_KEY", "test")
+os.environ.setdefault("TAVILY_API_KEY", "test")
+os.environ.setdefault("MEMORY_BACKEND", "off")
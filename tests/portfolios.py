@@ -0,0 +1,68 @@
+"""
+Use case portfolios for the schema tests and benchmarks/structured_outputs.py
+"""
+
+from config.schemas import UseCase, UseCasePortfolio
+
+CATEGORIES = ["Quick Win", "Strategic Initiative", "Transformational"]
+THEMES = [
+    ("Predictive Maintenance", "production line sensors", "anomaly detection on vibration and temperature data"),
+    ("Demand Forecasting", "regional sales and inventory", "gradient-boosted forecasts with weather and promotions"),
+    ("Customer Support Assistant", "service tickets and manuals", "retrieval-augmented LLM assistant"),
+    ("Visual Quality Inspection", "paint and weld images", "computer vision defect classifier"),
+    ("Dynamic Pricing", "historical transactions", "reinforcement-learning price optimizer"),
+    ("Supplier Risk Scoring", "supplier financials and news", "NLP risk signals combined with tabular scoring"),
+    ("Energy Optimization", "plant energy meters", "time-series optimization of HVAC and compressors"),
+    ("Document Automation", "contracts and invoices", "LLM extraction with human review"),
+    ("Churn Prediction", "subscription usage logs", "survival models on engagement features"),
+    ("Route Optimization", "delivery GPS traces", "vehicle routing with learned travel times"),
+    ("Fraud Detection", "payment events", "graph features with streaming classifiers"),
+    ("Knowledge Search", "internal wikis and tickets", "semantic search over embeddings"),
+]
+
+
+def sample_portfolio(company: str = "Tesla") -> UseCasePortfolio:
+    return UseCasePortfolio(
+        company=company,
+        use_cases=[
+            UseCase(
+                title=title,
+                category=CATEGORIES[i % 3],
+                problem_statement=(
+                    f"{company} loses time and margin because decisions on {data} are made manually and late, "
+                    f"which slows operations and leaves measurable value on the table across business units."
+                ),
+                ai_solution=f"Deploy {solution} integrated with existing systems and dashboards.",
+                business_benefits=f"Cuts manual effort by {20 + i}% and improves decision speed for {data}.",
+                estimated_roi=f"${5 + i * 3}M annual savings ({15 + i}% cost reduction)",
+                complexity=["Low", "Medium", "High"][i % 3],
+                industry_example=f"A leading peer reported {10 + i}% gains after rolling out {solution}.",
+            )
+            for i, (title, data, solution) in enumerate(THEMES)
+        ],
+    )
+
+
+def prose_markdown(portfolio: UseCasePortfolio) -> str:
+    """What the use case agent wrote before schemas: the same facts with the usual narrative around them"""
+    parts = [f"# AI Use Case Portfolio for {portfolio.company}\n"]
+    parts.append(
+        "This portfolio outlines strategic AI opportunities tailored to the company's business model and "
+        "industry position. Each use case is framed as a mini business case, and the cases are grouped by "
+        "implementation horizon so leadership can sequence investments sensibly.\n"
+    )
+    for category, use_cases in portfolio.by_category():
+        parts.append(f"## {category}s\n\nThese initiatives are grouped together because they share a similar "
+                     f"risk profile, time to value and organizational readiness requirements.\n")
+        for n, uc in enumerate(use_cases, 1):
+            parts.append(
+                f"### Use Case {n}: {uc.title}\n\n"
+                f"- **Problem Statement:** {uc.problem_statement}\n"
+                f"- **AI Solution:** {uc.ai_solution} This approach is well proven in the industry and can be "
+                f"piloted quickly with a small cross-functional team before scaling.\n"
+                f"- **Business Benefits:** {uc.business_benefits}\n"
+                f"- **Estimated ROI:** {uc.estimated_roi}\n"
+                f"- **Complexity:** {uc.complexity}\n"
+                f"- **Industry Example:** {uc.industry_example}\n"
+            )
+    return "\n".join(parts)
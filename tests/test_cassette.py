@@ -0,0 +1,114 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from config import cassette
+from config.cassette import Cassette, CassetteMiss, llm_key
+from tools.dataset_tool import DatasetSearchTool
+from tools.http_cache import response_cache
+from tools.kaggle_tool import KaggleDatasetTool
+from tools.singleflight import tool_calls
+
+
+class Counting(BaseHTTPRequestHandler):
+    """Answers every GET with how many requests it has served so far"""
+
+    lock = threading.Lock()
+    served = 0
+
+    def do_GET(self):
+        with Counting.lock:
+            Counting.served += 1
+            body = json.dumps({"n": Counting.served, "path": self.path}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def live(monkeypatch):
+    # every recorded request must reach the stub: no response cache in between
+    monkeypatch.setattr(response_cache, "enabled", False)
+    monkeypatch.setattr(tool_calls, "enabled", False)
+    Counting.served = 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Counting)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server, f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def get(url: str, **params) -> dict:
+    return response_cache.request("kaggle", "GET", url, params=params or None).json()
+
+
+def test_a_recorded_run_replays_without_the_network(live, tmp_path):
+    server, url = live
+    path = str(tmp_path / "tesla.jsonl.gz")
+    with cassette.use(Cassette(path, "record")):
+        recorded = [get(f"{url}/search", q="ev"), get(f"{url}/search", q="ev"), get(f"{url}/search", q="solar")]
+    assert [r["n"] for r in recorded] == [1, 2, 3]
+
+    server.shutdown()
+    server.server_close()  # anything not in the cassette would now fail to connect
+    tape = Cassette(path, "replay")
+    with cassette.use(tape):
+        # matched by request, not by order; a repeated request gets its answers in turn, then the last again
+        assert get(f"{url}/search", q="solar")["n"] == 3
+        assert [get(f"{url}/search", q="ev")["n"] for _ in range(3)] == [1, 2, 2]
+        with pytest.raises(CassetteMiss):
+            get(f"{url}/search", q="wind")
+
+    assert tape.summary()["requests"] == {"http": 2}
+    assert tape.stats == {"recorded": 0, "replayed": 4, "misses": 1}
+
+
+def test_identical_answers_are_stored_once(tmp_path):
+    tape = Cassette(str(tmp_path / "c.jsonl.gz"), "record")
+    for seconds in (0.1, 0.2):
+        tape.keep("http", "k", "kaggle", {"status": 200, "body": "same", "seconds": seconds})
+    tape.keep("http", "k", "kaggle", {"status": 200, "body": "changed", "seconds": 0.1})
+    tape.save()
+
+    assert [a["body"] for a in Cassette(tape.path, "replay").entries["k"]["answers"]] == ["same", "changed"]
+
+
+def test_replaying_a_missing_cassette_fails_fast(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        Cassette(str(tmp_path / "never-recorded.jsonl.gz"), "replay")
+
+
+@pytest.mark.parametrize("search", [
+    lambda url: KaggleDatasetTool(api_url=url)._run("retail demand"),
+    lambda url: DatasetSearchTool(kaggle_api_url=url, huggingface_api_url=url, github_api_url=url)._run("retail demand"),
+])
+def test_a_stale_cassette_fails_the_replay_instead_of_a_tool_error(live, tmp_path, search):
+    _, url = live
+    empty = Cassette(str(tmp_path / "empty.jsonl.gz"), "record")
+    empty.save()
+
+    with cassette.use(Cassette(empty.path, "replay")), pytest.raises(CassetteMiss):
+        search(url)
+    assert Counting.served == 0
+
+
+def test_llm_keys_ignore_per_call_ids():
+    def messages(call_id: str, content: str = "Research Tesla"):
+        return [
+            {"role": "user", "content": content, "id": call_id},
+            {"role": "tool", "tool_call_id": call_id, "content": "results", "meta": {"response_id": call_id}},
+        ]
+
+    key = llm_key("gemini/gemini-2.0-flash", messages("a1"), tools=[{"name": "search"}, {"name": "scrape"}])
+
+    assert key == llm_key("gemini/gemini-2.0-flash", messages("b2"), tools=[{"name": "scrape"}, {"name": "search"}])
+    assert key != llm_key("gemini/gemini-2.0-flash", messages("a1", "Research Ford"), tools=[{"name": "search"}, {"name": "scrape"}])
+    assert key != llm_key("gemini/gemini-1.5-pro", messages("a1"), tools=[{"name": "search"}, {"name": "scrape"}])
+    assert key != llm_key("gemini/gemini-2.0-flash", messages("a1"), tools=[{"name": "search"}])
@@ -0,0 +1,123 @@
+from config.compaction import compact_context, extract_facts
+
+PROSE = (
+    "The company has spent the last decade building a vertically integrated manufacturing footprint that spans "
+    "cell production, drive units and software, which it describes as central to its long-term strategy. "
+    "Analysts broadly agree that this integration is a differentiator, although opinions differ on how durable "
+    "the advantage will be as legacy manufacturers catch up and supplier ecosystems mature over the next years."
+)
+
+RESEARCH = f"""# Company Research: Tesla
+
+## Overview
+- **Industry:** Automotive & Energy
+- **Revenue:** $96.8B (2023), up 19% year over year
+- **Employees:** 140,473
+- Gross margin fell to 18.2% as prices were cut [Source: https://ir.tesla.com/annual-report-2023]
+
+## Strategy
+{PROSE}
+
+## Pain Points
+- Service backlog in North America
+- Energy storage deployments grew 125% to 14.7 GWh [Source: https://ir.tesla.com/q4-2023-update]
+
+---
+"""
+
+INDUSTRY = f"""# Industry Analysis
+
+## Market
+- Global EV sales reached 14 million units in 2023, 18% of new car sales [Source: https://www.iea.org/reports/global-ev-outlook-2024]
+- Gross margin fell to 18.2% as prices were cut [Source: https://ir.tesla.com/annual-report-2023]
+- Battery pack prices dropped 14% to $139/kWh
+
+## Trends
+{PROSE}
+- Service backlog in North America
+"""
+
+COMPETITORS = """# Competitive Landscape
+- BYD sold 3.02 million vehicles in 2023 [Source: https://www.byd.com/en/news]
+- Global EV sales reached 14 million units in 2023, 18% of new car sales [Source: https://www.iea.org/reports/global-ev-outlook-2024]
+- Legacy OEMs plan $150 billion in EV investment through 2030
+"""
+
+USE_CASES = """## Quick Win
+
+### Use Case 1: Predictive Maintenance for Service Centers
+- **Problem Statement:** Service backlog in North America
+- **AI Solution:** Forecast part failures from vehicle telemetry to pre-stage parts.
+- **Business Benefits:** Cut repeat visits by 25%
+- **Estimated ROI:** $40M per year
+
+### Use Case 2: Battery Degradation Forecasting
+- **Problem Statement:** Warranty exposure on packs
+- **AI Solution:** Model capacity fade per pack from charging history.
+- **Business Benefits:** Lower warranty reserves by 10%
+- **Estimated ROI:** $25M per year
+"""
+
+RESOURCES = """# Datasets & Resources
+- [NASA Battery Dataset](https://www.kaggle.com/datasets/patrickfleith/nasa-battery-dataset)
+- [Predictive Maintenance](https://github.com/awslabs/predictive-maintenance-using-machine-learning)
+- [NASA Battery Dataset](https://www.kaggle.com/datasets/patrickfleith/nasa-battery-dataset)
+"""
+
+OUTPUTS = {
+    "research": RESEARCH,
+    "industry_research": INDUSTRY,
+    "competitor_research": COMPETITORS,
+    "usecases": USE_CASES,
+    "resources": RESOURCES,
+}
+
+
+def test_every_url_and_figure_survives_a_real_reduction():
+    digest, report = compact_context(OUTPUTS)
+
+    assert report["facts"] == len(extract_facts("\n".join(OUTPUTS.values()))) >= 20
+    assert report["facts_retained"] == report["facts"]
+    assert report["missing_facts"] == []
+    assert report["tokens_after"] < report["tokens_before"] * 0.8
+    assert report["reduction"] >= 0.2
+    for fact in ("$96.8b", "18.2%", "$139", "3.02million", "https://ir.tesla.com/q4-2023-update"):
+        assert fact in extract_facts(digest)
+
+
+def test_lines_repeated_across_stages_appear_once():
+    digest, _ = compact_context(OUTPUTS)
+
+    assert digest.count("Gross margin fell to 18.2%") == 1
+    assert digest.count("Global EV sales reached 14 million") == 1
+    assert digest.count("patrickfleith/nasa-battery-dataset") == 1
+    assert digest.splitlines().count("- Service backlog in North America") == 1
+
+
+def test_fact_free_prose_is_cut_to_its_first_sentence():
+    digest, _ = compact_context(OUTPUTS)
+
+    assert PROSE not in digest
+    assert "vertically integrated manufacturing footprint" in digest
+    assert "supplier ecosystems mature" not in digest
+
+
+def test_sections_follow_the_proposal_order_with_use_case_titles():
+    digest, _ = compact_context(OUTPUTS)
+    headings = [line for line in digest.splitlines() if line.startswith("## ")]
+
+    assert headings == [
+        "## Company Research", "## Industry Analysis", "## Competitive Landscape",
+        "## AI Use Cases", "## Datasets & Resources",
+    ]
+    assert "### Predictive Maintenance for Service Centers" in digest
+    assert "### Battery Degradation Forecasting" in digest
+
+
+def test_empty_and_tiny_inputs():
+    assert compact_context({}) == ("", {
+        "tokens_before": 0, "tokens_after": 0, "reduction": 0.0, "facts": 0, "facts_retained": 0, "missing_facts": [],
+    })
+    digest, report = compact_context({"research": "- Revenue grew 12% to $4.2B"})
+    assert digest == "## Company Research\n- Revenue grew 12% to $4.2B"
+    assert report["facts"] == report["facts_retained"] == 2
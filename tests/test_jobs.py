@@ -0,0 +1,94 @@
+import os
+import time
+
+import pytest
+
+from config.jobs import STAGES, JobManager, SleepingCrew
+
+# the workers are spawned processes: they import the crews below from this module by name
+HERE = __name__
+
+
+class CrashingCrew:
+    def __init__(self, company_name: str):
+        self.company = company_name
+
+    def kickoff(self, on_event=None):
+        os._exit(3)  # a worker that dies mid-run, as on a segfault or the OOM killer
+
+
+class FailingCrew(CrashingCrew):
+    def kickoff(self, on_event=None):
+        raise RuntimeError(f"no data for {self.company}")
+
+
+def create_crew(company_name: str):
+    """Sleeping crews, except for companies named to crash or fail"""
+    if company_name.startswith("crash"):
+        return CrashingCrew(company_name)
+    if company_name.startswith("fail"):
+        return FailingCrew(company_name)
+    return SleepingCrew(company_name, stage_seconds=0.05 if company_name.startswith("quick") else 0.3)
+
+
+def wait_for(jobs: JobManager, job_id: str, *states, timeout: float = 60.0) -> dict:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = jobs.status(job_id)
+        if job["state"] in states:
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f"{job_id} still {jobs.status(job_id)['state']} after {timeout}s")
+
+
+@pytest.fixture
+def jobs():
+    manager = JobManager(max_workers=1, crew_factory=f"{HERE}:create_crew")
+    yield manager
+    manager.shutdown(wait=False)
+
+
+def test_submit_reports_progress_then_the_result(jobs):
+    job_id = jobs.submit("Quick Tesla")
+    assert jobs.submit("quick tesla") == job_id  # in flight: no duplicate job
+
+    running = wait_for(jobs, job_id, "running", "done")
+    done = wait_for(jobs, job_id, "done")
+
+    assert running["started_at"] is not None
+    assert done["result"] == "# Proposal for Quick Tesla\n"
+    assert done["completed_stages"] == STAGES and done["progress"] == 1.0
+    assert jobs.submit("Quick Tesla") != job_id  # finished: a new submit starts a new job
+    assert jobs.stats()["done"] >= 1
+
+
+def test_queued_jobs_cancel_and_running_ones_finish(jobs):
+    running = jobs.submit("Tesla")
+    wait_for(jobs, running, "running")
+    # one worker: these wait, the first possibly already handed to the worker's call queue
+    queued = [jobs.submit(f"Quick {n}") for n in range(3)]
+
+    assert not jobs.cancel(running)
+    assert all(jobs.cancel(job_id) for job_id in queued)
+    assert not jobs.cancel("unknown")
+
+    assert wait_for(jobs, running, "done")["result"] == "# Proposal for Tesla\n"
+    for job_id in queued:
+        job = wait_for(jobs, job_id, "cancelled", "done", "failed")
+        assert job["state"] == "cancelled" and job["result"] is None and job["started_at"] is None
+    assert not jobs.cancel(queued[0])
+    assert jobs.stats()["cancelled"] == 3
+
+
+def test_a_failing_crew_fails_its_job_only(jobs):
+    failed = wait_for(jobs, jobs.submit("fail Corp"), "failed")
+    assert failed["error"] == "no data for fail Corp"
+    assert wait_for(jobs, jobs.submit("Quick Corp"), "done")["result"]
+
+
+def test_a_crashed_worker_fails_its_job_and_the_pool_recovers(jobs):
+    crashed = wait_for(jobs, jobs.submit("crash Corp"), "failed", "done")
+
+    assert crashed["state"] == "failed"
+    assert "exited unexpectedly" in crashed["error"]
+    assert wait_for(jobs, jobs.submit("Quick Corp"), "done")["result"] == "# Proposal for Quick Corp\n"
@@ -0,0 +1,104 @@
+import json
+import os
+import threading
+
+from tools.metadata_index import MAX_SEGMENTS, PENDING_FLUSH, MetadataIndex
+
+
+def row(n: int, title: str, description: str = "", **extra):
+    return {"title": title, "url": f"https://example.com/{n}", "description": description, **extra}
+
+
+def test_bm25_ranks_title_matches_first(tmp_path):
+    index = MetadataIndex(root=str(tmp_path), enabled=True)
+    index.add([
+        {**row(1, "Retail Demand Forecasting", "weekly store sales"), "source": "other", "id": "1"},
+        {**row(2, "Store Sales", "retail demand forecasting with promotions and weather"), "source": "other", "id": "2"},
+        {**row(3, "Retail Transactions", "retail retail retail point of sale"), "source": "other", "id": "3"},
+        {**row(4, "Churn Labels", "telecom customers"), "source": "other", "id": "4"},
+    ])
+
+    hits = index.search("retail demand forecasting", k=4)
+
+    # "3" repeats "retail" but matches one query term in three: below MIN_COVERAGE
+    assert [h["id"] for h in hits] == ["1", "2"]
+    assert hits[0]["score"] > hits[1]["score"] > 0
+    assert index.search("retail", k=4)[0]["id"] == "3"
+    assert index.search("telecom churn", k=3)[0]["id"] == "4"
+    # too few query terms matched: no result rather than a weak one
+    assert index.search("retail satellite imagery segmentation") == []
+
+
+def test_import_skips_malformed_lines(tmp_path):
+    dump = tmp_path / "dump.jsonl"
+    dump.write_text("\n".join([
+        json.dumps({"ref": "stub/sales", "title": "Store Sales", "subtitle": "retail sales"}),
+        "{not json",
+        json.dumps({"title": "no url"}),
+        json.dumps(["a", "list"]),
+        "",
+        json.dumps({"html_url": "https://github.com/stub/forecast", "full_name": "stub/forecast", "stargazers_count": 5}),
+    ]))
+    index = MetadataIndex(root=str(tmp_path / "index"), enabled=True)
+
+    assert index.import_jsonl([str(dump)]) == {"added": 2, "skipped": 3}
+    assert index.summary()["records"] == 2
+    assert index.search("store sales", source="kaggle", k=1)[0]["url"] == "https://www.kaggle.com/datasets/stub/sales"
+    assert index.search("forecast", source="github", k=1)[0]["stars"] == 5
+
+
+def test_newer_segments_shadow_older_records(tmp_path):
+    index = MetadataIndex(root=str(tmp_path), enabled=True)
+    index.add([{**row(1, "Retail Sales", "old description"), "source": "other", "id": "a"},
+               {**row(2, "Retail Footfall"), "source": "other", "id": "b"}])
+    index.add([{**row(1, "Retail Sales", "new description"), "source": "other", "id": "a"}])
+
+    hits = index.search("retail sales", k=5)
+    assert [(h["id"], h.get("description")) for h in hits if h["id"] == "a"] == [("a", "new description")]
+    assert index.summary()["records"] == 2
+
+    index.compact()
+    assert index.summary()["segments"] == 1
+    assert index.search("retail sales", k=1)[0]["description"] == "new description"
+
+
+def test_remembered_results_stay_within_max_segments(tmp_path):
+    index = MetadataIndex(root=str(tmp_path), enabled=True)
+    total = PENDING_FLUSH * (MAX_SEGMENTS + 4)
+    for start in range(0, total, 10):
+        index.remember([{"ref": f"stub/ds-{n}", "title": f"Dataset {n}"} for n in range(start, start + 10)], "kaggle")
+
+    summary = index.summary()
+    assert summary["segments"] <= MAX_SEGMENTS
+    assert summary["records"] == total
+    assert len(os.listdir(tmp_path / "segments")) == summary["segments"]
+
+
+def test_concurrent_flushes_lose_no_records(tmp_path):
+    index = MetadataIndex(root=str(tmp_path), enabled=True)
+    per_thread = PENDING_FLUSH * 2
+
+    def remember(worker: int):
+        for n in range(0, per_thread, 5):
+            index.remember([{"ref": f"w{worker}/ds-{n + i}", "title": f"Dataset {n + i}"} for i in range(5)], "kaggle")
+
+    threads = [threading.Thread(target=remember, args=(w,)) for w in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    index.refresh()
+
+    assert index.summary()["records"] == 4 * per_thread
+
+
+def test_refresh_takes_idle_queues_left_by_other_processes(tmp_path):
+    index = MetadataIndex(root=str(tmp_path), enabled=True)
+    idle, busy = tmp_path / "pending-1.jsonl", tmp_path / "pending-2.jsonl"
+    idle.write_text(json.dumps({**row(1, "Idle Queue"), "source": "other", "id": "idle"}) + "\n")
+    busy.write_text(json.dumps({**row(2, "Busy Queue"), "source": "other", "id": "busy"}) + "\n")
+    os.utime(idle, (0, 0))
+
+    assert index.refresh() == 1
+    assert not idle.exists() and busy.exists()
+    assert index.search("idle queue", k=1)[0]["id"] == "idle"
@@ -0,0 +1,54 @@
+import pytest
+from crewai import Crew, Task
+from crewai.tasks.task_output import TaskOutput
+
+from config.crew import AIUseCaseGenerationCrew
+from config.research_store import research_store
+from config.stage_cache import stage_cache
+from tools import ratelimit
+
+
+@pytest.fixture
+def lanes(monkeypatch, tmp_path):
+    """The rate lane each task executed in, with every LLM call stubbed out"""
+    seen = {}
+
+    def execute_sync(task, agent=None, context=None, tools=None):
+        seen[task.name] = ratelimit._lane.get()
+        return TaskOutput(name=task.name, description=task.description, raw=f"{task.name} output", agent="stub")
+
+    def kickoff(crew, inputs=None):
+        for task in crew.tasks:
+            task.output = execute_sync(task)
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(Task, "execute_sync", execute_sync)
+    monkeypatch.setattr(Crew, "kickoff", kickoff)
+    monkeypatch.setattr(stage_cache, "enabled", False)
+    monkeypatch.setattr(research_store, "enabled", False)
+    monkeypatch.setenv("PREFETCH_DISABLED", "1")
+    return seen
+
+
+@pytest.mark.parametrize("env", [
+    {},
+    {"CONTEXT_COMPACTION": "0"},
+    {"CREW_PROCESS": "sequential"},
+])
+def test_the_proposal_runs_one_lane_ahead_of_the_run(lanes, monkeypatch, env):
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+
+    with ratelimit.lane("background"):
+        result = AIUseCaseGenerationCrew("Stub Co", industry="Retail").kickoff(dataset_workers=1)
+
+    assert str(result) == "proposal output"
+    assert lanes.pop("proposal") == "default"
+    assert set(lanes.values()) == {"background"}
+
+
+def test_a_foreground_run_proposes_in_the_priority_lane(lanes):
+    AIUseCaseGenerationCrew("Stub Co", industry="Retail").kickoff(dataset_workers=1)
+
+    assert lanes.pop("proposal") == "priority"
+    assert set(lanes.values()) == {"default"}
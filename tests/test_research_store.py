@@ -0,0 +1,60 @@
+import sqlite3
+from types import SimpleNamespace
+
+from config.research_store import ResearchStore, task_version
+
+
+def task(description: str, model: str = "gemini/gemini-2.0-flash", temperature: float = 0.3):
+    llm = SimpleNamespace(model=model, temperature=temperature)
+    return SimpleNamespace(
+        name="industry_research", description=description, expected_output="Industry analysis",
+        agent=SimpleNamespace(llm=llm), output_pydantic=None,
+    )
+
+
+def test_a_changed_prompt_or_model_misses(tmp_path):
+    store = ResearchStore(path=str(tmp_path / "research.sqlite"), enabled=True)
+    v1 = task_version(task("Research the Retail industry"), "Retail")
+    store.put("industry", "Retail", "analysis", "market is $5T", version=v1)
+
+    assert store.get("industry", "retail industry", "analysis", v1) == "market is $5T"
+    assert store.get("industry", "Retail", "analysis", task_version(task("Research the Retail industry in depth"), "Retail")) is None
+    assert store.get("industry", "Retail", "analysis", task_version(task("Research the Retail industry", "gemini/pro"), "Retail")) is None
+    assert store.get("industry", "Retail", "analysis", task_version(task("Research the Retail industry", temperature=0.9), "Retail")) is None
+
+
+def test_spellings_of_one_industry_share_a_version():
+    assert task_version(task("Research the Retail & E-Commerce industry"), "Retail & E-Commerce") == task_version(
+        task("Research the e-commerce and retail industry"), "e-commerce and retail"
+    )
+
+
+def test_get_or_fetch_refetches_for_a_new_version(tmp_path):
+    store = ResearchStore(path=str(tmp_path / "research.sqlite"), enabled=True)
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return f"answer {len(calls)}"
+
+    assert store.get_or_fetch("company", "Tesla", "profile", fetch, version="a") == "answer 1"
+    assert store.get_or_fetch("company", "Tesla", "profile", fetch, version="a") == "answer 1"
+    assert store.get_or_fetch("company", "Tesla", "profile", fetch, version="b") == "answer 2"
+    assert len(calls) == 2
+
+
+def test_rows_from_before_versions_are_refetched(tmp_path):
+    path = str(tmp_path / "research.sqlite")
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE findings (tier TEXT, key TEXT, topic TEXT, value TEXT, source TEXT, stored_at REAL,"
+        " PRIMARY KEY (tier, key, topic))"
+    )
+    conn.execute("INSERT INTO findings VALUES ('company', 'tesla', 'profile', 'old', 'research', 1e12)")
+    conn.commit()
+    conn.close()
+
+    store = ResearchStore(path=path, enabled=True)
+    assert store.get("company", "Tesla", "profile", "v1") is None
+    store.put("company", "Tesla", "profile", "new", version="v1")
+    assert store.get("company", "Tesla", "profile", "v1") == "new"
@@ -0,0 +1,112 @@
+from types import SimpleNamespace
+
+import pytest
+from crewai.tasks.task_output import TaskOutput
+from pydantic import ValidationError
+
+from config import schemas
+from config.compaction import compact_context, count_tokens
+from config.schemas import CompanyProfile, ResourceCollection, UseCase, UseCasePortfolio
+from portfolios import prose_markdown, sample_portfolio
+from utils import split_use_cases
+
+
+def output(raw: str, model=None) -> TaskOutput:
+    return TaskOutput(description="stage", raw=raw, pydantic=model, agent="tester")
+
+
+def profile() -> CompanyProfile:
+    return CompanyProfile(
+        company="Tesla",
+        business_model="B2C",
+        industry="Automotive",
+        revenue="$96.8B (2023)",
+        pain_points=["Service backlog"],
+        sources=["https://example.com/annual-report"],
+        gaps=["employees"],
+    )
+
+
+def test_render_uses_the_schema_when_there_is_one():
+    model = profile()
+    rendered = schemas.render(output(model.model_dump_json(), model))
+
+    assert rendered.startswith("# Company Research: Tesla")
+    assert "- **Revenue:** $96.8B (2023)" in rendered
+    assert "## Pain Points\n- Service backlog" in rendered
+    assert "No trusted information found for: employees" in rendered
+
+
+def test_render_falls_back_to_raw_text():
+    assert schemas.render(output("## Findings\n\nplain markdown")) == "## Findings\n\nplain markdown"
+
+
+@pytest.mark.parametrize("model", [
+    profile(),
+    sample_portfolio(),
+    ResourceCollection.model_validate({
+        "company": "Tesla",
+        "mappings": [{"use_case": "Demand Forecasting", "resources": [
+            {"title": "M5", "url": "https://www.kaggle.com/c/m5", "kind": "dataset", "platform": "Kaggle"},
+        ]}],
+    }),
+])
+def test_restore_round_trips_stored_json(model):
+    task = SimpleNamespace(output_pydantic=type(model))
+    restored = schemas.restore(task, model.model_dump_json())
+
+    assert restored == model
+    assert schemas.render(output("", restored)) == model.to_markdown()
+
+
+def test_restore_without_a_schema_returns_none():
+    assert schemas.restore(SimpleNamespace(output_pydantic=None), profile().model_dump_json()) is None
+
+
+@pytest.mark.parametrize("raw", [
+    "not json at all",
+    '{"company": "Tesla"}',  # required fields missing
+    '{"company": "Tesla", "use_cases": "none"}',  # wrong type
+])
+def test_restore_rejects_invalid_entries(raw):
+    assert schemas.restore(SimpleNamespace(output_pydantic=UseCasePortfolio), raw) is None
+
+
+def test_validation_names_the_missing_fields():
+    with pytest.raises(ValidationError) as excinfo:
+        UseCase(title="Churn Prediction", category="Quick Win", problem_statement="Users leave")
+
+    missing = {error["loc"][0] for error in excinfo.value.errors()}
+    assert missing == {"ai_solution", "business_benefits", "estimated_roi", "complexity", "industry_example"}
+
+
+def test_portfolio_groups_use_cases_in_tier_order():
+    categories = [category for category, _ in sample_portfolio().by_category()]
+    assert categories == ["Quick Win", "Strategic Initiative", "Transformational"]
+
+
+def test_schema_and_markdown_parse_to_the_same_use_cases():
+    # parse timings: benchmarks/structured_outputs.py
+    portfolio = sample_portfolio()
+    parsed = UseCasePortfolio.model_validate_json(portfolio.model_dump_json())
+    split = split_use_cases(prose_markdown(portfolio))
+
+    assert parsed == portfolio
+    assert [uc["name"] for uc in split] == [uc.title for _, ucs in portfolio.by_category() for uc in ucs]
+
+
+def test_dataset_prompts_shrink_against_the_markdown_baseline():
+    portfolio = sample_portfolio()
+    markdown_blocks = sum(count_tokens(uc["text"]) for uc in split_use_cases(prose_markdown(portfolio)))
+    briefs = sum(count_tokens(uc.brief()) for uc in portfolio.use_cases)
+
+    assert briefs < markdown_blocks * 0.7
+
+
+def test_proposal_context_is_no_larger_than_from_prose():
+    portfolio = sample_portfolio()
+    prose = prose_markdown(portfolio)
+
+    assert count_tokens(portfolio.to_markdown()) < count_tokens(prose)
+    schema_digest = compact_context({"usecases": portfolio.to_markdown()})[1]["tokens_after"]
+    assert schema_digest <= compact_context({"usecases": prose})[1]["tokens_after"]
@@ -0,0 +1,95 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from tools.github_code_tool import GitHubCodeTool
+from tools.http_cache import response_cache
+from tools.kaggle_tool import KaggleDatasetTool
+from tools.metadata_index import metadata_index
+from tools.singleflight import tool_calls
+
+CALLS = 16
+# case, whitespace and punctuation variants of one query normalize to the same key
+VARIANTS = ["retail demand forecasting", "Retail  demand forecasting", " retail demand forecasting?"]
+
+
+class StubAPI(BaseHTTPRequestHandler):
+    """GitHub and Kaggle search endpoints that count requests and answer after ``delay``"""
+
+    delay = 0.3
+    hits = {"github": 0, "kaggle": 0}
+    lock = threading.Lock()
+
+    def do_GET(self):
+        kind = "github" if self.path.startswith("/search/repositories") else "kaggle"
+        with self.lock:
+            self.hits[kind] += 1
+        time.sleep(self.delay)
+        if kind == "github":
+            body = {"items": [
+                {"name": f"repo-{i}", "html_url": f"https://github.com/stub/repo-{i}",
+                 "stargazers_count": 100 * i, "description": "stub repository"}
+                for i in range(3)
+            ]}
+        else:
+            body = [{"ref": f"stub/ds-{i}", "title": f"Dataset {i}", "size": "1MB", "licenses": "CC0"} for i in range(3)]
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_api(monkeypatch):
+    # only coalescing may collapse calls: no response cache, no offline index
+    monkeypatch.setattr(response_cache, "enabled", False)
+    monkeypatch.setattr(metadata_index, "enabled", False)
+    monkeypatch.setattr(tool_calls, "enabled", True)
+    StubAPI.hits = {"github": 0, "kaggle": 0}
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubAPI)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def fire(tool, calls: int = CALLS):
+    with ThreadPoolExecutor(max_workers=calls) as pool:
+        return list(pool.map(lambda i: tool._run(VARIANTS[i % len(VARIANTS)]), range(calls)))
+
+
+@pytest.mark.parametrize("kind, tool_class", [("github", GitHubCodeTool), ("kaggle", KaggleDatasetTool)])
+def test_concurrent_identical_calls_make_one_request(stub_api, kind, tool_class):
+    before = tool_calls.summary()
+    results = fire(tool_class(api_url=stub_api))
+    after = tool_calls.summary()
+
+    assert StubAPI.hits[kind] == 1
+    assert len(set(results)) == 1 and "error" not in results[0].lower()
+    assert after["calls"] - before["calls"] == CALLS
+    assert after["upstream"] - before["upstream"] == 1
+    assert after["collapsed"] - before["collapsed"] == CALLS - 1
+
+
+def test_without_coalescing_every_call_goes_upstream(stub_api, monkeypatch):
+    monkeypatch.setattr(tool_calls, "enabled", False)
+    fire(GitHubCodeTool(api_url=stub_api))
+
+    assert StubAPI.hits["github"] == CALLS
+
+
+def test_calls_after_the_first_finishes_are_not_served_stale(stub_api):
+    tool = KaggleDatasetTool(api_url=stub_api)
+    tool._run(VARIANTS[0])
+    tool._run(VARIANTS[0])
+
+    assert StubAPI.hits["kaggle"] == 2
@@ -0,0 +1,29 @@
+import os
+import threading
+
+from config.stage_cache import StageCache
+
+
+def test_threads_saving_one_key_leave_one_whole_entry(tmp_path):
+    cache = StageCache(root=str(tmp_path), enabled=True)
+    errors = []
+    start = threading.Barrier(8)
+
+    def save(i):
+        start.wait()
+        try:
+            for _ in range(20):
+                cache.save("ab" * 32, "resources", f"mapping from writer {i} " * 2000)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=save, args=(i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    entry = cache.load("ab" * 32)
+    assert entry["raw"] in {f"mapping from writer {i} " * 2000 for i in range(8)}
+    assert [n for n in os.listdir(tmp_path / "ab") if n.endswith(".tmp")] == []
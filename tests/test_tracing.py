@@ -0,0 +1,116 @@
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from config import tracing
+from config.tracing import Span, TraceStore
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = TraceStore(path=str(tmp_path / "traces.sqlite"), enabled=True)
+    monkeypatch.setattr(tracing, "trace_store", store)
+    return store
+
+
+def rows(store: TraceStore):
+    return {
+        name: dict(zip(("trace_id", "span_id", "parent_id", "kind", "status", "attrs"), rest))
+        for name, *rest in store._conn().execute("SELECT name, trace_id, span_id, parent_id, kind, status, attrs FROM spans")
+    }
+
+
+def test_spans_nest_under_the_run_and_report_per_stage_tool_and_host(store):
+    with tracing.trace_run("Tesla") as run:
+        with tracing.span("task", "research"):
+            with tracing.span("tool", "trusted_search", input="tesla revenue"):
+                tracing.add("cache_misses")
+                with tracing.span("http", "api.tavily.com") as http:
+                    http.set(bytes=2048)
+                    http.add("retries")
+        with pytest.raises(RuntimeError):
+            with tracing.span("task", "proposal"):
+                raise RuntimeError("model overloaded")
+    # outside a run, spans are no-ops
+    with tracing.span("task", "stray") as stray:
+        stray.add("cache_hits")
+
+    spans = rows(store)
+    assert set(spans) == {"Tesla", "research", "trusted_search", "api.tavily.com", "proposal"}
+    assert {s["trace_id"] for s in spans.values()} == {run.trace_id}
+    assert spans["Tesla"]["parent_id"] is None
+    assert spans["research"]["parent_id"] == spans["Tesla"]["span_id"]
+    assert spans["trusted_search"]["parent_id"] == spans["research"]["span_id"]
+    assert spans["api.tavily.com"]["parent_id"] == spans["trusted_search"]["span_id"]
+    assert spans["proposal"]["status"] == "error" and "model overloaded" in spans["proposal"]["attrs"]
+
+    report = store.report()
+    assert report["runs"] == 1 and report["run"]["count"] == 1
+    assert report["stages"]["research"]["errors"] == 0 and report["stages"]["proposal"]["errors"] == 1
+    assert report["tools"]["trusted_search"]["cache_misses"] == 1
+    host = report["hosts"]["api.tavily.com"]
+    assert (host["count"], host["retries"], host["bytes"]) == (1, 1, 2048)
+    assert host["p50_s"] <= report["tools"]["trusted_search"]["p50_s"] <= report["run"]["p50_s"]
+
+
+def test_report_percentiles_cover_the_last_runs(store):
+    for n in range(20):
+        run = Span(f"trace-{n}", "run", "Tesla" if n % 2 else "Ford")
+        run.start = time.time() + n
+        store.write(run, 10.0 + n)
+        store.write(Span(run.trace_id, "task", "research", run.span_id), 1.0 + n / 10)
+
+    report = store.report(runs=20)
+    assert report["runs"] == 20
+    assert report["run"]["p50_s"] == 20.0 and report["run"]["p95_s"] == 29.0
+    assert report["stages"]["research"]["count"] == 20
+    assert report["stages"]["research"]["p50_s"] == 2.0 and report["stages"]["research"]["p95_s"] == 2.9
+
+    latest = store.report(runs=4)
+    assert latest["runs"] == 4 and latest["run"]["p50_s"] == 28.0
+    assert store.report(company="tesla")["run"]["count"] == 10
+
+
+def test_llm_call_events_become_llm_spans_under_the_current_span(store):
+    from crewai.events import crewai_event_bus
+    from crewai.events.types.llm_events import (
+        LLMCallCompletedEvent,
+        LLMCallFailedEvent,
+        LLMCallStartedEvent,
+        LLMCallType,
+    )
+
+    started = datetime.now()
+    with tracing.trace_run("Tesla"):
+        with tracing.span("task", "research"):
+            crewai_event_bus.emit(None, LLMCallStartedEvent(call_id="c1", model="gemini/flash", task_name="research"))
+            crewai_event_bus.emit(None, LLMCallCompletedEvent(
+                call_id="c1", model="gemini/flash", response="ok", call_type=LLMCallType.LLM_CALL,
+                usage={"prompt_tokens": 120, "completion_tokens": 30}, timestamp=started + timedelta(seconds=2),
+            ))
+            crewai_event_bus.emit(None, LLMCallStartedEvent(call_id="c2", model="gemini/flash", task_name="research"))
+            crewai_event_bus.emit(None, LLMCallFailedEvent(call_id="c2", model="gemini/flash", error="quota exceeded"))
+            crewai_event_bus.flush()
+
+    spans = [s for s in store.spans(store.recent_traces()) if s["kind"] == "llm"]
+    assert sorted(s["status"] for s in spans) == ["error", "ok"]
+    llm = store.report()["llm"]["research"]
+    assert (llm["count"], llm["errors"]) == (2, 1)
+    assert (llm["prompt_tokens"], llm["completion_tokens"], llm["total_tokens"]) == (120, 30, 150)
+    ok = next(s for s in spans if s["status"] == "ok")
+    assert ok["name"] == "gemini/flash" and ok["duration"] >= 1.9
+
+
+def test_traced_tool_keeps_the_wrapped_signature():
+    class Tool:
+        name = "probe"
+
+        @tracing.traced_tool
+        def _run(self, query: str) -> str:
+            """Look something up"""
+            return query
+
+    assert Tool._run.__name__ == "_run" and Tool._run.__doc__ == "Look something up"
+    assert Tool._run.__wrapped__.__annotations__ == {"query": str, "return": str}
+    assert Tool()._run("x") == "x"
@@ -0,0 +1,117 @@
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from tools.transport import Transport
+
+MAX_PER_HOST = 2
+
+
+class SlowTail(BaseHTTPRequestHandler):
+    """Answers in 10 ms; two requests in 50 take 400 ms: a slow one and, after its hedge, the next one.
+    Tracks requests in flight."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    lock = threading.Lock()
+    served = 0
+    in_flight = 0
+    peak = 0
+
+    def do_GET(self):
+        cls = type(self)
+        with cls.lock:
+            cls.served += 1
+            slow = cls.served > 40 and cls.served % 50 in (0, 2)
+            cls.in_flight += 1
+            cls.peak = max(cls.peak, cls.in_flight)
+        try:
+            time.sleep(0.4 if slow else 0.01)
+            self.send_response(200)
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+            self.wfile.write(b"{}")
+        finally:
+            with cls.lock:
+                cls.in_flight -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def slow_tail():
+    SlowTail.served = SlowTail.in_flight = SlowTail.peak = 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SlowTail)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_hedges_count_against_the_host_limit(slow_tail):
+    transport = Transport(
+        max_per_host=MAX_PER_HOST, max_retries=0, adaptive_timeouts=False,
+        min_samples=10, hedging=True, hedge_budget=1.0,
+    )
+    for _ in range(40):  # enough samples for a p95 to hedge after
+        transport.request("GET", slow_tail)
+
+    # one caller, two slots: a request right after a hedged one must not hedge while the loser still runs
+    statuses = [transport.request("GET", slow_tail).status_code for _ in range(160)]
+    time.sleep(0.5)  # let the last losers finish
+
+    host = slow_tail.split("//", 1)[1]
+    assert statuses == [200] * 160
+    assert transport._stats[host].hedges > 0
+    assert SlowTail.peak <= MAX_PER_HOST
+    # every slot came back, including those held by losers
+    assert all(transport._semaphores[host].acquire(blocking=False) for _ in range(MAX_PER_HOST))
+
+
+def test_async_hedges_count_against_the_host_limit(slow_tail, monkeypatch):
+    transport = Transport(
+        max_per_host=MAX_PER_HOST, max_retries=0, adaptive_timeouts=False,
+        min_samples=10, hedging=True, hedge_budget=1.0,
+    )
+    # a cancelled loser's server thread sleeps on, so count requests in flight on the client
+    in_flight, peak = [0], [0]
+    timed = Transport._atimed
+
+    async def counted(*args):
+        in_flight[0] += 1
+        peak[0] = max(peak[0], in_flight[0])
+        try:
+            return await timed(*args)
+        finally:
+            in_flight[0] -= 1
+
+    monkeypatch.setattr(Transport, "_atimed", staticmethod(counted))
+
+    async def busy(n):
+        return [(await transport.arequest("GET", slow_tail)).status_code for _ in range(n)]
+
+    async def occasional(n):
+        statuses = []
+        for _ in range(n):
+            await asyncio.sleep(0.03)
+            statuses.append((await transport.arequest("GET", slow_tail)).status_code)
+        return statuses
+
+    async def run():
+        try:
+            await busy(40)
+            # two callers, two slots: one may hedge only while the other is between requests
+            return await asyncio.gather(busy(160), occasional(40))
+        finally:
+            await transport.aclose()
+
+    busy_statuses, occasional_statuses = asyncio.run(run())
+
+    host = slow_tail.split("//", 1)[1]
+    assert busy_statuses + occasional_statuses == [200] * 200
+    assert transport._stats[host].hedges > 0
+    assert peak[0] <= MAX_PER_HOST
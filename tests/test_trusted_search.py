@@ -0,0 +1,76 @@
+import asyncio
+
+import pytest
+
+from benchmarks.stubs import Profile, StubProviders
+from tools.http_cache import response_cache
+from tools.trusted_search_tool import TrustedSearchTool
+from tools.transport import transport
+
+SITES = len(TrustedSearchTool.trusted_sites)
+
+
+@pytest.fixture
+def tavily(monkeypatch):
+    """A counting Tavily stub; every call reaches it (no response cache)"""
+    monkeypatch.setattr(response_cache, "enabled", False)
+    with StubProviders(default=Profile(latency_ms=5, jitter=0)) as stubs:
+        yield stubs
+
+
+@pytest.mark.parametrize("batched, requests", [(True, 1), (False, SITES)])
+def test_one_query_costs_one_request_when_batched(tavily, batched, requests):
+    tool = TrustedSearchTool(search_url=f"{tavily.stubs['tavily'].url}/search", batched=batched)
+    result = tool._run(f"electric vehicles batched={batched}")
+
+    assert tavily.counts()["tavily"] == requests
+    assert result.startswith("### Trusted Results:")
+
+
+@pytest.mark.parametrize("batched, requests", [(True, 1), (False, SITES)])
+def test_async_search_batches_the_same_way(tavily, batched, requests):
+    tool = TrustedSearchTool(search_url=f"{tavily.stubs['tavily'].url}/search", batched=batched)
+
+    async def search():
+        try:
+            return await tool._arun(f"async electric vehicles batched={batched}")
+        finally:
+            await transport.aclose()
+
+    result = asyncio.run(search())
+
+    assert tavily.counts()["tavily"] == requests
+    assert result.startswith("### Trusted Results:")
+
+
+@pytest.mark.parametrize("run", ["_run", "_arun"])
+def test_a_failed_group_is_reported_missing(tavily, monkeypatch, run):
+    failing = TrustedSearchTool.trusted_sites[2]
+    search_group, asearch_group = TrustedSearchTool._search_group, TrustedSearchTool._asearch_group
+
+    def flaky(self, sites, query, headers):
+        if failing in sites:
+            raise ConnectionError("reset by peer")
+        return search_group(self, sites, query, headers)
+
+    async def aflaky(self, sites, query, headers):
+        if failing in sites:
+            raise ConnectionError("reset by peer")
+        return await asearch_group(self, sites, query, headers)
+
+    monkeypatch.setattr(TrustedSearchTool, "_search_group", flaky)
+    monkeypatch.setattr(TrustedSearchTool, "_asearch_group", aflaky)
+    tool = TrustedSearchTool(search_url=f"{tavily.stubs['tavily'].url}/search", batched=False)
+
+    async def asearch(query):
+        try:
+            return await tool._arun(query)
+        finally:
+            await transport.aclose()
+
+    query = f"charging network {run}"
+    result = tool._run(query) if run == "_run" else asyncio.run(asearch(query))
+
+    assert result.startswith("### Trusted Results:")
+    assert f"Partial results: {failing} failed" in result
+    assert tavily.counts()["tavily"] == SITES - 1
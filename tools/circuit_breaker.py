@@ -0,0 +1,162 @@
+"""
+Circuit Breakers - stop waiting on a search source that keeps failing
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from config import tracing
+from config.cassette import CassetteMiss
+from tools.singleflight import normalize_query
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitBreaker:
+    """Closed -> open after ``failures`` consecutive failures (errors, timeouts, bad statuses).
+
+    While open, calls don't reach the source: they get the last-known-good result for
+    their query, else the caller's fallback, at once. After ``reset_after`` seconds one
+    call is let through as a half-open probe; its success closes the breaker, its
+    failure opens it for another ``reset_after``. Other calls keep short-circuiting
+    while the probe is out.
+    """
+
+    def __init__(self, name: str, failures: int = 3, reset_after: float = 30.0, remembered: int = 256):
+        self.name = name
+        self.failures = failures
+        self.reset_after = reset_after
+        self.remembered = remembered
+        self.state = CLOSED
+        self.stats = {
+            "calls": 0, "failures": 0, "trips": 0, "probes": 0,
+            "short_circuits": 0, "last_good_served": 0, "fallbacks_served": 0,
+        }
+        self._consecutive = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._last_good: "OrderedDict[Any, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _allow(self) -> Optional[str]:
+        """"call", "probe", or None to short-circuit"""
+        with self._lock:
+            self.stats["calls"] += 1
+            if self.state == CLOSED:
+                return "call"
+            if self.state == OPEN and time.monotonic() - self._opened_at >= self.reset_after:
+                self.state = HALF_OPEN
+            if self.state == HALF_OPEN and not self._probing:
+                self._probing = True
+                self.stats["probes"] += 1
+                return "probe"
+            self.stats["short_circuits"] += 1
+            return None
+
+    def _succeeded(self, key, result):
+        with self._lock:
+            self.state = CLOSED
+            self._consecutive = 0
+            self._probing = False
+            self._last_good[key] = result
+            self._last_good.move_to_end(key)
+            while len(self._last_good) > self.remembered:
+                self._last_good.popitem(last=False)
+
+    def _failed(self, probe: bool):
+        with self._lock:
+            self.stats["failures"] += 1
+            self._consecutive += 1
+            self._probing = False
+            if probe or (self.state == CLOSED and self._consecutive >= self.failures):
+                if self.state == CLOSED:
+                    self.stats["trips"] += 1
+                self.state = OPEN
+                self._opened_at = time.monotonic()
+
+    def _abandoned(self, probe: bool):
+        """The call was cancelled or interrupted: it says nothing about the source, but a probe frees its slot"""
+        if probe:
+            with self._lock:
+                self._probing = False
+
+    def _degraded(self, key, fallback: Callable[[], Any]):
+        with self._lock:
+            known = key in self._last_good
+            result = self._last_good[key] if known else None
+            self.stats["last_good_served" if known else "fallbacks_served"] += 1
+        tracing.add("breaker_fallbacks")
+        return result if known else fallback()
+
+    def call(self, query, fetch: Callable[[], Any], fallback: Callable[[], Any]):
+        """``fetch()`` through the breaker; it signals failure by raising"""
+        key = normalize_query(query)
+        mode = self._allow()
+        if mode is None:
+            tracing.add("breaker_short_circuits")
+            return self._degraded(key, fallback)
+        try:
+            result = fetch()
+        except CassetteMiss:
+            raise  # a replay gap, not an outage: a fallback would hide it
+        except Exception:
+            self._failed(probe=mode == "probe")
+            return self._degraded(key, fallback)
+        except BaseException:
+            # CancelledError, KeyboardInterrupt: without this a cancelled probe would jam the breaker half-open
+            self._abandoned(probe=mode == "probe")
+            raise
+        self._succeeded(key, result)
+        return result
+
+    async def acall(self, query, fetch: Callable[[], Awaitable], fallback: Callable[[], Any]):
+        """``call`` for coroutines: ``fetch()`` returns an awaitable"""
+        key = normalize_query(query)
+        mode = self._allow()
+        if mode is None:
+            tracing.add("breaker_short_circuits")
+            return self._degraded(key, fallback)
+        try:
+            result = await fetch()
+        except CassetteMiss:
+            raise  # a replay gap, not an outage: a fallback would hide it
+        except Exception:
+            self._failed(probe=mode == "probe")
+            return self._degraded(key, fallback)
+        except BaseException:
+            # CancelledError, KeyboardInterrupt: without this a cancelled probe would jam the breaker half-open
+            self._abandoned(probe=mode == "probe")
+            raise
+        self._succeeded(key, result)
+        return result
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"state": self.state, "consecutive_failures": self._consecutive, **self.stats}
+
+
+class Breakers:
+    """One breaker per source, shared by every tool instance in the process"""
+
+    def __init__(self, failures: int = None, reset_after: float = None):
+        self.failures = failures or int(os.getenv("BREAKER_FAILURES", "3"))
+        self.reset_after = reset_after or float(os.getenv("BREAKER_RESET_SECONDS", "30"))
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, source: str) -> CircuitBreaker:
+        with self._lock:
+            if source not in self._breakers:
+                self._breakers[source] = CircuitBreaker(source, self.failures, self.reset_after)
+            return self._breakers[source]
+
+    def summary(self) -> Dict[str, Dict]:
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {name: b.snapshot() for name, b in sorted(breakers.items())}
+
+
+breakers = Breakers()
@@ -2,68 +2,136 @@
 Compact Dataset Search Tool (Improved with Deduplication & Quality)
 """
 
-import requests
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
 from crewai.tools import BaseTool
 from typing import List, Dict
+from config import events
+from config.cassette import CassetteMiss
+from config.tracing import traced_tool
+from tools import prefetch
+from tools.circuit_breaker import breakers
+from tools.http_cache import response_cache
+from tools.metadata_index import metadata_index
+from tools.singleflight import coalesced
+
+
+# platforms searched by every query, in output order
+SOURCES = ("kaggle", "huggingface", "github")
+
+# quality shown for results served from the local metadata index
+_INDEX_QUALITY = {
+    "kaggle": lambda r: "7-9/10",
+    "huggingface": lambda r: "8-10/10",
+    "github": lambda r: f"{min(10, max(1, r.get('stars', 0) // 100))}/10",
+}
 
 
 class DatasetSearchTool(BaseTool):
     name: str = "Dataset Search Tool"
     description: str = "Search datasets on Kaggle, HuggingFace, GitHub with deduplication"
 
+    kaggle_api_url: str = os.getenv("KAGGLE_API_URL", "https://www.kaggle.com/api/v1")
+    huggingface_api_url: str = os.getenv("HUGGINGFACE_API_URL", "https://huggingface.co/api")
+    github_api_url: str = os.getenv("GITHUB_API_URL", "https://api.github.com")
+
+    @traced_tool
+    @coalesced
     def _run(self, search_query: str) -> str:
         try:
-            results = {
-                "kaggle": self._search_kaggle(search_query),
-                "huggingface": self._search_huggingface(search_query),
-                "github": self._search_github(search_query),
-            }
+            # the platforms are independent: search them side by side, not one after another
+            with ThreadPoolExecutor(max_workers=len(SOURCES), thread_name_prefix="dataset-search") as pool:
+                futures = {source: events.submit(pool, self._search, source, search_query) for source in SOURCES}
+                results = {source: future.result() for source, future in futures.items()}
+            return self._format_results(self._deduplicate(results), search_query)
+        except CassetteMiss:
+            raise  # a replay with a stale cassette must fail, not read as a tool error
+        except Exception as e:
+            return f"Search error: {str(e)}"
 
-            # Deduplicate results across platforms by title + URL
-            seen = set()
-            for platform, items in results.items():
-                unique_items = []
-                for item in items:
-                    key = (item["title"].lower(), item["url"].lower())
-                    if key not in seen:
-                        seen.add(key)
-                        unique_items.append(item)
-                results[platform] = unique_items
-
-            return self._format_results(results, search_query)
+    @traced_tool
+    @coalesced
+    async def _arun(self, search_query: str) -> str:
+        try:
+            found = await asyncio.gather(*(self._asearch(source, search_query) for source in SOURCES))
+            return self._format_results(self._deduplicate(dict(zip(SOURCES, found))), search_query)
+        except CassetteMiss:
+            raise
         except Exception as e:
             return f"Search error: {str(e)}"
 
-    def _search_kaggle(self, query: str) -> List[Dict]:
+    @staticmethod
+    def _deduplicate(results: Dict[str, List[Dict]]) -> Dict[str, List[Dict]]:
+        """Deduplicate results across platforms by title + URL"""
+        seen = set()
+        for platform, items in results.items():
+            unique_items = []
+            for item in items:
+                key = (item["title"].lower(), item["url"].lower())
+                if key not in seen:
+                    seen.add(key)
+                    unique_items.append(item)
+            results[platform] = unique_items
+        return results
+
+    @staticmethod
+    def _from_index(records: List[Dict], quality) -> List[Dict]:
         return [
             {
-                "title": f"Kaggle {query} Datasets",
-                "url": f"https://www.kaggle.com/datasets?search={query.replace(' ', '+')}",
-                "description": f"Community datasets for {query}",
-                "quality": "7-9/10",
+                "title": r["title"],
+                "url": r["url"],
+                "description": (r.get("description") or "No description")[:100] + "...",
+                "quality": quality(r),
             }
+            for r in records
         ]
 
-    def _search_huggingface(self, query: str) -> List[Dict]:
-        try:
-            url = f"https://huggingface.co/api/datasets?search={query}&limit=3"
-            resp = requests.get(url, timeout=5)
-            results = []
-            if resp.status_code == 200:
-                for item in resp.json()[:3]:
-                    results.append(
-                        {
-                            "title": item.get("id", "").strip(),
-                            "url": f"https://huggingface.co/datasets/{item.get('id')}",
-                            "description": (item.get("description", "") or "No description")[
-                                :100
-                            ]
-                            + "...",
-                            "quality": "8-10/10",
-                        }
-                    )
-            return results
-        except:
+    @staticmethod
+    def _ok(resp, source: str, records=lambda body: body):
+        """The response body; a non-200 answer counts against the source's circuit breaker, like an error"""
+        if resp.status_code != 200:
+            raise RuntimeError(f"{source} returned {resp.status_code}")
+        body = resp.json()
+        if body and not resp.from_cache:
+            metadata_index.remember(records(body), source)
+        return body
+
+    def _search(self, source: str, query: str) -> List[Dict]:
+        local = prefetch.lookup(query, source) or metadata_index.lookup(query, source=source)
+        if local is not None:
+            return self._from_index(local, _INDEX_QUALITY[source])
+        fallback = self._fallback(source, query)
+        results = breakers.get(source).call(query, lambda: self._fetch(source, query), lambda: fallback)
+        return results or fallback
+
+    async def _asearch(self, source: str, query: str) -> List[Dict]:
+        local = prefetch.lookup(query, source) or metadata_index.lookup(query, source=source)
+        if local is not None:
+            return self._from_index(local, _INDEX_QUALITY[source])
+        fallback = self._fallback(source, query)
+        results = await breakers.get(source).acall(query, lambda: self._afetch(source, query), lambda: fallback)
+        return results or fallback
+
+    def _fetch(self, source: str, query: str) -> List[Dict]:
+        return self._parse(source, response_cache.request(source, **self._request(source, query)))
+
+    async def _afetch(self, source: str, query: str) -> List[Dict]:
+        return self._parse(source, await response_cache.arequest(source, **self._request(source, query)))
+
+    @staticmethod
+    def _fallback(source: str, query: str) -> List[Dict]:
+        """A search link on the platform, served when it can't be reached or finds nothing"""
+        if source == "kaggle":
+            return [
+                {
+                    "title": f"Kaggle {query} Datasets",
+                    "url": f"https://www.kaggle.com/datasets?search={query.replace(' ', '+')}",
+                    "description": f"Community datasets for {query}",
+                    "quality": "7-9/10",
+                }
+            ]
+        if source == "huggingface":
             return [
                 {
                     "title": f"HuggingFace {query}",
@@ -72,40 +140,64 @@ class DatasetSearchTool(BaseTool):
                     "quality": "8-10/10",
                 }
             ]
+        return [
+            {
+                "title": f"GitHub {query}",
+                "url": f"https://github.com/search?q={query}+dataset",
+                "description": f"Code repositories for {query}",
+                "quality": "6-8/10",
+            }
+        ]
 
-    def _search_github(self, query: str) -> List[Dict]:
-        try:
-            url = "https://api.github.com/search/repositories"
-            resp = requests.get(
-                url,
-                params={"q": f"{query} dataset", "sort": "stars"},
-                timeout=5,
-                headers={"Accept": "application/vnd.github.v3+json"},
-            )
-            results = []
-            if resp.status_code == 200:
-                for item in resp.json().get("items", [])[:3]:
-                    results.append(
-                        {
-                            "title": item["name"].strip(),
-                            "url": item["html_url"],
-                            "description": (item.get("description", "") or "No description")[
-                                :100
-                            ]
-                            + "...",
-                            "quality": f"{min(10, max(1, item.get('stargazers_count', 0)//100))}/10",
-                        }
-                    )
-            return results
-        except:
+    def _request(self, source: str, query: str) -> Dict:
+        """Arguments for ``response_cache.request`` / ``arequest``"""
+        if source == "kaggle":
+            return {
+                "method": "GET", "url": f"{self.kaggle_api_url}/datasets/list",
+                "params": {"search": query}, "headers": {"User-Agent": "Mozilla"}, "timeout": 5,
+            }
+        if source == "huggingface":
+            return {
+                "method": "GET", "url": f"{self.huggingface_api_url}/datasets",
+                "params": {"search": query, "limit": 3}, "timeout": 5,
+            }
+        return {
+            "method": "GET", "url": f"{self.github_api_url}/search/repositories",
+            "params": {"q": f"{query} dataset", "sort": "stars"}, "timeout": 5,
+            "headers": {"Accept": "application/vnd.github.v3+json"},
+        }
+
+    def _parse(self, source: str, resp) -> List[Dict]:
+        if source == "kaggle":
             return [
                 {
-                    "title": f"GitHub {query}",
-                    "url": f"https://github.com/search?q={query}+dataset",
-                    "description": f"Code repositories for {query}",
-                    "quality": "6-8/10",
+                    "title": ds["title"].strip(),
+                    "url": f"https://www.kaggle.com/datasets/{ds['ref']}",
+                    "description": (ds.get("subtitle") or "No description")[:100] + "...",
+                    "quality": "7-9/10",
                 }
+                for ds in (self._ok(resp, "kaggle") or [])[:3]
             ]
+        if source == "huggingface":
+            return [
+                {
+                    "title": item.get("id", "").strip(),
+                    "url": f"https://huggingface.co/datasets/{item.get('id')}",
+                    "description": (item.get("description", "") or "No description")[:100] + "...",
+                    "quality": "8-10/10",
+                }
+                for item in self._ok(resp, "huggingface")[:3]
+            ]
+        items = self._ok(resp, "github", lambda body: body.get("items", [])).get("items", [])
+        return [
+            {
+                "title": item["name"].strip(),
+                "url": item["html_url"],
+                "description": (item.get("description", "") or "No description")[:100] + "...",
+                "quality": f"{min(10, max(1, item.get('stargazers_count', 0)//100))}/10",
+            }
+            for item in items[:3]
+        ]
 
     def _format_results(self, results: Dict, query: str) -> str:
         output = f"# Dataset Search: {query}\n\n"
@@ -121,4 +213,9 @@ class DatasetSearchTool(BaseTool):
         return output
 
 
-dataset_search_tool = DatasetSearchTool()
\ No newline at end of file
+def __getattr__(name):
+    # `dataset_search_tool` is built on first access and cached by config.registry
+    if name == "dataset_search_tool":
+        from config.registry import get_tool
+        return get_tool("dataset_search")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
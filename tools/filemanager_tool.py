@@ -2,8 +2,10 @@
 Enhanced File Manager Tool - Prevents Truncation
 """
 from crewai.tools import BaseTool
+import asyncio
 import os
 from datetime import datetime
+from config.tracing import traced_tool
 
 class FileManagerTool(BaseTool):
     name: str = "File Manager Tool"
@@ -13,8 +15,18 @@ class FileManagerTool(BaseTool):
         super().__init__(**kwargs)
         os.makedirs("outputs", exist_ok=True)
 
+    @traced_tool
     def _run(self, content: str, filename: str = None) -> str:
         """Save content with proper encoding and full content preservation"""
+        return self._save(content, filename)
+
+    @traced_tool
+    async def _arun(self, content: str, filename: str = None) -> str:
+        # no async file API in the standard library; the write is short, so borrow a thread for it
+        return await asyncio.to_thread(self._save, content, filename)
+
+    @staticmethod
+    def _save(content: str, filename: str = None) -> str:
         try:
             if not filename:
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -36,4 +48,9 @@ class FileManagerTool(BaseTool):
         except Exception as e:
             return f"❌ Error saving file: {str(e)}"
 
-file_manager_tool = FileManagerTool()
\ No newline at end of file
+def __getattr__(name):
+    # `file_manager_tool` is built on first access and cached by config.registry
+    if name == "file_manager_tool":
+        from config.registry import get_tool
+        return get_tool("file_manager")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -2,36 +2,88 @@
 Specialized GitHub Code Search Tool
 """
 
-import requests
+import os
 from crewai.tools import BaseTool
+from config.cassette import CassetteMiss
+from config.tracing import traced_tool
+from tools.http_cache import response_cache
+from tools import prefetch
+from tools.metadata_index import metadata_index
+from tools.singleflight import coalesced
 
 
 class GitHubCodeTool(BaseTool):
     name: str = "GitHub Code Tool"
     description: str = "Search code repositories directly on GitHub API for AI use cases."
 
+    api_url: str = os.getenv("GITHUB_API_URL", "https://api.github.com")
+
+    @traced_tool
+    @coalesced
     def _run(self, query: str) -> str:
+        local = prefetch.lookup(query, "github") or metadata_index.lookup(query, source="github")
+        if local is not None:
+            return self._format_local(local)
+
         try:
-            url = "https://api.github.com/search/repositories"
-            resp = requests.get(
-                url,
-                params={"q": query, "sort": "stars", "order": "desc"},
-                timeout=6,
-                headers={"Accept": "application/vnd.github.v3+json"},
-            )
-            if resp.status_code != 200:
-                return f"GitHub Search failed ({resp.status_code})"
-
-            repos = resp.json().get("items", [])[:3]
-            results = []
-            for r in repos:
-                results.append(
-                    f"- **[{r['name']}]({r['html_url']})** ⭐ {r['stargazers_count']}\n"
-                    f"  - {r.get('description','No description')}\n"
-                )
-            return "\n".join(results) if repos else "No GitHub repos found."
+            return self._format(response_cache.request("github", **self._request(query)))
+        except CassetteMiss:
+            raise  # a replay with a stale cassette must fail, not read as a tool error
+        except Exception as e:
+            return f"GitHub error: {e}"
+
+    @traced_tool
+    @coalesced
+    async def _arun(self, query: str) -> str:
+        local = prefetch.lookup(query, "github") or metadata_index.lookup(query, source="github")
+        if local is not None:
+            return self._format_local(local)
+
+        try:
+            return self._format(await response_cache.arequest("github", **self._request(query)))
+        except CassetteMiss:
+            raise
         except Exception as e:
             return f"GitHub error: {e}"
 
+    def _request(self, query: str) -> dict:
+        return {
+            "method": "GET",
+            "url": f"{self.api_url}/search/repositories",
+            "params": {"q": query, "sort": "stars", "order": "desc"},
+            "timeout": 6,
+            "headers": {"Accept": "application/vnd.github.v3+json"},
+        }
+
+    @staticmethod
+    def _format_local(local) -> str:
+        return "\n".join(
+            f"- **[{r['title']}]({r['url']})** ⭐ {r.get('stars', 0)}\n"
+            f"  - {r.get('description','No description')}\n"
+            for r in local
+        )
+
+    @staticmethod
+    def _format(resp) -> str:
+        if resp.status_code != 200:
+            return f"GitHub Search failed ({resp.status_code})"
+
+        if not resp.from_cache:
+            metadata_index.remember(resp.json().get("items", []), "github")
+
+        repos = resp.json().get("items", [])[:3]
+        results = []
+        for r in repos:
+            results.append(
+                f"- **[{r['name']}]({r['html_url']})** ⭐ {r['stargazers_count']}\n"
+                f"  - {r.get('description','No description')}\n"
+            )
+        return "\n".join(results) if repos else "No GitHub repos found."
+
 
-github_code_tool = GitHubCodeTool()
\ No newline at end of file
+def __getattr__(name):
+    # `github_code_tool` is built on first access and cached by config.registry
+    if name == "github_code_tool":
+        from config.registry import get_tool
+        return get_tool("github")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,336 @@
+"""
+Persistent HTTP Response Cache shared by all search tools
+"""
+
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+from urllib.parse import parse_qsl, urlsplit, urlunsplit
+
+from config import cassette, tracing
+from tools.transport import transport
+
+# seconds a response is served as fresh, per source
+DEFAULT_TTLS: Dict[str, int] = {
+    "tavily": 6 * 3600,
+    "trusted_search": 6 * 3600,
+    "github": 24 * 3600,
+    "kaggle": 24 * 3600,
+    "huggingface": 24 * 3600,
+}
+DEFAULT_TTL = 3600
+
+
+class CachedResponse:
+    """Minimal stand-in for requests.Response, rebuilt from a cache row"""
+
+    def __init__(self, status_code: int, content: bytes, headers: Optional[Dict[str, str]] = None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+        self.from_cache = True
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+    def to_answer(self) -> Dict[str, Any]:
+        """Cassette form: text bodies stay readable, anything else is base64"""
+        answer = {"status": self.status_code, "headers": dict(self.headers)}
+        try:
+            answer["body"] = self.content.decode("utf-8")
+        except UnicodeDecodeError:
+            answer["body_b64"] = base64.b64encode(self.content).decode("ascii")
+        return answer
+
+    @classmethod
+    def from_answer(cls, answer: Dict[str, Any]) -> "CachedResponse":
+        if "body_b64" in answer:
+            body = base64.b64decode(answer["body_b64"])
+        else:
+            body = answer["body"].encode("utf-8")
+        return cls(answer["status"], body, answer.get("headers"))
+
+
+class ResponseCache:
+    """SQLite-backed response cache with per-source TTLs, LRU eviction and stale-while-revalidate.
+
+    Entries are keyed on method, URL, normalized params and body. A fresh entry is
+    returned directly; an expired entry still inside ``stale_window`` is returned
+    immediately while a background thread refreshes it; anything older is refetched.
+    """
+
+    def __init__(
+        self,
+        path: str = None,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttls: Optional[Dict[str, int]] = None,
+        stale_window: int = 24 * 3600,
+        enabled: bool = None,
+    ):
+        self.path = path or os.getenv("HTTP_CACHE_PATH", os.path.join(".cache", "http_cache.sqlite"))
+        self.max_bytes = max_bytes
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.stale_window = stale_window
+        self.enabled = enabled if enabled is not None else os.getenv("HTTP_CACHE_DISABLED", "") not in ("1", "true")
+
+        self.stats = {"hits": 0, "stale_hits": 0, "misses": 0, "revalidations": 0, "evictions": 0}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._revalidating = set()
+        self._initialized = False
+
+    # ------------------------------------------------------------------ storage
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._lock:
+                if not self._initialized:
+                    conn.execute(
+                        "CREATE TABLE IF NOT EXISTS responses ("
+                        " key TEXT PRIMARY KEY, source TEXT, status INTEGER, headers TEXT,"
+                        " body BLOB, size INTEGER, stored_at REAL, last_access REAL)"
+                    )
+                    conn.execute("CREATE INDEX IF NOT EXISTS responses_lru ON responses(last_access)")
+                    self._initialized = True
+        return conn
+
+    @staticmethod
+    def make_key(method: str, url: str, params: Optional[Dict] = None, body: Any = None) -> str:
+        """Stable key: query-string and explicit params are merged and sorted, JSON bodies canonicalized."""
+        parts = urlsplit(url)
+        merged = parse_qsl(parts.query, keep_blank_values=True)
+        merged += [(str(k), str(v)) for k, v in (params or {}).items() if v is not None]
+        base = urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path or "/", "", ""))
+        raw = json.dumps(
+            [method.upper(), base, sorted(merged), body],
+            sort_keys=True, separators=(",", ":"), default=str,
+        )
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str):
+        """Return (response, age_seconds) or None. Touches the entry for LRU."""
+        row = self._conn().execute(
+            "SELECT status, headers, body, stored_at FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        self._conn().execute("UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key))
+        status, headers, body, stored_at = row
+        return CachedResponse(status, body, json.loads(headers or "{}")), time.time() - stored_at
+
+    def put(self, key: str, source: str, status: int, body: bytes, headers: Optional[Dict] = None):
+        now = time.time()
+        self._conn().execute(
+            "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (key, source, status, json.dumps(dict(headers or {})), body, len(body), now, now),
+        )
+        self._evict()
+
+    def _evict(self):
+        conn = self._conn()
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # drop least recently used rows until back under 90% of the budget
+        target = total - int(self.max_bytes * 0.9)
+        freed = 0
+        victims = []
+        for key, size in conn.execute("SELECT key, size FROM responses ORDER BY last_access ASC"):
+            victims.append((key,))
+            freed += size
+            if freed >= target:
+                break
+        conn.executemany("DELETE FROM responses WHERE key = ?", victims)
+        self._bump("evictions", len(victims))
+
+    def _bump(self, counter: str, n: int = 1):
+        with self._lock:
+            self.stats[counter] += n
+
+    def clear(self):
+        self._conn().execute("DELETE FROM responses")
+
+    def ttl_for(self, source: str) -> int:
+        return self.ttls.get(source, DEFAULT_TTL)
+
+    # ------------------------------------------------------------------ lookups
+
+    def cached_call(self, source: str, key: str, fetch: Callable[[], Any]) -> Any:
+        """Generic read-through: ``fetch()`` returns (status, body_bytes, headers).
+
+        Returns a CachedResponse. Only 200 responses are stored. While a cassette is
+        active (see config.cassette) the answer is recorded, or replayed without
+        touching the cache or the network.
+        """
+        tape = cassette.current()
+        if tape is not None:
+            return tape.exchange(
+                "http", key, source,
+                lambda: self._read_through(source, key, fetch),
+                CachedResponse.to_answer,
+                CachedResponse.from_answer,
+            )
+        return self._read_through(source, key, fetch)
+
+    @staticmethod
+    def _fetched(status: int, body: bytes, headers: Dict) -> "CachedResponse":
+        response = CachedResponse(status, body, headers)
+        response.from_cache = False
+        return response
+
+    def _lookup(self, source: str, key: str, fetch: Callable[[], Any]):
+        """(response to serve now or None, stored entry or None); a stale hit is refreshed in the background"""
+        try:
+            entry = self.get(key)
+        except sqlite3.Error:
+            entry = None
+
+        if entry is not None:
+            response, age = entry
+            ttl = self.ttl_for(source)
+            if age <= ttl:
+                self._bump("hits")
+                tracing.add("cache_hits")
+                return response, entry
+            if age <= ttl + self.stale_window:
+                self._bump("stale_hits")
+                tracing.add("cache_stale_hits")
+                self._revalidate_async(source, key, fetch)
+                return response, entry
+
+        self._bump("misses")
+        tracing.add("cache_misses")
+        return None, entry
+
+    def _read_through(self, source: str, key: str, fetch: Callable[[], Any]) -> "CachedResponse":
+        if not self.enabled:
+            return self._fetched(*fetch())
+
+        response, entry = self._lookup(source, key, fetch)
+        if response is not None:
+            return response
+        try:
+            status, body, headers = fetch()
+        except Exception:
+            if entry is not None:
+                return entry[0]  # network down: an old answer beats none
+            raise
+        self._store(source, key, status, body, headers)
+        return self._fetched(status, body, headers)
+
+    async def _aread_through(self, source: str, key: str, fetch: Callable[[], Any], afetch) -> "CachedResponse":
+        """``_read_through`` with a coroutine ``afetch()``; background revalidation still uses ``fetch()``.
+
+        The SQLite reads and writes run on worker threads: a write waiting on another
+        process's lock must not stall every other coroutine on the loop.
+        """
+        if not self.enabled:
+            return self._fetched(*await afetch())
+
+        response, entry = await asyncio.to_thread(self._lookup, source, key, fetch)
+        if response is not None:
+            return response
+        try:
+            status, body, headers = await afetch()
+        except Exception:
+            if entry is not None:
+                return entry[0]
+            raise
+        await asyncio.to_thread(self._store, source, key, status, body, headers)
+        return self._fetched(status, body, headers)
+
+    def _store(self, source, key, status, body, headers):
+        if status != 200:
+            return
+        try:
+            self.put(key, source, status, body, headers)
+        except sqlite3.Error:
+            pass  # caching is best effort
+
+    def _revalidate_async(self, source: str, key: str, fetch: Callable[[], Any]):
+        with self._lock:
+            if key in self._revalidating:
+                return
+            self._revalidating.add(key)
+
+        def refresh():
+            try:
+                status, body, headers = fetch()
+                self._store(source, key, status, body, headers)
+                self._bump("revalidations")
+            except Exception:
+                pass
+            finally:
+                with self._lock:
+                    self._revalidating.discard(key)
+
+        threading.Thread(target=refresh, daemon=True, name=f"cache-revalidate-{source}").start()
+
+    def request(
+        self,
+        source: str,
+        method: str,
+        url: str,
+        params: Optional[Dict] = None,
+        json_body: Any = None,
+        headers: Optional[Dict] = None,
+        timeout: float = 10,
+    ):
+        """Cached drop-in for ``requests.request``; returns a response with status_code/json()/text."""
+        key = self.make_key(method, url, params, json_body)
+
+        def fetch():
+            resp = transport.request(method, url, params=params, json=json_body, headers=headers, timeout=timeout)
+            return resp.status_code, resp.content, {"Content-Type": resp.headers.get("Content-Type", "")}
+
+        return self.cached_call(source, key, fetch)
+
+    async def arequest(
+        self,
+        source: str,
+        method: str,
+        url: str,
+        params: Optional[Dict] = None,
+        json_body: Any = None,
+        headers: Optional[Dict] = None,
+        timeout: float = 10,
+    ):
+        """``request`` for coroutines: same keys, TTLs and stats, fetched through ``transport.arequest``"""
+        if cassette.current() is not None:
+            # recording and replaying are sequential by nature; keep them on the sync path
+            return await asyncio.to_thread(self.request, source, method, url, params, json_body, headers, timeout)
+        key = self.make_key(method, url, params, json_body)
+
+        def fetch():
+            resp = transport.request(method, url, params=params, json=json_body, headers=headers, timeout=timeout)
+            return resp.status_code, resp.content, {"Content-Type": resp.headers.get("Content-Type", "")}
+
+        async def afetch():
+            resp = await transport.arequest(method, url, params=params, json=json_body, headers=headers, timeout=timeout)
+            return resp.status_code, resp.content, {"Content-Type": resp.headers.get("Content-Type", "")}
+
+        return await self._aread_through(source, key, fetch, afetch)
+
+    def summary(self) -> Dict[str, Any]:
+        lookups = self.stats["hits"] + self.stats["stale_hits"] + self.stats["misses"]
+        hit_rate = (self.stats["hits"] + self.stats["stale_hits"]) / lookups if lookups else 0.0
+        return {**self.stats, "hit_rate": round(hit_rate, 3)}
+
+
+response_cache = ResponseCache()
@@ -2,33 +2,85 @@
 Specialized Kaggle Dataset Tool
 """
 
-import requests
+import os
 from crewai.tools import BaseTool
+from config.cassette import CassetteMiss
+from config.tracing import traced_tool
+from tools.http_cache import response_cache
+from tools import prefetch
+from tools.metadata_index import metadata_index
+from tools.singleflight import coalesced
 
 
 class KaggleDatasetTool(BaseTool):
     name: str = "Kaggle Dataset Tool"
     description: str = "Search datasets directly via Kaggle API."
 
+    api_url: str = os.getenv("KAGGLE_API_URL", "https://www.kaggle.com/api/v1")
+
+    @traced_tool
+    @coalesced
     def _run(self, query: str) -> str:
-        try:
-            url = f"https://www.kaggle.com/api/v1/datasets/list"
-            headers = {"User-Agent": "Mozilla"}  # if kaggle requires login, adjust with creds
-            resp = requests.get(url, params={"search": query}, headers=headers, timeout=6)
+        local = prefetch.lookup(query, "kaggle") or metadata_index.lookup(query, source="kaggle")
+        if local is not None:
+            return self._format_local(local)
 
-            if resp.status_code != 200:
-                return f"Kaggle Search failed ({resp.status_code})"
+        try:
+            return self._format(response_cache.request("kaggle", **self._request(query)))
+        except CassetteMiss:
+            raise  # a replay with a stale cassette must fail, not read as a tool error
+        except Exception as e:
+            return f"Kaggle error: {e}"
 
-            results = []
-            for ds in resp.json()[:3]:
-                results.append(
-                    f"- **[{ds['title']}]({'https://www.kaggle.com/datasets/'+ds['ref']})**\n"
-                    f"  - Size: {ds.get('size','Unknown')} - {ds.get('licenses','N/A')}\n"
-                )
+    @traced_tool
+    @coalesced
+    async def _arun(self, query: str) -> str:
+        local = prefetch.lookup(query, "kaggle") or metadata_index.lookup(query, source="kaggle")
+        if local is not None:
+            return self._format_local(local)
 
-            return "\n".join(results) if results else "No Kaggle datasets found."
+        try:
+            return self._format(await response_cache.arequest("kaggle", **self._request(query)))
+        except CassetteMiss:
+            raise
         except Exception as e:
             return f"Kaggle error: {e}"
 
+    def _request(self, query: str) -> dict:
+        headers = {"User-Agent": "Mozilla"}  # if kaggle requires login, adjust with creds
+        return {
+            "method": "GET", "url": f"{self.api_url}/datasets/list",
+            "params": {"search": query}, "headers": headers, "timeout": 6,
+        }
+
+    @staticmethod
+    def _format_local(local) -> str:
+        return "\n".join(
+            f"- **[{ds['title']}]({ds['url']})**\n"
+            f"  - Size: {ds.get('size','Unknown')} - {ds.get('license','N/A')}\n"
+            for ds in local
+        )
+
+    @staticmethod
+    def _format(resp) -> str:
+        if resp.status_code != 200:
+            return f"Kaggle Search failed ({resp.status_code})"
+        if not resp.from_cache:
+            metadata_index.remember(resp.json(), "kaggle")
+
+        results = []
+        for ds in resp.json()[:3]:
+            results.append(
+                f"- **[{ds['title']}]({'https://www.kaggle.com/datasets/'+ds['ref']})**\n"
+                f"  - Size: {ds.get('size','Unknown')} - {ds.get('licenses','N/A')}\n"
+            )
+
+        return "\n".join(results) if results else "No Kaggle datasets found."
+
 
-kaggle_dataset_tool = KaggleDatasetTool()
\ No newline at end of file
+def __getattr__(name):
+    # `kaggle_dataset_tool` is built on first access and cached by config.registry
+    if name == "kaggle_dataset_tool":
+        from config.registry import get_tool
+        return get_tool("kaggle")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,479 @@
+"""
+Offline Metadata Index - BM25 search over dataset and repository metadata, memory-mapped from disk
+"""
+
+import heapq
+import json
+import math
+import mmap
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+from array import array
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional
+
+from config import cassette, tracing
+
+SOURCES = ["kaggle", "huggingface", "github", "other"]
+
+# a miss (and so a network call) unless at least this share of the query terms matched
+MIN_COVERAGE = 0.5
+# network results remembered before they are folded into a new segment
+PENDING_FLUSH = 100
+# seconds another process's queue must sit untouched before a flush here takes it
+PENDING_IDLE = 60
+# segments kept before an import or a flush compacts them into one
+MAX_SEGMENTS = 8
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from in into is it of on or that the this to with using use "
+    "dataset datasets data ai ml".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in _TOKEN_RE.findall((text or "").lower()) if len(t) > 1 and t not in _STOPWORDS]
+
+
+def _doc_tokens(record: Dict) -> List[str]:
+    # the title counts twice: a query term in the name matters more than one in the description
+    title = tokenize(record.get("title", ""))
+    return title + title + tokenize(" ".join(record.get("tags") or [])) + tokenize(record.get("description", ""))
+
+
+def normalize_record(raw: Dict, source: str = None) -> Optional[Dict]:
+    """Map a Kaggle, HuggingFace or GitHub API object (or a plain {title, url, ...} row) to an index record"""
+    if "html_url" in raw or "stargazers_count" in raw:
+        source = source or "github"
+        record = {
+            "title": raw.get("full_name") or raw.get("name", ""),
+            "url": raw.get("html_url", ""),
+            "description": raw.get("description") or "",
+            "tags": raw.get("topics") or [],
+            "stars": raw.get("stargazers_count", 0),
+            "license": (raw.get("license") or {}).get("spdx_id") if isinstance(raw.get("license"), dict) else raw.get("license"),
+            "updated": raw.get("pushed_at") or raw.get("updated_at"),
+        }
+    elif source == "huggingface" or ("id" in raw and "downloads" in raw):
+        source = "huggingface"
+        record = {
+            "title": raw.get("id", ""),
+            "url": raw.get("url") or f"https://huggingface.co/datasets/{raw.get('id', '')}",
+            "description": raw.get("description") or "",
+            "tags": [t for t in raw.get("tags") or [] if ":" not in t or t.startswith("task_categories:")],
+            "downloads": raw.get("downloads", 0),
+            "likes": raw.get("likes", 0),
+            "updated": raw.get("lastModified"),
+        }
+    elif source == "kaggle" or "ref" in raw:
+        source = "kaggle"
+        ref = raw.get("ref", "")
+        record = {
+            "title": raw.get("title") or ref,
+            "url": raw.get("url") or f"https://www.kaggle.com/datasets/{ref}",
+            "description": raw.get("subtitle") or raw.get("description") or "",
+            "tags": [t.get("name", "") if isinstance(t, dict) else str(t) for t in raw.get("tags") or []],
+            "size": raw.get("size") or raw.get("totalBytes"),
+            "license": raw.get("licenseName") or raw.get("licenses"),
+            "downloads": raw.get("downloadCount", 0),
+            "updated": raw.get("lastUpdated"),
+        }
+    else:
+        record = {k: raw.get(k) for k in ("title", "url", "description", "tags", "size", "license", "stars", "downloads")}
+        source = source or raw.get("source") or "other"
+
+    if not record.get("title") or not record.get("url"):
+        return None
+    record["source"] = source if source in SOURCES else "other"
+    record["id"] = raw.get("id") if source == "other" and raw.get("id") else f"{record['source']}:{record['url'].lower()}"
+    return {k: v for k, v in record.items() if v not in (None, "", [])}
+
+
+def _map_array(path: str, typecode: str):
+    """Zero-copy typed view of a binary file (an empty array for an empty file); the view keeps the map alive"""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return array(typecode)
+        return memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)).cast(typecode)
+
+
+class _Segment:
+    """One immutable on-disk segment.
+
+    terms.json maps term -> [first posting, posting count]; postings are two parallel
+    arrays (doc number uint32, term frequency uint16). Records are compact JSON in
+    docs.bin addressed by a uint64 offsets array. Everything but the lexicon is mmapped.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        with open(os.path.join(path, "terms.json"), encoding="utf-8") as f:
+            self.terms = json.load(f)
+        with open(os.path.join(path, "ids.json"), encoding="utf-8") as f:
+            self.ids = json.load(f)
+        self.doclens = _map_array(os.path.join(path, "doclens.bin"), "I")
+        self.sources = _map_array(os.path.join(path, "sources.bin"), "B")
+        self.post_docs = _map_array(os.path.join(path, "post_docs.bin"), "I")
+        self.post_tfs = _map_array(os.path.join(path, "post_tfs.bin"), "H")
+        self.offsets = _map_array(os.path.join(path, "offsets.bin"), "Q")
+        self.docs = _map_array(os.path.join(path, "docs.bin"), "B")
+        self.shadowed = set()  # doc numbers replaced by a newer segment
+
+    def postings(self, term: str):
+        first, count = self.terms.get(term, (0, 0))
+        return self.post_docs[first:first + count], self.post_tfs[first:first + count]
+
+    def record(self, doc: int) -> Dict:
+        return json.loads(bytes(self.docs[self.offsets[doc]:self.offsets[doc + 1]]))
+
+    def records(self):
+        for doc in range(len(self.ids)):
+            if doc not in self.shadowed:
+                yield self.record(doc)
+
+    @staticmethod
+    def write(path: str, records: List[Dict]):
+        os.makedirs(path)
+        postings: Dict[str, List] = {}
+        doclens, sources, offsets = array("I"), array("B"), array("Q", [0])
+        with open(os.path.join(path, "docs.bin"), "wb") as docs:
+            for doc, record in enumerate(records):
+                tokens = _doc_tokens(record)
+                doclens.append(len(tokens))
+                sources.append(SOURCES.index(record.get("source", "other")))
+                for term, tf in Counter(tokens).items():
+                    postings.setdefault(term, []).append((doc, min(tf, 65535)))
+                blob = json.dumps(record, separators=(",", ":")).encode("utf-8")
+                docs.write(blob)
+                offsets.append(offsets[-1] + len(blob))
+
+        terms, post_docs, post_tfs = {}, array("I"), array("H")
+        for term in sorted(postings):
+            terms[term] = [len(post_docs), len(postings[term])]
+            for doc, tf in postings[term]:
+                post_docs.append(doc)
+                post_tfs.append(tf)
+
+        for name, values in (("doclens.bin", doclens), ("sources.bin", sources), ("post_docs.bin", post_docs),
+                             ("post_tfs.bin", post_tfs), ("offsets.bin", offsets)):
+            with open(os.path.join(path, name), "wb") as f:
+                values.tofile(f)
+        with open(os.path.join(path, "terms.json"), "w", encoding="utf-8") as f:
+            json.dump(terms, f, separators=(",", ":"))
+        with open(os.path.join(path, "ids.json"), "w", encoding="utf-8") as f:
+            json.dump([r["id"] for r in records], f)
+        with open(os.path.join(path, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump({"docs": len(records), "total_len": sum(doclens), "created_at": time.time()}, f)
+
+
+class MetadataIndex:
+    """Local search over dataset/repository metadata with BM25 ranking.
+
+    The index is a list of immutable segments (newest wins when the same record id
+    appears twice) named in manifest.json. ``add`` writes a new segment, so the
+    index can be refreshed incrementally from new dumps; ``compact`` merges them.
+    Results the tools fetch from the network are queued with ``remember`` and
+    folded into a segment every ``PENDING_FLUSH`` records, compacting once there
+    are more than ``MAX_SEGMENTS``. Readers reload when the manifest changes, so
+    imports from another process are picked up.
+    """
+
+    def __init__(self, root: str = None, enabled: bool = None, k1: float = 1.2, b: float = 0.75):
+        self.root = root or os.getenv("METADATA_INDEX_DIR", os.path.join(".cache", "metadata_index"))
+        self.enabled = enabled if enabled is not None else os.getenv("METADATA_INDEX_DISABLED", "") not in ("1", "true")
+        self.k1 = k1
+        self.b = b
+        self.stats = {"hits": 0, "misses": 0}
+        self._segments: List[_Segment] = []
+        self._loaded_mtime = None
+        self._checked_at = 0.0
+        self._pending = 0  # records this process queued since its last flush
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------ loading
+
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.root, "manifest.json")
+
+    def _read_manifest(self) -> Dict:
+        try:
+            with open(self.manifest_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"segments": [], "next": 1}
+
+    def _write_manifest(self, manifest: Dict):
+        fd, tmp = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(manifest, f)
+            os.replace(tmp, self.manifest_path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def _ensure_loaded(self):
+        now = time.monotonic()
+        if now - self._checked_at < 1.0:
+            return
+        self._checked_at = now
+        try:
+            mtime = os.stat(self.manifest_path).st_mtime_ns
+        except OSError:
+            mtime = None
+        if mtime == self._loaded_mtime:
+            return
+        with self._lock:
+            segments = []
+            for name in self._read_manifest()["segments"]:
+                try:
+                    segments.append(_Segment(os.path.join(self.root, "segments", name)))
+                except (OSError, ValueError):
+                    continue  # removed by a concurrent compaction; the next reload fixes it
+            seen = set()
+            for segment in reversed(segments):
+                for doc, record_id in enumerate(segment.ids):
+                    if record_id in seen:
+                        segment.shadowed.add(doc)
+                    seen.add(record_id)
+            self._segments = segments
+            self._loaded_mtime = mtime
+
+    # ------------------------------------------------------------------ search
+
+    def search(self, query: str, source: str = None, k: int = 3, min_coverage: float = MIN_COVERAGE) -> List[Dict]:
+        """Top ``k`` records by BM25, each with a "score"; only those matching enough query terms"""
+        if not self.enabled:
+            return []
+        self._ensure_loaded()
+        segments = self._segments
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not segments or not terms:
+            return []
+
+        n_docs = sum(len(s.ids) - len(s.shadowed) for s in segments) or 1
+        avgdl = (sum(s.meta["total_len"] for s in segments) / max(1, sum(len(s.ids) for s in segments))) or 1.0
+        source_code = SOURCES.index(source) if source in SOURCES else None
+
+        scores: Dict[tuple, List[float]] = {}
+        for term in terms:
+            df = sum(s.terms.get(term, (0, 0))[1] for s in segments)
+            if not df:
+                continue
+            idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+            for seg_no, segment in enumerate(segments):
+                docs, tfs = segment.postings(term)
+                for doc, tf in zip(docs, tfs):
+                    if doc in segment.shadowed or (source_code is not None and segment.sources[doc] != source_code):
+                        continue
+                    norm = self.k1 * (1 - self.b + self.b * segment.doclens[doc] / avgdl)
+                    entry = scores.setdefault((seg_no, doc), [0.0, 0])
+                    entry[0] += idf * tf * (self.k1 + 1) / (tf + norm)
+                    entry[1] += 1
+
+        needed = math.ceil(min_coverage * len(terms))
+        best = heapq.nlargest(k, ((v[0], key) for key, v in scores.items() if v[1] >= needed))
+        return [{**segments[seg_no].record(doc), "score": round(score, 3)} for score, (seg_no, doc) in best]
+
+    def lookup(self, query: str, source: str = None, k: int = 3) -> Optional[List[Dict]]:
+        """``k`` local results, or None when the index can't fill them (the caller goes to the network)"""
+        if cassette.current() is not None:
+            return None  # a recorded or replayed run must not depend on what this machine has indexed
+        hits = self.search(query, source=source, k=k)
+        outcome = "hits" if len(hits) >= k else "misses"
+        with self._lock:
+            self.stats[outcome] += 1
+        tracing.add(f"index_{outcome}")
+        return hits if outcome == "hits" else None
+
+    # ------------------------------------------------------------------ writing
+
+    @contextmanager
+    def _locked(self, timeout: float = 60.0):
+        """Cross-process writer lock: a directory only one process can create"""
+        path = os.path.join(self.root, ".lock")
+        os.makedirs(self.root, exist_ok=True)
+        deadline = time.time() + timeout
+        while True:
+            try:
+                os.mkdir(path)
+                break
+            except FileExistsError:
+                try:
+                    if time.time() - os.stat(path).st_mtime > 300:
+                        os.rmdir(path)  # left behind by a crashed writer
+                        continue
+                except OSError:
+                    continue
+                if time.time() > deadline:
+                    raise TimeoutError(f"metadata index is locked: {path}")
+                time.sleep(0.1)
+        try:
+            yield
+        finally:
+            os.rmdir(path)
+
+    def add(self, records: Iterable[Dict]) -> int:
+        """Write normalized records as a new segment; returns how many were added"""
+        records = list({r["id"]: r for r in records}.values())
+        if not records:
+            return 0
+        with self._locked():
+            self._add_locked(records)
+        self._checked_at = 0.0
+        return len(records)
+
+    def _add_locked(self, records: List[Dict]):
+        manifest = self._read_manifest()
+        name = f"{manifest['next']:06d}"
+        segments_dir = os.path.join(self.root, "segments")
+        tmp = os.path.join(segments_dir, f".{name}.tmp")
+        shutil.rmtree(tmp, ignore_errors=True)
+        _Segment.write(tmp, records)
+        os.replace(tmp, os.path.join(segments_dir, name))
+        self._write_manifest({"segments": manifest["segments"] + [name], "next": manifest["next"] + 1})
+
+    def compact(self) -> int:
+        """Merge every segment (and pending records) into one; returns the number of live records"""
+        self.refresh()
+        with self._locked():
+            merged = self._compact_locked()
+        self._checked_at = 0.0
+        return merged
+
+    def _compact_locked(self) -> int:
+        manifest = self._read_manifest()
+        segments = [_Segment(os.path.join(self.root, "segments", n)) for n in manifest["segments"]]
+        merged = {}
+        for segment in segments:
+            for record in segment.records():
+                merged[record["id"]] = record
+        name = f"{manifest['next']:06d}"
+        tmp = os.path.join(self.root, "segments", f".{name}.tmp")
+        shutil.rmtree(tmp, ignore_errors=True)
+        _Segment.write(tmp, list(merged.values()))
+        os.replace(tmp, os.path.join(self.root, "segments", name))
+        self._write_manifest({"segments": [name], "next": manifest["next"] + 1})
+        for old in manifest["segments"]:
+            shutil.rmtree(os.path.join(self.root, "segments", old), ignore_errors=True)
+        return len(merged)
+
+    @property
+    def pending_path(self) -> str:
+        # one queue per process: only its own threads append to it, and they do so under the lock
+        return os.path.join(self.root, f"pending-{os.getpid()}.jsonl")
+
+    def remember(self, raw_items: Iterable[Dict], source: str):
+        """Queue API results fetched from the network so later lookups find them locally"""
+        if not self.enabled:
+            return
+        records = [r for r in (normalize_record(item, source) for item in raw_items) if r]
+        if not records:
+            return
+        os.makedirs(self.root, exist_ok=True)
+        with self._lock:
+            with open(self.pending_path, "a", encoding="utf-8") as f:
+                f.write("".join(json.dumps(r, separators=(",", ":")) + "\n" for r in records))
+            self._pending += len(records)
+            if self._pending < PENDING_FLUSH:
+                return
+            self._pending = 0
+        try:
+            self.refresh()
+        except (OSError, TimeoutError):
+            pass  # another process is refreshing
+
+    def _claim_pending(self) -> List[str]:
+        """Rename the queues a flush may take to unique .flushing names (writer lock held)"""
+        claimed = []
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            if name.endswith(".flushing"):
+                claimed.append(path)  # left by a crashed flush
+                continue
+            if not (name.startswith("pending") and name.endswith(".jsonl")):
+                continue
+            try:
+                if path != self.pending_path and time.time() - os.stat(path).st_mtime < PENDING_IDLE:
+                    continue  # another process may be appending; it flushes its own queue
+                target = f"{path}.{time.time_ns()}.flushing"
+                if path == self.pending_path:
+                    with self._lock:
+                        os.replace(path, target)
+                        self._pending = 0
+                else:
+                    os.replace(path, target)
+            except FileNotFoundError:
+                continue
+            claimed.append(target)
+        return claimed
+
+    def refresh(self) -> int:
+        """Fold queued network results into a new segment, compacting once there are too many"""
+        if not os.path.isdir(self.root):
+            return 0
+        with self._locked():
+            claimed = self._claim_pending()
+            records = {}
+            for path in claimed:
+                with open(path, encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            record = json.loads(line)
+                        except ValueError:
+                            continue
+                        records[record["id"]] = record
+            if records:
+                self._add_locked(list(records.values()))
+                if len(self._read_manifest()["segments"]) > MAX_SEGMENTS:
+                    self._compact_locked()
+            for path in claimed:
+                os.remove(path)
+        self._checked_at = 0.0
+        return len(records)
+
+    def import_jsonl(self, paths: Iterable[str], source: str = None) -> Dict[str, int]:
+        """Build or refresh the index from JSONL dumps (one API object or {title, url, ...} per line)"""
+        records, skipped = [], 0
+        for path in paths:
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        record = normalize_record(json.loads(line), source)
+                    except (ValueError, AttributeError):
+                        record = None
+                    if record is None:
+                        skipped += 1
+                    else:
+                        records.append(record)
+        added = self.add(records)
+        if len(self._read_manifest()["segments"]) > MAX_SEGMENTS:
+            self.compact()
+        return {"added": added, "skipped": skipped}
+
+    def summary(self) -> Dict:
+        self._checked_at = 0.0
+        self._ensure_loaded()
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            "path": self.root,
+            "segments": len(self._segments),
+            "records": sum(len(s.ids) - len(s.shadowed) for s in self._segments),
+            "terms": len({t for s in self._segments for t in s.terms}),
+            **self.stats,
+            "hit_rate": round(self.stats["hits"] / lookups, 3) if lookups else 0.0,
+        }
+
+
+metadata_index = MetadataIndex()
@@ -0,0 +1,204 @@
+"""
+Speculative Prefetch - dataset and repository searches started while the research and use case stages run
+"""
+
+import contextvars
+import os
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from config import cassette, events, tracing
+from config.schemas import CompanyProfile
+from config.tasks import USE_CASE_CATEGORIES
+from tools.circuit_breaker import OPEN, breakers
+from tools.http_cache import response_cache
+from tools.metadata_index import MIN_COVERAGE, normalize_record, tokenize
+from tools.metadata_index import metadata_index
+from tools.ratelimit import lane
+
+# the sources the dataset agent's tools search; HuggingFace is only reached through DatasetSearchTool
+SOURCES = ("kaggle", "github")
+
+# what to search for each category every use case portfolio covers
+CATEGORY_QUERIES = {
+    "Predictive Analytics": "predictive analytics",
+    "NLP/GenAI": "natural language processing",
+    "Computer Vision": "computer vision",
+    "Automation": "process automation",
+}
+
+# research prose that says nothing about which datasets a company needs
+_GENERIC = frozenset(
+    "company companies market markets industry business customer customers revenue growth billion million "
+    "percent year years report research analysis strategy strategic digital technology new global also "
+    "including based key high more most its their which will can has have been over than while such".split()
+)
+
+_active: contextvars.ContextVar[Optional["WarmCache"]] = contextvars.ContextVar("prefetch_warm_cache", default=None)
+
+
+def keywords(text: str, exclude=(), limit: int = 4) -> List[str]:
+    """The terms research output repeats most, leaving out the company's own name and generic business words"""
+    skip = _GENERIC | set(tokenize(" ".join(exclude)))
+    counts = Counter(t for t in tokenize(text) if t not in skip and not t.isdigit() and len(t) > 3)
+    return [term for term, n in counts.most_common(limit) if n > 1]
+
+
+class WarmCache:
+    """Search results fetched ahead of the dataset stage for one run.
+
+    Once the company's industry is known, one query per use case category (see
+    config.tasks.USE_CASE_CATEGORIES) goes to Kaggle and GitHub. As research
+    stages finish, queries for the industry terms they repeat most follow, up to
+    ``max_queries`` in all. Everything runs on a small background pool in the
+    "background" rate lane, so the stages' own calls go first.
+
+    The dataset tools ask ``lookup`` before the metadata index and the network.
+    It answers from the prefetched records when ``k`` of them match enough of
+    the tool's query terms (the index's rule), and counts each answer's saved
+    time: how long the request that fetched the records took.
+    """
+
+    def __init__(self, company: str, industry: str = None, max_queries: int = None, workers: int = 2, k: int = 3):
+        self.company = company
+        self.industry = None
+        self.max_queries = max_queries if max_queries is not None else int(os.getenv("PREFETCH_MAX_QUERIES", "8"))
+        self.k = k
+        self.stats = {"queries": 0, "requests": 0, "failed": 0, "hits": 0, "misses": 0, "saved_seconds": 0.0}
+        self._queries: List[str] = []
+        self._records: Dict[str, Dict[str, Dict]] = {source: {} for source in SOURCES}  # url -> record
+        self._seconds: Dict[str, float] = {}  # record url -> seconds its request took
+        self._used = set()
+        self._research: List[str] = []
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="prefetch")
+        if industry:
+            self.seed(industry)
+
+    def seed(self, industry: str):
+        """Start the category searches for ``industry`` (once per run)"""
+        with self._lock:
+            if self.industry is not None:
+                return
+            self.industry = " ".join(tokenize(industry)[:3]) or industry.lower()
+        for category in USE_CASE_CATEGORIES:
+            self.prefetch(f"{self.industry} {CATEGORY_QUERIES.get(category, category.lower())}")
+
+    def research_finished(self, output):
+        """Learn the industry and its recurring terms from a research stage's output"""
+        profile = getattr(output, "pydantic", None)
+        self._research.append(output.raw)
+        if isinstance(profile, CompanyProfile) and "no trusted" not in profile.industry.lower():
+            self.seed(profile.industry)
+        if self.industry is None:
+            return  # kept until the company profile names the industry
+        while self._research:
+            for term in keywords(self._research.pop(0), exclude=(self.company, self.industry)):
+                self.prefetch(f"{self.industry} {term}")
+
+    def prefetch(self, query: str):
+        with self._lock:
+            if query in self._queries or len(self._queries) >= self.max_queries:
+                return
+            self._queries.append(query)
+            self.stats["queries"] += 1
+        for source in SOURCES:
+            events.submit(self._pool, self._fetch, source, query)
+
+    def _fetch(self, source: str, query: str):
+        if breakers.get(source).state == OPEN:
+            return  # the tools will get the breaker's fallback anyway
+        from config.registry import get_tool
+
+        started = time.perf_counter()
+        try:
+            with lane("background"), tracing.span("tool", f"prefetch:{source}", input=query):
+                resp = response_cache.request(source, **get_tool(source)._request(query))
+                if resp.status_code != 200:
+                    raise RuntimeError(f"{source} returned {resp.status_code}")
+                body = resp.json()
+                items = body.get("items", []) if source == "github" else body or []
+                if not resp.from_cache:
+                    metadata_index.remember(items, source)
+        except Exception:
+            with self._lock:
+                self.stats["failed"] += 1
+            return
+        seconds = time.perf_counter() - started
+        records = [r for r in (normalize_record(item, source) for item in items) if r]
+        with self._lock:
+            self.stats["requests"] += 1
+            for record in records:
+                self._records[source].setdefault(record["url"], record)
+                self._seconds.setdefault(record["url"], seconds)
+
+    def lookup(self, query: str, source: str) -> Optional[List[Dict]]:
+        """``k`` prefetched records for the query, or None (the caller goes on to the index and the network)"""
+        if source not in SOURCES:
+            return None
+        terms = set(tokenize(query))
+        if not terms:
+            return None
+        with self._lock:
+            scored = []
+            for url, record in self._records[source].items():
+                text = set(tokenize(f"{record.get('title', '')} {record.get('description', '')}"))
+                coverage = len(terms & text) / len(terms)
+                if coverage >= MIN_COVERAGE:
+                    scored.append((coverage, record.get("stars", 0), url))
+            scored.sort(reverse=True)
+            best = [self._records[source][url] for _, _, url in scored[:self.k]]
+            hit = len(best) >= self.k
+            self.stats["hits" if hit else "misses"] += 1
+            if hit:
+                # the records came back together with their request; one saved wait per answer
+                self.stats["saved_seconds"] += max(self._seconds[r["url"]] for r in best)
+                self._used.update((source, r["url"]) for r in best)
+        tracing.add("prefetch_hits" if hit else "prefetch_misses")
+        return best if hit else None
+
+    def close(self):
+        # searches still queued when the run ends would warm nothing
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def summary(self) -> Dict:
+        with self._lock:
+            stats = dict(self.stats)
+            stats["records"] = sum(len(r) for r in self._records.values())
+            stats["records_used"] = len(self._used)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+        stats["saved_seconds"] = round(stats["saved_seconds"], 3)
+        stats["industry"] = self.industry
+        return stats
+
+
+def from_env(company: str, industry: str = None) -> Optional[WarmCache]:
+    """A warm cache for this run, or None when PREFETCH_DISABLED is set or a cassette records or replays"""
+    if os.getenv("PREFETCH_DISABLED", "") in ("1", "true") or cassette.current() is not None:
+        return None
+    return WarmCache(company, industry)
+
+
+@contextmanager
+def use(warm: Optional[WarmCache]):
+    """Dataset tools called in this context (and threads it submits) read from ``warm``"""
+    if warm is None:
+        yield None
+        return
+    token = _active.set(warm)
+    try:
+        yield warm
+    finally:
+        _active.reset(token)
+        warm.close()
+
+
+def lookup(query: str, source: str) -> Optional[List[Dict]]:
+    """The current run's prefetched records for a tool query, if any"""
+    warm = _active.get()
+    return warm.lookup(query, source) if warm is not None else None
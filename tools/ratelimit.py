@@ -0,0 +1,344 @@
+"""
+Rate Budgets - per-provider token buckets shared by every process on the host
+"""
+
+import asyncio
+import contextvars
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+# lower runs first; within a lane callers are served in arrival order
+LANES = {"priority": 0, "default": 1, "background": 2}
+
+# outbound hosts that count against a named provider budget; any other host is its own provider
+PROVIDER_HOSTS = {
+    "api.tavily.com": "tavily",
+    "api.github.com": "github",
+    "www.kaggle.com": "kaggle",
+    "huggingface.co": "huggingface",
+}
+
+# a waiter that hasn't polled for this long belongs to a dead process
+STALE_WAITER_SECONDS = 60.0
+MAX_POLL_SECONDS = 0.25
+QUEUE_POLL_SECONDS = 0.05
+
+_lane: contextvars.ContextVar[str] = contextvars.ContextVar("rate_lane", default="default")
+
+
+@contextmanager
+def lane(name: str):
+    """Queue every rate-limited call made in this block in ``name`` (see LANES)"""
+    if name not in LANES:
+        raise ValueError(f"Unknown rate lane {name!r}; expected one of {', '.join(LANES)}")
+    token = _lane.set(name)
+    try:
+        yield
+    finally:
+        _lane.reset(token)
+
+
+@contextmanager
+def promoted():
+    """Run this block one lane ahead of the caller's (background -> default -> priority)"""
+    order = sorted(LANES, key=LANES.get)
+    with lane(order[max(0, LANES[_lane.get()] - 1)]):
+        yield
+
+
+class Budget:
+    """Requests and tokens per minute for one provider; 0 means that dimension is unlimited.
+
+    Each dimension is a token bucket refilled continuously. ``burst`` caps how much
+    unused budget can pile up (a sixth of a minute by default), so a quiet period
+    can't turn into a spike that trips the provider's own limiter.
+    """
+
+    def __init__(self, rpm: float = 0, tpm: float = 0, burst: Optional[float] = None):
+        self.rpm = rpm or 0
+        self.tpm = tpm or 0
+        self.burst = burst
+
+    def capacity(self, dimension: str) -> float:
+        per_minute = self.rpm if dimension == "requests" else self.tpm
+        if self.burst is not None:
+            return max(1.0, per_minute * self.burst / 60)
+        return max(1.0, per_minute / 6)
+
+    def __bool__(self):
+        return self.rpm > 0 or self.tpm > 0
+
+
+class RateBudgets:
+    """Named budgets ("llm", "http", "gemini", "tavily", ...) whose buckets live in one SQLite file.
+
+    Every process that points at the same ``path`` draws from the same buckets,
+    so batch workers, web UI jobs and CLI runs on one host share a provider quota
+    instead of each assuming it has the whole of it. Waiters queue in a table:
+    only the head of a budget's queue (priority lane first, then arrival order)
+    may take permits, so a steady stream of small callers can't starve a large
+    one. A budget that isn't configured costs nothing: no file is touched.
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path or os.getenv("RATE_LIMIT_PATH", os.path.join(".cache", "ratelimit.sqlite"))
+        self._budgets: Dict[str, Budget] = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._initialized = False
+        self.stats = {"acquired": 0, "waited": 0, "wait_seconds": 0.0}
+
+        for kind, env in (("llm", "LLM_RPM"), ("http", "HTTP_RPM")):
+            self.configure(kind, float(os.getenv(env, "0") or 0))
+        for provider in ("gemini", "tavily", "github", "kaggle", "huggingface"):
+            prefix = provider.upper()
+            self.configure(
+                provider,
+                float(os.getenv(f"{prefix}_RPM", "0") or 0),
+                float(os.getenv(f"{prefix}_TPM", "0") or 0),
+            )
+
+    def configure(self, kind: str, per_minute: Optional[float], tokens_per_minute: Optional[float] = None):
+        budget = Budget(per_minute or 0, tokens_per_minute or 0)
+        with self._lock:
+            if budget:
+                self._budgets[kind] = budget
+            else:
+                self._budgets.pop(kind, None)
+
+    def budget(self, kind: str) -> Optional[Budget]:
+        return self._budgets.get(kind)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+            with self._lock:
+                if not self._initialized:
+                    conn.execute(
+                        "CREATE TABLE IF NOT EXISTS buckets ("
+                        " name TEXT PRIMARY KEY, tokens REAL, updated REAL)"
+                    )
+                    conn.execute("CREATE TABLE IF NOT EXISTS pauses (budget TEXT PRIMARY KEY, until REAL)")
+                    conn.execute(
+                        "CREATE TABLE IF NOT EXISTS waiters ("
+                        " ticket INTEGER PRIMARY KEY AUTOINCREMENT, budget TEXT, lane INTEGER, pid INTEGER, seen REAL)"
+                    )
+                    conn.execute("CREATE INDEX IF NOT EXISTS waiters_queue ON waiters(budget, lane, ticket)")
+                    self._initialized = True
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    @staticmethod
+    def _bucket(conn, name: str, capacity: float, per_minute: float, now: float) -> float:
+        """Level of a bucket after refilling it up to ``now``"""
+        row = conn.execute("SELECT tokens, updated FROM buckets WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            return capacity
+        tokens, updated = row
+        return min(capacity, tokens + max(0.0, now - updated) * per_minute / 60.0)
+
+    @staticmethod
+    def _store(conn, name: str, tokens: float, now: float):
+        conn.execute(
+            "INSERT INTO buckets (name, tokens, updated) VALUES (?, ?, ?)"
+            " ON CONFLICT(name) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated",
+            (name, tokens, now),
+        )
+
+    def _try_take(self, conn, kind: str, budget: Budget, ticket: int, requests: float, tokens: float,
+                  now: float) -> Optional[float]:
+        """Take the permits if ``ticket`` heads the queue; otherwise return how long to wait"""
+        conn.execute("DELETE FROM waiters WHERE seen < ?", (now - STALE_WAITER_SECONDS,))
+        conn.execute("UPDATE waiters SET seen = ? WHERE ticket = ?", (now, ticket))
+        head = conn.execute(
+            "SELECT ticket FROM waiters WHERE budget = ? ORDER BY lane, ticket LIMIT 1", (kind,)
+        ).fetchone()
+        if head is None or head[0] != ticket:
+            return QUEUE_POLL_SECONDS
+
+        paused = conn.execute("SELECT until FROM pauses WHERE budget = ?", (kind,)).fetchone()
+        wait = max(0.0, paused[0] - now) if paused else 0.0
+        levels = {}
+        for dimension, per_minute, wanted in (("requests", budget.rpm, requests), ("tokens", budget.tpm, tokens)):
+            if per_minute <= 0 or wanted <= 0:
+                continue
+            capacity = budget.capacity(dimension)
+            # a single call bigger than the bucket would never fit; let it through on a full bucket
+            wanted = min(wanted, capacity)
+            level = self._bucket(conn, f"{kind}:{dimension}", capacity, per_minute, now)
+            wait = max(wait, (wanted - level) * 60.0 / per_minute)
+            levels[dimension] = (level, wanted)
+        if wait > 0:
+            return wait
+
+        for dimension, (level, wanted) in levels.items():
+            self._store(conn, f"{kind}:{dimension}", level - wanted, now)
+        conn.execute("DELETE FROM waiters WHERE ticket = ?", (ticket,))
+        return None
+
+    def _enqueue(self, kind: str) -> int:
+        with self._transaction() as conn:
+            return conn.execute(
+                "INSERT INTO waiters (budget, lane, pid, seen) VALUES (?, ?, ?, ?)",
+                (kind, LANES[_lane.get()], os.getpid(), time.time()),
+            ).lastrowid
+
+    def _leave(self, ticket: int):
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM waiters WHERE ticket = ?", (ticket,))
+
+    def _poll(self, kind: str, budget: Budget, ticket: int, permits: float, tokens: float) -> Optional[float]:
+        with self._transaction() as conn:
+            wait = self._try_take(conn, kind, budget, ticket, permits, tokens, time.time())
+        # poll at least this often so a caller joining the priority lane is noticed
+        return None if wait is None else min(wait, MAX_POLL_SECONDS)
+
+    def acquire(self, kind: str, permits: float = 1.0, tokens: float = 0):
+        """Block until ``kind`` has ``permits`` requests and ``tokens`` tokens to spare, then take them"""
+        budget = self._budgets.get(kind)
+        if budget is None:
+            return
+        started = time.monotonic()
+        ticket = self._enqueue(kind)
+        try:
+            while True:
+                wait = self._poll(kind, budget, ticket, permits, tokens)
+                if wait is None:
+                    break
+                time.sleep(wait)
+        except BaseException:
+            self._leave(ticket)
+            raise
+        self._record_wait(started)
+
+    async def aacquire(self, kind: str, permits: float = 1.0, tokens: float = 0):
+        """``acquire`` for coroutines: waits on the event loop instead of holding a thread.
+
+        Each transaction runs on a worker thread: with the file contended across
+        processes, BEGIN IMMEDIATE can block for up to the connection's timeout,
+        and that must not stall every other coroutine on the loop.
+        """
+        budget = self._budgets.get(kind)
+        if budget is None:
+            return
+        started = time.monotonic()
+        enqueue = asyncio.ensure_future(asyncio.to_thread(self._enqueue, kind))
+        try:
+            ticket = await asyncio.shield(enqueue)
+        except asyncio.CancelledError:
+            # the insert still lands; take the ticket out again or it heads the queue until it goes stale
+            enqueue.add_done_callback(self._leave_later)
+            raise
+        try:
+            while True:
+                wait = await asyncio.to_thread(self._poll, kind, budget, ticket, permits, tokens)
+                if wait is None:
+                    break
+                await asyncio.sleep(wait)
+        except BaseException:
+            await asyncio.shield(asyncio.to_thread(self._leave, ticket))
+            raise
+        self._record_wait(started)
+
+    def _leave_later(self, enqueue: "asyncio.Future"):
+        if not enqueue.cancelled() and enqueue.exception() is None:
+            asyncio.get_running_loop().run_in_executor(None, self._leave, enqueue.result())
+
+    def _record_wait(self, started: float):
+        waited = time.monotonic() - started
+        with self._lock:
+            self.stats["acquired"] += 1
+            if waited > 0.01:
+                self.stats["waited"] += 1
+                self.stats["wait_seconds"] += waited
+
+    def charge(self, kind: str, tokens: float):
+        """Debit tokens learned after the fact (e.g. a completion's length); the bucket may go negative"""
+        budget = self._budgets.get(kind)
+        if budget is None or budget.tpm <= 0 or tokens <= 0:
+            return
+        name = f"{kind}:tokens"
+        with self._transaction() as conn:
+            now = time.time()
+            level = self._bucket(conn, name, budget.capacity("tokens"), budget.tpm, now)
+            self._store(conn, name, level - tokens, now)
+
+    def pause(self, kind: str, seconds: float):
+        """Hold every process's callers of ``kind`` for ``seconds``, e.g. after the provider answered 429"""
+        if kind not in self._budgets or seconds <= 0:
+            return
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO pauses (budget, until) VALUES (?, ?)"
+                " ON CONFLICT(budget) DO UPDATE SET until = max(until, excluded.until)",
+                (kind, time.time() + seconds),
+            )
+
+    def summary(self) -> Dict:
+        with self._lock:
+            stats = dict(self.stats)
+        stats["wait_seconds"] = round(stats["wait_seconds"], 2)
+        stats["budgets"] = {kind: {"rpm": b.rpm, "tpm": b.tpm} for kind, b in sorted(self._budgets.items())}
+        return stats
+
+
+def provider_for_host(host: str) -> str:
+    return PROVIDER_HOSTS.get(host.lower(), host.lower())
+
+
+def provider_for_model(model: str) -> str:
+    """"gemini/gemini-2.0-flash" -> "gemini" """
+    return (model or "").split("/", 1)[0].lower() or "llm"
+
+
+rate_budgets = RateBudgets()
+
+_llm_hook_installed = False
+
+
+def _estimate_tokens(text) -> int:
+    # a cheap ~4 characters per token estimate; counting exactly would cost more than the wait it informs
+    return len(str(text or "")) // 4
+
+
+def install_llm_hook():
+    """Make every CrewAI LLM call wait for the "llm" budget and its provider's budget (idempotent)"""
+    global _llm_hook_installed
+    if _llm_hook_installed:
+        return
+    from crewai.hooks import register_after_llm_call_hook, register_before_llm_call_hook
+
+    def _provider(context) -> str:
+        return provider_for_model(getattr(context.llm, "model", "") or "")
+
+    def _wait_for_llm_budget(context):
+        prompt = sum(_estimate_tokens(m.get("content") if isinstance(m, dict) else m) for m in context.messages or [])
+        rate_budgets.acquire("llm")
+        rate_budgets.acquire(_provider(context), tokens=prompt)
+        return None
+
+    def _charge_completion(context):
+        rate_budgets.charge(_provider(context), _estimate_tokens(context.response))
+        return None
+
+    register_before_llm_call_hook(_wait_for_llm_budget)
+    register_after_llm_call_hook(_charge_completion)
+    _llm_hook_installed = True
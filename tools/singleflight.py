@@ -0,0 +1,128 @@
+"""
+Single-Flight - identical concurrent tool calls share one upstream request
+"""
+
+import asyncio
+import inspect
+import json
+import os
+import re
+import threading
+from typing import Any, Callable, Dict
+
+from config import tracing
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Runs ``fn`` once per key at a time; callers arriving while it runs wait for and share its result.
+
+    Nothing is cached once the call finishes (that is the response cache's job),
+    so results are never staler than the in-flight request.
+    """
+
+    def __init__(self, enabled: bool = None):
+        self.enabled = enabled if enabled is not None else os.getenv("TOOL_COALESCING", "1") not in ("0", "false")
+        self.stats = {"calls": 0, "upstream": 0, "collapsed": 0}
+        self._inflight: Dict[Any, _Call] = {}
+        self._tasks: Dict[Any, asyncio.Task] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn: Callable[[], Any]):
+        if not self.enabled:
+            return fn()
+        with self._lock:
+            self.stats["calls"] += 1
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = self._inflight[key] = _Call()
+                self.stats["upstream"] += 1
+            else:
+                call.waiters += 1
+                self.stats["collapsed"] += 1
+
+        if not leader:
+            tracing.add("collapsed")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            call.done.set()
+
+    async def ado(self, key, fn: Callable[[], Any]):
+        """``do`` for coroutines: ``fn()`` returns an awaitable, run once per key per event loop"""
+        if not self.enabled:
+            return await fn()
+        key = (id(asyncio.get_running_loop()), key)
+        with self._lock:
+            self.stats["calls"] += 1
+            task = self._tasks.get(key)
+            leader = task is None
+            if leader:
+                task = self._tasks[key] = asyncio.ensure_future(fn())
+                task.add_done_callback(lambda _: self._tasks.pop(key, None))
+                self.stats["upstream"] += 1
+            else:
+                self.stats["collapsed"] += 1
+
+        if not leader:
+            tracing.add("collapsed")
+        # a caller that gives up must not cancel the call the others are waiting on
+        return await asyncio.shield(task)
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+        stats["collapse_rate"] = round(stats["collapsed"] / stats["calls"], 3) if stats["calls"] else 0.0
+        return stats
+
+
+def normalize_query(value) -> Any:
+    """Case, whitespace and trailing punctuation don't make two queries different"""
+    if isinstance(value, str):
+        return re.sub(r"\s+", " ", value).strip().strip("?.!,;").lower()
+    return value
+
+
+tool_calls = SingleFlight()
+
+
+def coalesced(run):
+    """Decorator for a tool's ``_run`` or ``_arun``: concurrent calls with the same normalized arguments share one run"""
+
+    def key(self, args, kwargs) -> str:
+        return json.dumps(
+            [type(self).__name__, [normalize_query(a) for a in args],
+             {k: normalize_query(v) for k, v in kwargs.items()}],
+            sort_keys=True, default=str,
+        )
+
+    if inspect.iscoroutinefunction(run):
+        async def wrapper(self, *args, **kwargs):
+            return await tool_calls.ado(key(self, args, kwargs), lambda: run(self, *args, **kwargs))
+    else:
+        def wrapper(self, *args, **kwargs):
+            return tool_calls.do(key(self, args, kwargs), lambda: run(self, *args, **kwargs))
+
+    wrapper.__name__ = run.__name__
+    wrapper.__doc__ = run.__doc__
+    wrapper.__wrapped__ = run
+    return wrapper
@@ -2,34 +2,92 @@
 Tavily Search Tool Wrapper
 """
 
-from crewai_tools import TavilySearchTool
 import os
-from dotenv import load_dotenv
+from crewai_tools import TavilySearchTool
+from config import tracing
+from config.research_store import research_store
+from config.registry import load_settings
+from tools.http_cache import response_cache
+from tools.ratelimit import rate_budgets
+from tools.singleflight import coalesced
+
+
+class CachedTavilySearchTool(TavilySearchTool):
+    """TavilySearchTool that reads through the shared on-disk response cache"""
+
+    @tracing.traced_tool
+    @coalesced
+    def _run(self, query: str) -> str:
+        params = {
+            "query": query,
+            "search_depth": self.search_depth,
+            "topic": self.topic,
+            "time_range": self.time_range,
+            "days": self.days,
+            "max_results": self.max_results,
+            "include_domains": list(self.include_domains or []),
+            "exclude_domains": list(self.exclude_domains or []),
+            "include_answer": self.include_answer,
+            "include_raw_content": self.include_raw_content,
+            "include_images": self.include_images,
+        }
+        key = response_cache.make_key("POST", "https://api.tavily.com/search", body=params)
+
+        def fetch():
+            rate_budgets.acquire("http")
+            rate_budgets.acquire("tavily")
+            # the Tavily SDK makes the request itself, so time it here rather than in tools.transport
+            with tracing.span("http", "api.tavily.com", method="POST") as span:
+                body = super(CachedTavilySearchTool, self)._run(query).encode("utf-8")
+                span.set(status=200, bytes=len(body))
+            return 200, body, {}
+
+        return response_cache.cached_call("tavily", key, fetch).text
 
-load_dotenv()
 
 class TavilyTool:
     def __init__(self):
-        api_key = os.getenv("TAVILY_API_KEY")
+        api_key = load_settings()["TAVILY_API_KEY"]
         if not api_key:
             raise ValueError("Missing TAVILY_API_KEY")
-        self.tool = TavilySearchTool(
+        self.tool = CachedTavilySearchTool(
             api_key=api_key,
             search_depth="advanced",
             max_results=5,
             include_raw_content=False,
             include_images=False
         )
+        api_url = os.getenv("TAVILY_API_URL")
+        if api_url:
+            self.tool.client.base_url = api_url.rstrip("/")
 
+    # industry findings are shared by every company in the industry; competitors are per company
     def search_industry(self, query: str):
-        return self.tool.run(f"industry analysis market research {query} 2024")
+        return research_store.get_or_fetch(
+            "industry", query, "market",
+            lambda: self.tool.run(f"industry analysis market research {query} 2024"), source="tavily",
+        )
 
     def search_ai_use_cases(self, industry: str):
-        return self.tool.run(f"AI ML GenAI applications in {industry} industry 2024")
+        return research_store.get_or_fetch(
+            "industry", industry, "ai_use_cases",
+            lambda: self.tool.run(f"AI ML GenAI applications in {industry} industry 2024"), source="tavily",
+        )
 
     def search_competitors(self, company: str, industry: str):
-        return self.tool.run(f"{company} competitors market positioning {industry}")
+        return research_store.get_or_fetch(
+            "company", company, "competitor_search",
+            lambda: self.tool.run(f"{company} competitors market positioning {industry}"), source="tavily",
+        )
+
 
+def build_tavily_tool() -> CachedTavilySearchTool:
+    return TavilyTool().tool
 
-tavily = TavilyTool().tool
 
+def __getattr__(name):
+    # `tavily` is built on first access (it needs TAVILY_API_KEY) and cached by config.registry
+    if name == "tavily":
+        from config.registry import get_tool
+        return get_tool("tavily")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
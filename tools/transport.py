@@ -0,0 +1,451 @@
+"""
+Shared HTTP Transport - pooled keep-alive sessions with retry/backoff, adaptive timeouts and hedging
+"""
+
+import asyncio
+import bisect
+import contextvars
+import email.utils
+import os
+import random
+import threading
+import time
+import weakref
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, TimeoutError as FutureTimeout, wait as wait_for
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import tracing
+from tools.ratelimit import provider_for_host, rate_budgets
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# upper bounds (ms) of the latency histogram buckets; the last bucket is open-ended
+LATENCY_BUCKETS_MS = [50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+# only requests that are safe to send twice are hedged
+HEDGED_METHODS = {"GET", "HEAD"}
+
+# async failures worth another attempt: the request never got an answer (read timeouts excluded, as in sync)
+RETRYABLE_ASYNC_ERRORS = (httpx.NetworkError, httpx.ConnectTimeout, httpx.RemoteProtocolError)
+
+
+class HostStats:
+    """Latency histogram plus a window of recent samples for one host"""
+
+    def __init__(self, window: int = 512):
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.samples = deque(maxlen=window)
+        self.requests = 0
+        self.retries = 0
+        self.errors = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float):
+        ms = seconds * 1000
+        with self._lock:
+            self.buckets[bisect.bisect_left(LATENCY_BUCKETS_MS, ms)] += 1
+            self.samples.append(seconds)
+            self.requests += 1
+
+    def bump(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def take_hedge(self, budget: float) -> bool:
+        """Reserve a hedge if they stay within ``budget`` of this host's requests"""
+        with self._lock:
+            if self.hedges >= budget * self.requests:
+                return False
+            self.hedges += 1
+            return True
+
+    def percentile(self, q: float) -> Optional[float]:
+        with self._lock:
+            data = sorted(self.samples)
+        if not data:
+            return None
+        return data[min(len(data) - 1, int(q * len(data)))]
+
+    def snapshot(self) -> Dict:
+        labels = [f"<={b}ms" for b in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}ms"]
+        p50, p95 = self.percentile(0.5), self.percentile(0.95)
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "errors": self.errors,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+            "histogram": dict(zip(labels, self.buckets)),
+        }
+
+
+class Transport:
+    """Per-host pooled sessions with bounded concurrency and jittered exponential backoff.
+
+    Retries 429/5xx responses and connection failures (not read timeouts). ``Retry-After`` and GitHub's
+    ``X-RateLimit-Reset`` are honored when present, up to ``max_wait`` seconds;
+    beyond that the response is returned as-is so the caller's fallback kicks in.
+
+    A caller's timeout is a ceiling: once a host has ``min_samples`` latencies, its
+    timeout is ``timeout_factor`` x its p99 (at least ``timeout_floor``), so one stuck
+    response no longer costs the full constant. With hedging on, a GET still
+    unanswered after the host's p95 gets a duplicate, and the first answer wins;
+    hedges are capped at ``hedge_budget`` of the host's requests.
+
+    ``arequest`` is the same policy for coroutines. Each event loop gets one
+    httpx.AsyncClient shared by every tool, and callers wait for budgets, host
+    slots and backoff on the loop, so a call in flight costs no thread. Host
+    stats (and so adaptive timeouts and hedge delays) are shared by both paths.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = 16,
+        max_per_host: int = 8,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        max_wait: float = 30.0,
+        adaptive_timeouts: bool = None,
+        timeout_factor: float = 4.0,
+        timeout_floor: float = 1.0,
+        min_samples: int = 20,
+        hedging: bool = None,
+        hedge_budget: float = None,
+    ):
+        self.pool_size = pool_size
+        self.max_per_host = max_per_host
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.max_wait = max_wait
+        if adaptive_timeouts is None:
+            adaptive_timeouts = os.getenv("ADAPTIVE_TIMEOUTS", "1") not in ("0", "false")
+        self.adaptive_timeouts = adaptive_timeouts
+        self.timeout_factor = timeout_factor
+        self.timeout_floor = timeout_floor
+        self.min_samples = min_samples
+        self.hedging = hedging if hedging is not None else os.getenv("HEDGE_REQUESTS", "") in ("1", "true")
+        self.hedge_budget = hedge_budget if hedge_budget is not None else float(os.getenv("HEDGE_BUDGET", "0.1"))
+        self._hedge_pool: Optional[ThreadPoolExecutor] = None
+
+        self._sessions: Dict[str, requests.Session] = {}
+        self._semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self._stats: Dict[str, HostStats] = {}
+        # event loop -> (its AsyncClient, {host: asyncio.Semaphore})
+        self._async_clients = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def _host_state(self, host: str):
+        with self._lock:
+            if host not in self._sessions:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=0)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._sessions[host] = session
+                self._semaphores[host] = threading.BoundedSemaphore(self.max_per_host)
+            stats = self._stats.setdefault(host, HostStats())
+            return self._sessions[host], self._semaphores[host], stats
+
+    def _async_state(self, host: str):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if loop not in self._async_clients:
+                client = httpx.AsyncClient(
+                    follow_redirects=True,
+                    limits=httpx.Limits(max_connections=None, max_keepalive_connections=self.pool_size * 2),
+                )
+                self._async_clients[loop] = (client, {})
+            client, semaphores = self._async_clients[loop]
+            if host not in semaphores:
+                semaphores[host] = asyncio.Semaphore(self.max_per_host)
+            stats = self._stats.setdefault(host, HostStats())
+            return client, semaphores[host], stats
+
+    def _backoff(self, attempt: int) -> float:
+        # "full jitter": uniform in [0, base * 2^attempt]
+        return random.uniform(0, min(self.max_wait, self.backoff_base * (2 ** attempt)))
+
+    @staticmethod
+    def _server_wait(resp: requests.Response) -> Optional[float]:
+        """Delay requested by the server, from Retry-After or GitHub rate-limit headers."""
+        retry_after = resp.headers.get("Retry-After")
+        if retry_after:
+            if retry_after.strip().isdigit():
+                return float(retry_after)
+            try:
+                return max(0.0, email.utils.parsedate_to_datetime(retry_after).timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+        if resp.headers.get("X-RateLimit-Remaining") == "0" and resp.headers.get("X-RateLimit-Reset"):
+            try:
+                return max(0.0, float(resp.headers["X-RateLimit-Reset"]) - time.time())
+            except ValueError:
+                pass
+        return None
+
+    def timeout_for(self, stats: HostStats, requested):
+        """The caller's timeout, tightened to the host's observed p99 (times a margin) once there is enough data"""
+        if not self.adaptive_timeouts or not isinstance(requested, (int, float)) or len(stats.samples) < self.min_samples:
+            return requested
+        return min(requested, max(self.timeout_floor, stats.percentile(0.99) * self.timeout_factor))
+
+    def _hedge_delay(self, method: str, stats: HostStats) -> Optional[float]:
+        if not self.hedging or method.upper() not in HEDGED_METHODS or len(stats.samples) < self.min_samples:
+            return None
+        return stats.percentile(0.95)
+
+    def _should_retry(self, resp: requests.Response) -> bool:
+        if resp.status_code in RETRY_STATUSES:
+            return True
+        # GitHub signals primary rate limits with 403 + exhausted quota
+        return resp.status_code == 403 and resp.headers.get("X-RateLimit-Remaining") == "0"
+
+    def _retry_delay(self, resp, provider: str, attempt: int) -> Optional[float]:
+        """Seconds to wait before the next attempt, or None to hand ``resp`` back as it is"""
+        wait = self._server_wait(resp) if resp is not None else None
+        if wait is None:
+            wait = self._backoff(attempt)
+        elif wait > self.max_wait:
+            rate_budgets.pause(provider, wait)
+            return None  # quota resets too far out; let the caller fall back now
+        else:
+            # the provider said when to come back: hold other workers and processes too
+            rate_budgets.pause(provider, wait)
+        return wait + random.uniform(0, 0.1)
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        host = urlsplit(url).netloc.lower()
+        with tracing.span("http", host, method=method) as span:
+            resp = self._send(host, method, url, span, **kwargs)
+            span.set(status=resp.status_code, bytes=len(resp.content))
+            return resp
+
+    def _send(self, host: str, method: str, url: str, span, **kwargs) -> requests.Response:
+        session, semaphore, stats = self._host_state(host)
+        provider = provider_for_host(host)
+        requested = kwargs.pop("timeout", 10)
+
+        attempt = 0
+        while True:
+            rate_budgets.acquire("http")
+            rate_budgets.acquire(provider)
+            kwargs["timeout"] = self.timeout_for(stats, requested)
+            with semaphore:
+                try:
+                    resp = self._exchange(session, semaphore, stats, provider, method, url, span, kwargs)
+                except requests.RequestException as exc:
+                    stats.bump("errors")
+                    # a read timeout already cost the full timeout; don't pay it again
+                    if attempt >= self.max_retries or not isinstance(exc, requests.ConnectionError):
+                        raise
+                    resp = None
+
+            if resp is not None and (attempt >= self.max_retries or not self._should_retry(resp)):
+                return resp
+
+            wait = self._retry_delay(resp, provider, attempt)
+            if wait is None:
+                return resp
+            stats.bump("retries")
+            span.add("retries")
+            attempt += 1
+            time.sleep(wait)
+
+    @staticmethod
+    def _timed(session, stats: HostStats, method: str, url: str, kwargs) -> requests.Response:
+        start = time.perf_counter()
+        try:
+            return session.request(method, url, **kwargs)
+        finally:
+            stats.observe(time.perf_counter() - start)
+
+    def _submit(self, *args):
+        if self._hedge_pool is None:
+            with self._lock:
+                if self._hedge_pool is None:
+                    self._hedge_pool = ThreadPoolExecutor(self.pool_size * 2, thread_name_prefix="http-hedge")
+        return self._hedge_pool.submit(contextvars.copy_context().run, self._timed, *args)
+
+    def _exchange(self, session, semaphore, stats: HostStats, provider: str, method: str, url: str, span, kwargs):
+        """One attempt: a single request, or a hedged pair when the first is slower than the host's p95.
+
+        The caller holds one of the host's slots; a hedge takes a second one, given
+        back only once both requests are done, so the loser still running in the
+        background counts against ``max_per_host``.
+        """
+        delay = self._hedge_delay(method, stats)
+        if delay is None:
+            return self._timed(session, stats, method, url, kwargs)
+
+        primary = self._submit(session, stats, method, url, kwargs)
+        try:
+            return primary.result(timeout=delay)
+        except FutureTimeout:
+            pass
+        if not semaphore.acquire(blocking=False):
+            return primary.result()  # the host is at its limit: no room for a hedge
+        if not stats.take_hedge(self.hedge_budget):
+            semaphore.release()
+            return primary.result()
+        rate_budgets.acquire("http")
+        rate_budgets.acquire(provider)
+        span.add("hedges")
+        hedge = self._submit(session, stats, method, url, kwargs)
+        self._release_when_done(semaphore, primary, hedge)
+
+        # first successful answer wins; the loser finishes in the background and is dropped
+        pending, error = {primary, hedge}, None
+        while pending:
+            done, pending = wait_for(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is hedge:
+                        stats.bump("hedge_wins")
+                        span.set(hedge_won=1)
+                    return future.result()
+                error = error or future.exception()
+        raise error
+
+    @staticmethod
+    def _release_when_done(semaphore, *futures):
+        """Release ``semaphore`` once, after the last of ``futures`` (or asyncio tasks) finishes"""
+        remaining = [len(futures)]
+        lock = threading.Lock()
+
+        def settle(_):
+            with lock:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last:
+                semaphore.release()
+
+        for future in futures:
+            future.add_done_callback(settle)
+
+    async def arequest(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """``request`` for coroutines, on this event loop's shared AsyncClient"""
+        host = urlsplit(url).netloc.lower()
+        with tracing.span("http", host, method=method) as span:
+            resp = await self._asend(host, method, url, span, **kwargs)
+            span.set(status=resp.status_code, bytes=len(resp.content))
+            return resp
+
+    async def _asend(self, host: str, method: str, url: str, span, **kwargs) -> httpx.Response:
+        client, semaphore, stats = self._async_state(host)
+        provider = provider_for_host(host)
+        requested = kwargs.pop("timeout", 10)
+
+        attempt = 0
+        while True:
+            await rate_budgets.aacquire("http")
+            await rate_budgets.aacquire(provider)
+            kwargs["timeout"] = self.timeout_for(stats, requested)
+            async with semaphore:
+                try:
+                    resp = await self._aexchange(client, semaphore, stats, provider, method, url, span, kwargs)
+                except httpx.RequestError as exc:
+                    stats.bump("errors")
+                    if attempt >= self.max_retries or not isinstance(exc, RETRYABLE_ASYNC_ERRORS):
+                        raise
+                    resp = None
+
+            if resp is not None and (attempt >= self.max_retries or not self._should_retry(resp)):
+                return resp
+
+            # may pause the provider's budget: a SQLite write, kept off the loop
+            wait = await asyncio.to_thread(self._retry_delay, resp, provider, attempt)
+            if wait is None:
+                return resp
+            stats.bump("retries")
+            span.add("retries")
+            attempt += 1
+            await asyncio.sleep(wait)
+
+    @staticmethod
+    async def _atimed(client: httpx.AsyncClient, stats: HostStats, method: str, url: str, kwargs) -> httpx.Response:
+        start = time.perf_counter()
+        try:
+            resp = await client.request(method, url, **kwargs)
+        except asyncio.CancelledError:
+            raise  # the losing half of a hedged pair; its time says nothing about the host
+        except BaseException:
+            stats.observe(time.perf_counter() - start)
+            raise
+        stats.observe(time.perf_counter() - start)
+        return resp
+
+    async def _aexchange(self, client, semaphore, stats: HostStats, provider: str, method: str, url: str, span, kwargs):
+        """``_exchange`` on the event loop; the losing half of a hedged pair is cancelled, not left running.
+
+        As in ``_exchange``, a hedge needs a second free slot of the host's, held
+        until both requests are done.
+        """
+        delay = self._hedge_delay(method, stats)
+        if delay is None:
+            return await self._atimed(client, stats, method, url, kwargs)
+
+        primary = asyncio.ensure_future(self._atimed(client, stats, method, url, kwargs))
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if done or semaphore.locked():
+            return await primary  # answered in time, or the host is at its limit: no room for a hedge
+        await semaphore.acquire()  # free, so this returns without waiting
+        if not stats.take_hedge(self.hedge_budget):
+            semaphore.release()
+            return await primary
+        try:
+            await rate_budgets.aacquire("http")
+            await rate_budgets.aacquire(provider)
+        except BaseException:
+            semaphore.release()
+            raise
+        span.add("hedges")
+        hedge = asyncio.ensure_future(self._atimed(client, stats, method, url, kwargs))
+        self._release_when_done(semaphore, primary, hedge)
+
+        pending, error = {primary, hedge}, None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            stats.bump("hedge_wins")
+                            span.set(hedge_won=1)
+                        return task.result()
+                    error = error or task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def aclose(self):
+        """Close the current event loop's shared client; call before the loop ends"""
+        with self._lock:
+            state = self._async_clients.pop(asyncio.get_running_loop(), None)
+        if state is not None:
+            await state[0].aclose()
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def host_stats(self, host: str) -> Optional[HostStats]:
+        return self._stats.get(host.lower())
+
+    def latency_report(self) -> Dict[str, Dict]:
+        return {host: stats.snapshot() for host, stats in sorted(self._stats.items())}
+
+
+transport = Transport()
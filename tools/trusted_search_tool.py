@@ -2,10 +2,17 @@
 Trusted Search Tool - Proper Tavily API with Trusted Sources
 """
 
+import asyncio
 import os
-import requests
+from concurrent.futures import ThreadPoolExecutor, wait
 from crewai.tools import BaseTool
-from typing import List, ClassVar
+from typing import Dict, List, ClassVar
+from urllib.parse import urlparse
+from config import events
+from config.cassette import CassetteMiss
+from config.tracing import traced_tool
+from tools.http_cache import response_cache
+from tools.singleflight import coalesced
 
 class TrustedSearchTool(BaseTool):
     name: str = "Trusted Search Tool"
@@ -22,34 +29,188 @@ class TrustedSearchTool(BaseTool):
         "starbucks.com"  # official newsroom
     ]
 
+    search_url: str = os.getenv("TAVILY_SEARCH_URL", "https://api.tavily.com/search")
+
+    batched: bool = True        # one include_domains request per batch instead of one per site
+    batch_size: int = 8         # domains per batched request
+    per_site_cap: int = 3       # results kept per domain
+    fan_out: bool = True        # send requests concurrently instead of one by one
+    max_workers: int = 8        # upper bound on in-flight requests
+    site_timeout: float = 10.0  # per-request timeout (seconds)
+    deadline: float = 15.0      # overall budget for one query across all domains (seconds)
+
+    @traced_tool
+    @coalesced
     def _run(self, query: str) -> str:
         api_key = os.getenv("TAVILY_API_KEY")
         if not api_key:
             return "❌ Tavily API key missing."
 
         headers = {"Content-Type": "application/json", "Authorization": f"Bearer {api_key}"}
-        results = []
 
         try:
-            # loop through trusted sites
-            for site in self.trusted_sites:
-                payload = {"query": f"site:{site} {query}", "max_results": 3}
-                resp = requests.post("https://api.tavily.com/search", headers=headers, json=payload, timeout=10)
+            groups = self._groups()
+            if self.fan_out and len(groups) > 1:
+                by_site, missing = self._search_concurrent(query, headers, groups)
+            else:
+                by_site, missing = self._search_sequential(query, headers, groups)
+            return self._format(by_site, missing)
 
-                if resp.status_code == 200:
-                    for r in resp.json().get("results", []):
-                        results.append(
-                            f"- **[{r.get('title','No Title')}]({r.get('url','')})** ({site})\n"
-                            f"  - {(r.get('content','') or '')[:150]}...\n"
-                        )
+        except CassetteMiss:
+            raise  # a replay with a stale cassette must fail, not read as a tool error
+        except Exception as e:
+            return f"❌ Trusted search error: {e}"
 
-            if not results:
-                return "⚠️ No results found even on trusted domains."
+    @traced_tool
+    @coalesced
+    async def _arun(self, query: str) -> str:
+        api_key = os.getenv("TAVILY_API_KEY")
+        if not api_key:
+            return "❌ Tavily API key missing."
 
-            return "### Trusted Results:\n\n" + "\n".join(results)
+        headers = {"Content-Type": "application/json", "Authorization": f"Bearer {api_key}"}
+
+        try:
+            groups = self._groups()
+            if self.fan_out and len(groups) > 1:
+                by_site, missing = await self._asearch_concurrent(query, headers, groups)
+            else:
+                by_site, missing = {}, []
+                for sites in groups:
+                    by_site.update(await self._asearch_group(sites, query, headers))
+            return self._format(by_site, missing)
 
+        except CassetteMiss:
+            raise
         except Exception as e:
             return f"❌ Trusted search error: {e}"
 
+    def _groups(self) -> List[List[str]]:
+        if self.batched:
+            step = max(1, self.batch_size)
+            return [self.trusted_sites[i:i + step] for i in range(0, len(self.trusted_sites), step)]
+        return [[site] for site in self.trusted_sites]
+
+    def _format(self, by_site: Dict[str, List[str]], missing: List[str]) -> str:
+        # merge in trusted_sites order so output is stable regardless of arrival order
+        results = [line for site in self.trusted_sites for line in by_site.get(site, [])]
+
+        if not results:
+            return "⚠️ No results found even on trusted domains."
+
+        output = "### Trusted Results:\n\n" + "\n".join(results)
+        if missing:
+            output += (
+                f"\n⚠️ Partial results: {', '.join(missing)} failed or gave "
+                f"no response within {self.deadline:g}s\n"
+            )
+        return output
+
+    @staticmethod
+    def _match_site(url: str, sites: List[str]):
+        host = (urlparse(url).hostname or "").lower()
+        for site in sites:
+            if host == site or host.endswith("." + site):
+                return site
+        return None
+
+    def _payload(self, sites: List[str], query: str) -> dict:
+        if len(sites) == 1 and not self.batched:
+            return {"query": f"site:{sites[0]} {query}", "max_results": self.per_site_cap}
+        return {
+            "query": query,
+            "include_domains": list(sites),
+            "max_results": min(20, self.per_site_cap * len(sites)),  # Tavily caps at 20
+        }
+
+    def _search_group(self, sites: List[str], query: str, headers: dict) -> Dict[str, List[str]]:
+        """Search one group of domains and bucket the hits back per domain."""
+        resp = response_cache.request(
+            "trusted_search", "POST", self.search_url,
+            json_body=self._payload(sites, query), headers=headers, timeout=self.site_timeout,
+        )
+        return self._bucket(sites, resp)
+
+    async def _asearch_group(self, sites: List[str], query: str, headers: dict) -> Dict[str, List[str]]:
+        resp = await response_cache.arequest(
+            "trusted_search", "POST", self.search_url,
+            json_body=self._payload(sites, query), headers=headers, timeout=self.site_timeout,
+        )
+        return self._bucket(sites, resp)
+
+    def _bucket(self, sites: List[str], resp) -> Dict[str, List[str]]:
+        buckets = {site: [] for site in sites}
+        if resp.status_code == 200:
+            for r in resp.json().get("results", []):
+                site = sites[0] if len(sites) == 1 else self._match_site(r.get("url", ""), sites)
+                if site is None or len(buckets[site]) >= self.per_site_cap:
+                    continue
+                buckets[site].append(
+                    f"- **[{r.get('title','No Title')}]({r.get('url','')})** ({site})\n"
+                    f"  - {(r.get('content','') or '')[:150]}...\n"
+                )
+        return buckets
+
+    def _search_sequential(self, query: str, headers: dict, groups: List[List[str]]):
+        by_site = {}
+        for sites in groups:
+            by_site.update(self._search_group(sites, query, headers))
+        return by_site, []
+
+    def _search_concurrent(self, query: str, headers: dict, groups: List[List[str]]):
+        """Fan out one request per group; keep whatever finishes before the deadline."""
+        pool = ThreadPoolExecutor(
+            max_workers=max(1, min(self.max_workers, len(groups))),
+            thread_name_prefix="trusted-search",
+        )
+        try:
+            futures = {
+                events.submit(pool, self._search_group, sites, query, headers): sites
+                for sites in groups
+            }
+            done, _ = wait(futures, timeout=self.deadline)
+
+            by_site, missing = {}, []
+            for future, sites in futures.items():
+                if future not in done:
+                    missing.extend(sites)
+                elif future.exception() is None:
+                    by_site.update(future.result())
+                elif isinstance(future.exception(), CassetteMiss):
+                    raise future.exception()
+                else:
+                    missing.extend(sites)  # the group failed: its sites are as uncovered as a timeout's
+            return by_site, missing
+        finally:
+            # don't block on stragglers; they are dropped from this query's results
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    async def _asearch_concurrent(self, query: str, headers: dict, groups: List[List[str]]):
+        """``_search_concurrent`` on the event loop: every group in flight at once, stragglers cancelled"""
+        tasks = {
+            asyncio.ensure_future(self._asearch_group(sites, query, headers)): sites
+            for sites in groups
+        }
+        done, pending = await asyncio.wait(tasks, timeout=self.deadline)
+        for task in pending:
+            task.cancel()
+
+        by_site, missing = {}, []
+        for task, sites in tasks.items():
+            if task not in done:
+                missing.extend(sites)
+            elif task.exception() is None:
+                by_site.update(task.result())
+            elif isinstance(task.exception(), CassetteMiss):
+                raise task.exception()
+            else:
+                missing.extend(sites)
+        return by_site, missing
+
 
-trusted_search_tool = TrustedSearchTool()
\ No newline at end of file
+def __getattr__(name):
+    # `trusted_search_tool` is built on first access and cached by config.registry
+    if name == "trusted_search_tool":
+        from config.registry import get_tool
+        return get_tool("trusted_search")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,52 @@
+"""
+Shared helpers for parsing agent outputs
+"""
+
+import re
+from typing import Dict, List
+
+# field labels the use case agent emits for every use case
+_FIELD_RE = re.compile(
+    r"^\W*(problem statement|problem|ai solution|solution|business benefits|benefits|"
+    r"estimated roi|roi|complexity|industry example|example)\b",
+    re.IGNORECASE,
+)
+_PROBLEM_RE = re.compile(r"^\W*problem(\s+statement)?\b", re.IGNORECASE)
+
+
+def company_slug(company_name: str) -> str:
+    """File-name form of a company name, as used for everything under outputs/"""
+    return company_name.lower().replace(" ", "_")
+
+
+def _clean_title(line: str) -> str:
+    title = re.sub(r"^[#>\-*\s\d.)]+", "", line).strip()
+    title = re.sub(r"^(use case\s*\d*\s*[:.\-]\s*)", "", title, flags=re.IGNORECASE)
+    return title.strip("*_: ").strip()
+
+
+def split_use_cases(markdown: str) -> List[Dict[str, str]]:
+    """Split the use case agent's markdown into one block per use case.
+
+    Every use case carries a "Problem Statement" field; its title is the closest
+    non-field line above it. Returns [{"name": ..., "text": ...}] in document order.
+    """
+    lines = (markdown or "").splitlines()
+    starts = []
+    for i, line in enumerate(lines):
+        if not _PROBLEM_RE.match(line):
+            continue
+        j = i - 1
+        while j >= 0 and (not lines[j].strip() or _FIELD_RE.match(lines[j])):
+            j -= 1
+        if j >= 0 and (not starts or j > starts[-1]):
+            starts.append(j)
+
+    use_cases = []
+    for n, start in enumerate(starts):
+        end = starts[n + 1] if n + 1 < len(starts) else len(lines)
+        block = "\n".join(lines[start:end]).strip()
+        name = _clean_title(lines[start])
+        if name:
+            use_cases.append({"name": name, "text": block})
+    return use_cases